@@ -6,6 +6,7 @@ Kabuto Auto Trader - 分析ライブラリ
 from .data_loader import KabutoDataLoader, quick_load_trades
 from .analytics import PerformanceAnalyzer
 from .optimizer import ParameterOptimizer
+from .ticker_master import TickerMasterData
 
 # バックテスト機能
 from .market_data import MarketDataFetcher, quick_fetch
@@ -13,6 +14,7 @@ from .data_cleaner import DataCleaner, quick_clean
 from .indicators import TechnicalIndicators, quick_add_indicators
 from .signal_generator import SignalGenerator, quick_generate_signals
 from .backtest_engine import BacktestEngine
+from .commission import CommissionSchedule
 from .backtest_analytics import BacktestAnalyzer
 
 __all__ = [
@@ -21,6 +23,7 @@ __all__ = [
     'quick_load_trades',
     'PerformanceAnalyzer',
     'ParameterOptimizer',
+    'TickerMasterData',
 
     # バックテスト機能
     'MarketDataFetcher',
@@ -32,5 +35,6 @@ __all__ = [
     'SignalGenerator',
     'quick_generate_signals',
     'BacktestEngine',
+    'CommissionSchedule',
     'BacktestAnalyzer'
 ]
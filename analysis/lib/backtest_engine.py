@@ -9,6 +9,8 @@ from typing import Dict, List, Optional
 from datetime import datetime
 import logging
 
+from .commission import CommissionSchedule
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,7 +24,8 @@ class BacktestEngine:
         slippage_rate: float = 0.0005,  # スリッページ（0.05%）
         position_size_pct: float = 0.1,  # ポジションサイズ（資金の10%）
         max_daily_loss: float = 50000,  # 日次最大損失（5万円）
-        max_consecutive_losses: int = 5  # 最大連続損失数
+        max_consecutive_losses: int = 5,  # 最大連続損失数
+        commission_schedule: Optional[CommissionSchedule] = None  # 手数料体系（指定時は commission_rate より優先）
     ):
         """
         Args:
@@ -32,6 +35,8 @@ class BacktestEngine:
             position_size_pct: ポジションサイズ（資金の何%）
             max_daily_loss: 日次最大損失額
             max_consecutive_losses: 最大連続損失数（Kill Switch）
+            commission_schedule: Relay Server と共通の手数料体系
+                （CommissionSchedule.from_relay_config()）。指定時は約定ごとに適用
         """
         self.initial_capital = initial_capital
         self.commission_rate = commission_rate
@@ -39,6 +44,7 @@ class BacktestEngine:
         self.position_size_pct = position_size_pct
         self.max_daily_loss = max_daily_loss
         self.max_consecutive_losses = max_consecutive_losses
+        self.commission_schedule = commission_schedule
 
         # 状態変数
         self.capital = initial_capital
@@ -46,6 +52,7 @@ class BacktestEngine:
         self.trades = []  # 取引履歴
         self.daily_pnl = {}  # 日次損益
         self.consecutive_losses = 0  # 連続損失カウント
+        self.daily_traded = {}  # 日次約定代金（1日定額プラン用）
 
     # ========================================
     # メインバックテストループ
@@ -157,7 +164,7 @@ class BacktestEngine:
             return
 
         # 手数料（エントリー時）
-        commission = shares * entry_price * self.commission_rate
+        commission = self._commission(shares * entry_price, entry_row['timestamp'])
 
         # ポジション作成
         self.position = {
@@ -237,7 +244,7 @@ class BacktestEngine:
             return
 
         # 手数料（エグジット時）
-        commission = self.position['shares'] * exit_price * self.commission_rate
+        commission = self._commission(self.position['shares'] * exit_price, row['timestamp'])
 
         # 資金に戻す
         proceeds = self.position['shares'] * exit_price - commission
@@ -302,6 +309,28 @@ class BacktestEngine:
         self._exit_position(row, exit_price, 'backtest_end', verbose)
         logger.warning("バックテスト終了時に未決済ポジションを強制クローズしました")
 
+    # ========================================
+    # 手数料
+    # ========================================
+
+    def _commission(self, amount: float, timestamp) -> float:
+        """
+        1約定の手数料
+
+        手数料体系の指定がなければ commission_rate で計算
+
+        Args:
+            amount: 約定金額
+            timestamp: 約定時刻（1日定額プランの日次集計に使用）
+        """
+        if self.commission_schedule is None:
+            return amount * self.commission_rate
+
+        date = timestamp.date()
+        day_before = self.daily_traded.get(date, 0)
+        self.daily_traded[date] = day_before + amount
+        return self.commission_schedule.calculate(amount, day_before)
+
     # ========================================
     # リスク管理
     # ========================================
@@ -0,0 +1,115 @@
+"""
+Kabuto Auto Trader - 手数料体系
+Relay Server と共通の手数料体系（relay_server/config.yaml の commission セクション）で手数料を計算する
+"""
+
+import math
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Relay Server の設定ファイル
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parents[2] / 'relay_server' / 'config.yaml'
+
+PLANS = ('none', 'per_trade', 'daily_flat')
+
+
+class _TierTable:
+    """段階表（金額 → 手数料）"""
+
+    def __init__(self, tiers: List[Dict]):
+        bounded = sorted((t for t in tiers if t.get('up_to') is not None), key=lambda t: t['up_to'])
+        unbounded = [t for t in tiers if t.get('up_to') is None]
+
+        self.bounds = []
+        self.tiers = []
+        lower = 0.0
+        for t in bounded + unbounded[:1]:
+            self.tiers.append((
+                lower,
+                float(t.get('fee', 0)),
+                float(t.get('rate', 0)),
+                float(t.get('step_amount', 0)),
+                float(t.get('step_fee', 0))
+            ))
+            if t.get('up_to') is not None:
+                self.bounds.append(float(t['up_to']))
+                lower = float(t['up_to'])
+
+    def fee(self, amount: float) -> float:
+        if amount <= 0 or not self.tiers:
+            return 0.0
+        lower, fee, rate, step_amount, step_fee = self.tiers[
+            min(bisect_left(self.bounds, amount), len(self.tiers) - 1)
+        ]
+        fee += rate * amount
+        if step_amount > 0 and amount > lower:
+            fee += math.ceil((amount - lower) / step_amount) * step_fee
+        return fee
+
+
+class CommissionSchedule:
+    """手数料体系（Relay Server の app/services/commission.py と同じ計算）"""
+
+    def __init__(
+        self,
+        plan: str = 'none',
+        per_trade: Optional[List[Dict]] = None,
+        daily_flat: Optional[List[Dict]] = None
+    ):
+        """
+        Args:
+            plan: none / per_trade（1約定ごと）/ daily_flat（1日定額）
+            per_trade: 約定金額ごとの段階（up_to, fee, rate, step_amount, step_fee）
+            daily_flat: 1日の約定代金合計ごとの段階
+        """
+        if plan not in PLANS:
+            raise ValueError(f"不明な手数料プラン: {plan}")
+        self.plan = plan
+        self.per_trade = _TierTable(per_trade or [])
+        self.daily_flat = _TierTable(daily_flat or [])
+
+    @classmethod
+    def from_relay_config(cls, path: Optional[str] = None, plan: Optional[str] = None) -> 'CommissionSchedule':
+        """
+        Relay Server の config.yaml から読み込み
+
+        Args:
+            path: 設定ファイル（省略時は relay_server/config.yaml）
+            plan: プランを上書き（段階表は設定ファイルのものを使用）
+        """
+        import yaml
+
+        config_path = Path(path) if path else DEFAULT_CONFIG_PATH
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = (yaml.safe_load(f) or {}).get('commission') or {}
+
+        schedule = cls(
+            plan or config.get('plan', 'none'),
+            config.get('per_trade'),
+            config.get('daily_flat')
+        )
+        logger.info(f"手数料体系を読み込み: {config_path} (plan={schedule.plan})")
+        return schedule
+
+    def calculate(self, amount: float, day_amount_before: float = 0) -> float:
+        """
+        1約定の手数料
+
+        Args:
+            amount: 約定金額
+            day_amount_before: 同日の約定代金合計（daily_flat のみ使用）
+
+        Returns:
+            手数料（円）
+        """
+        if self.plan == 'per_trade':
+            fee = self.per_trade.fee(amount)
+        elif self.plan == 'daily_flat':
+            fee = self.daily_flat.fee(day_amount_before + amount) - self.daily_flat.fee(day_amount_before)
+        else:
+            return 0
+        return max(round(fee), 0)
@@ -3,6 +3,7 @@ Kabuto Auto Trader - データローダー
 Excel VBAログシートおよびRelay Server DBからデータを読み込む
 """
 
+import re
 import pandas as pd
 from pathlib import Path
 from typing import Optional, List
@@ -135,35 +136,49 @@ class KabutoDataLoader:
         """
         Relay Server DB から約定履歴を読み込む
 
+        保持期間を過ぎてアーカイブされた月別テーブル (execution_log_archive_YYYYMM)
+        も含めて読み込む。
+
         Args:
             start_date: 開始日時
             end_date: 終了日時
 
         Returns:
-            DataFrame: 約定履歴データ
+            DataFrame: 約定履歴データ (timestamp = executed_at)
         """
         if not self.db_url:
             raise ValueError("Database URL not specified")
 
-        from sqlalchemy import create_engine, text
+        from sqlalchemy import create_engine, inspect, text
 
         engine = create_engine(self.db_url)
+        inspector = inspect(engine)
+
+        tables = ['execution_log'] + sorted(
+            name for name in inspector.get_table_names()
+            if re.fullmatch(r'execution_log_archive_\d{6}', name)
+        )
+        columns = ", ".join(c['name'] for c in inspector.get_columns('execution_log'))
 
-        query = "SELECT * FROM execution_log WHERE 1=1"
+        where = ""
         params = {}
 
         if start_date:
-            query += " AND timestamp >= :start_date"
+            where += " AND executed_at >= :start_date"
             params['start_date'] = start_date
 
         if end_date:
-            query += " AND timestamp <= :end_date"
+            where += " AND executed_at <= :end_date"
             params['end_date'] = end_date
 
+        query = " UNION ALL ".join(
+            f"SELECT {columns} FROM {table} WHERE 1=1{where}" for table in tables
+        ) + " ORDER BY executed_at"
+
         df = pd.read_sql(text(query), engine, params=params)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        df['timestamp'] = pd.to_datetime(df['executed_at'])
 
-        logger.info(f"Loaded {len(df)} execution records from DB")
+        logger.info(f"Loaded {len(df)} execution records from DB ({len(tables)} tables)")
         return df
 
     # ========================================
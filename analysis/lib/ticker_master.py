@@ -0,0 +1,96 @@
+"""
+Kabuto Auto Trader - 銘柄マスタ
+Relay Server と共通の銘柄マスタファイル（ticker,name,sector,lot_size）を読み込む
+"""
+
+import pandas as pd
+from pathlib import Path
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Relay Server が参照するファイル（relay_server/config.yaml の ticker_master.file）
+DEFAULT_MASTER_PATH = Path(__file__).resolve().parents[2] / 'relay_server' / 'ticker_master.csv'
+
+MASTER_COLUMNS = ['ticker', 'name', 'sector', 'lot_size']
+
+
+class TickerMasterData:
+    """銘柄マスタ"""
+
+    def __init__(self, path: Optional[str] = None, default_lot_size: int = 100):
+        """
+        Args:
+            path: 銘柄マスタファイル（CSV または Parquet、省略時は Relay Server のファイル）
+            default_lot_size: マスタにない銘柄の売買単位
+        """
+        self.path = Path(path) if path else DEFAULT_MASTER_PATH
+        self.default_lot_size = default_lot_size
+        self.df = self._load()
+
+    def _load(self) -> pd.DataFrame:
+        """マスタファイルを読み込み、ticker をインデックスにする"""
+        if self.path.suffix == '.parquet':
+            df = pd.read_parquet(self.path, columns=MASTER_COLUMNS)
+        else:
+            df = pd.read_csv(self.path, dtype={'ticker': str}, encoding='utf-8-sig')
+
+        df['ticker'] = df['ticker'].astype(str).str.strip()
+        df['lot_size'] = pd.to_numeric(df['lot_size'], errors='coerce').fillna(self.default_lot_size).astype(int)
+        df = df.drop_duplicates('ticker', keep='last').set_index('ticker')
+
+        logger.info(f"Loaded {len(df)} tickers from {self.path}")
+        return df
+
+    def get(self, ticker: str) -> Optional[dict]:
+        """銘柄情報（name, sector, lot_size）"""
+        if ticker not in self.df.index:
+            return None
+        return self.df.loc[ticker].to_dict()
+
+    def lot_size(self, ticker: str) -> int:
+        """売買単位（マスタにない銘柄はデフォルト）"""
+        if ticker not in self.df.index:
+            return self.default_lot_size
+        return int(self.df.at[ticker, 'lot_size'])
+
+    def enrich(self, df: pd.DataFrame, ticker_col: str = 'ticker') -> pd.DataFrame:
+        """
+        取引データに銘柄名・業種・売買単位を付与
+
+        既存の ticker_name 列がある場合は欠損値のみ補完する
+
+        Args:
+            df: 取引データ（ticker 列を含む）
+            ticker_col: 銘柄コード列名
+
+        Returns:
+            DataFrame: ticker_name, sector, lot_size 列を追加したデータ
+        """
+        result = df.copy()
+        tickers = result[ticker_col].astype(str)
+
+        names = tickers.map(self.df['name'])
+        if 'ticker_name' in result.columns:
+            result['ticker_name'] = result['ticker_name'].fillna(names)
+        else:
+            result['ticker_name'] = names
+
+        result['sector'] = tickers.map(self.df['sector'])
+        result['lot_size'] = tickers.map(self.df['lot_size']).fillna(self.default_lot_size).astype(int)
+        return result
+
+    def sector_exposure(self, positions: pd.DataFrame) -> pd.Series:
+        """
+        業種別エクスポージャー（Relay Server の max_sector_exposure_pct と同じ集計）
+
+        Args:
+            positions: ticker, quantity, avg_cost 列を含むポジションデータ
+
+        Returns:
+            Series: 業種 → 建玉金額
+        """
+        enriched = self.enrich(positions)
+        value = enriched['quantity'] * enriched['avg_cost']
+        return value.groupby(enriched['sector'].fillna('不明')).sum().sort_values(ascending=False)
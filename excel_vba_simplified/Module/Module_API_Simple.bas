@@ -34,6 +34,14 @@ Function API_GetPendingSignals() As Collection
     http.setTimeouts 5000, 5000, 10000, 10000  ' リゾルブ, 接続, 送信, 受信タイムアウト(ms)
     http.setRequestHeader "Authorization", "Bearer " & GetConfig("API_KEY")
     http.setRequestHeader "Content-Type", "application/json"
+
+    ' API_FORMAT = tsv: タブ区切り形式で取得（JSON解析より高速）
+    Dim useTsv As Boolean
+    useTsv = (LCase(GetConfig("API_FORMAT")) = "tsv")
+    If useTsv Then
+        http.setRequestHeader "Accept", "text/tab-separated-values"
+    End If
+
     http.Send
 
     ' 204 No Content = シグナルなし
@@ -42,6 +50,12 @@ Function API_GetPendingSignals() As Collection
         Exit Function
     End If
 
+    ' 200 OK = シグナルあり（TSV）
+    If http.Status = 200 And useTsv Then
+        Set API_GetPendingSignals = ParseSignalsTsv(http.responseText)
+        Exit Function
+    End If
+
     ' 200 OK = シグナルあり
     If http.Status = 200 Then
         Dim response As Object
@@ -64,6 +78,68 @@ ErrorHandler:
     Set API_GetPendingSignals = Nothing
 End Function
 
+' ========================================
+' TSV形式のシグナル一覧を解析
+' ========================================
+Function ParseSignalsTsv(text As String) As Collection
+    '
+    ' Accept: text/tab-separated-values の応答を解析
+    ' 1行目: #kabuto <TAB> signals <TAB> v1 <TAB> 件数 <TAB> 時刻
+    ' 2行目: 列名、3行目以降: 1行 = 1シグナル（空欄 = null）
+    '
+    ' 戻り値はJSON版と同じく列名をキーとするDictionaryのCollection
+    '
+    On Error GoTo ErrorHandler
+
+    Dim lines() As String
+    lines = Split(Replace(text, vbCr, ""), vbLf)
+
+    If UBound(lines) < 1 Or Left(lines(0), 8) <> "#kabuto" & vbTab Then
+        Call LogError("Invalid TSV response: " & Left(text, 50))
+        Set ParseSignalsTsv = Nothing
+        Exit Function
+    End If
+
+    Dim columns() As String
+    columns = Split(lines(1), vbTab)
+
+    Dim result As New Collection
+    Dim fields() As String
+    Dim signal As Object
+    Dim i As Long
+    Dim j As Long
+
+    For i = 2 To UBound(lines)
+        If Len(lines(i)) > 0 Then
+            fields = Split(lines(i), vbTab)
+            Set signal = CreateObject("Scripting.Dictionary")
+
+            For j = 0 To UBound(columns)
+                If j > UBound(fields) Then
+                    signal(columns(j)) = Null
+                ElseIf Len(fields(j)) = 0 Then
+                    signal(columns(j)) = Null
+                Else
+                    signal(columns(j)) = fields(j)
+                End If
+            Next j
+
+            result.Add signal
+        End If
+    Next i
+
+    If result.Count = 0 Then
+        Set ParseSignalsTsv = Nothing
+    Else
+        Set ParseSignalsTsv = result
+    End If
+    Exit Function
+
+ErrorHandler:
+    Call LogError("Error in ParseSignalsTsv: " & Err.Description)
+    Set ParseSignalsTsv = Nothing
+End Function
+
 ' ========================================
 ' シグナル取得確認（ACK）
 ' ========================================
@@ -7,6 +7,7 @@ Attribute VB_Name = "Module_Config_Simple"
 ' - API_BASE_URL
 ' - API_KEY
 ' - CLIENT_ID
+' - API_FORMAT（任意: tsv = タブ区切りでシグナル取得）
 '
 
 Option Explicit
@@ -7,6 +7,7 @@ Attribute VB_Name = "Module_Config_Simple"
 ' - API_BASE_URL
 ' - API_KEY
 ' - CLIENT_ID
+' - API_FORMATiC: tsv = ^u؂ŃVOi擾j
 '
 
 Option Explicit
@@ -1,18 +1,32 @@
 """
 Admin API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header
 from sqlalchemy.orm import Session
 from typing import Optional
 
 from app.database import get_db
-from app.schemas import KillSwitchRequest, KillSwitchResponse, HeartbeatRequest, HeartbeatResponse
-from app.models import Heartbeat
+from app.schemas import (
+    KillSwitchRequest, KillSwitchResponse, HeartbeatRequest, HeartbeatResponse, AdminAuthRequest,
+    OutboxRequeueRequest
+)
+from app.core import clock, tabular
 from app.core.config import get_settings
 from app.core.logging import logger
+from app.core.rate_limit import get_rate_limiter
+from app.core.runtime_monitor import get_runtime_monitor
+from app.core.snapshot import reload_settings, snapshot_info
 from app.services.kill_switch import KillSwitchService
 from app.services.cooldown import CooldownService
-from datetime import datetime
+from app.services.heartbeat import get_heartbeat_tracker
+from app.services.archive import get_archiver, history
+from app.services.outbox import get_outbox_relay
+from app.services.tracing import latency_report, query_timings, trace_dict
+from app.services.stats_aggregates import get_stats_aggregator
+from app.models import SignalTiming
+from datetime import date, datetime, timedelta
+from sqlalchemy import select
+import asyncio
 
 router = APIRouter()
 
@@ -71,32 +85,13 @@ async def get_kill_switch_status(db: Session = Depends(get_db)):
 
 
 @router.post("/heartbeat", response_model=HeartbeatResponse)
-async def receive_heartbeat(
-    request: HeartbeatRequest,
-    db: Session = Depends(get_db)
-):
+async def receive_heartbeat(request: HeartbeatRequest):
     """
     Receive heartbeat from Excel VBA client
 
-    Tracks client liveness
+    Tracks client liveness in memory (flushed to DB periodically)
     """
-    # Update or create heartbeat record
-    heartbeat = db.query(Heartbeat).filter(
-        Heartbeat.client_id == request.client_id
-    ).first()
-
-    if heartbeat:
-        heartbeat.last_heartbeat = request.timestamp
-        heartbeat.status = "active"
-    else:
-        heartbeat = Heartbeat(
-            client_id=request.client_id,
-            last_heartbeat=request.timestamp,
-            status="active"
-        )
-        db.add(heartbeat)
-
-    db.commit()
+    get_heartbeat_tracker().record(request.client_id, request.timestamp)
 
     logger.debug(f"Heartbeat received from {request.client_id}")
 
@@ -106,27 +101,23 @@ async def receive_heartbeat(
     )
 
 
+HEARTBEAT_TABLE_COLUMNS = ["client_id", "last_heartbeat", "status", "seconds_since_last"]
+COOLDOWN_TABLE_COLUMNS = ["key", "action", "ticker", "remaining_seconds", "remaining_minutes"]
+
+
 @router.get("/admin/heartbeats")
-async def get_all_heartbeats(db: Session = Depends(get_db)):
+async def get_all_heartbeats(accept: Optional[str] = Header(None)):
     """
     Get all client heartbeats
 
-    Monitor client liveness
+    Monitor client liveness (TSV/CSV with the Accept header, see app.core.tabular)
     """
-    heartbeats = db.query(Heartbeat).all()
-
-    result = []
-    for hb in heartbeats:
-        # Check if client is inactive (no heartbeat for 5 minutes)
-        time_since_last = (datetime.now() - hb.last_heartbeat).total_seconds()
-        is_active = time_since_last < 300  # 5 minutes
+    settings = get_settings()
+    result = get_heartbeat_tracker().snapshot(settings.heartbeat.timeout_seconds)
 
-        result.append({
-            "client_id": hb.client_id,
-            "last_heartbeat": hb.last_heartbeat.isoformat(),
-            "status": "active" if is_active else "inactive",
-            "seconds_since_last": int(time_since_last)
-        })
+    fmt = tabular.negotiate(accept)
+    if fmt:
+        return tabular.TabularResponse(fmt, "heartbeats", HEARTBEAT_TABLE_COLUMNS, result)
 
     return {
         "status": "success",
@@ -136,11 +127,11 @@ async def get_all_heartbeats(db: Session = Depends(get_db)):
 
 
 @router.get("/admin/cooldowns")
-async def get_all_cooldowns():
+async def get_all_cooldowns(accept: Optional[str] = Header(None)):
     """
     Get all active cooldowns with remaining time
 
-    Returns list of active cooldowns with TTL
+    Returns list of active cooldowns with TTL (TSV/CSV with the Accept header)
     """
     cooldown_service = CooldownService()
     cooldowns = cooldown_service.get_all_cooldowns()
@@ -158,6 +149,10 @@ async def get_all_cooldowns():
                 "remaining_minutes": round(ttl / 60, 1)
             })
 
+    fmt = tabular.negotiate(accept)
+    if fmt:
+        return tabular.TabularResponse(fmt, "cooldowns", COOLDOWN_TABLE_COLUMNS, result)
+
     return {
         "status": "success",
         "count": len(result),
@@ -192,3 +187,298 @@ async def reset_cooldown(
         "message": f"Cooldown reset for ticker={ticker}, action={action}",
         "timestamp": datetime.now()
     }
+
+
+@router.get("/admin/rate-limits")
+async def get_rate_limits():
+    """
+    Get rate limit rules and limited-request counts
+    """
+    return {
+        "status": "success",
+        **get_rate_limiter().stats()
+    }
+
+
+@router.get("/admin/runtime")
+async def get_runtime():
+    """
+    Get event-loop lag, threadpool queue depth and GC pause statistics
+    """
+    return {
+        "status": "success",
+        **get_runtime_monitor().stats()
+    }
+
+
+@router.get("/admin/config")
+async def get_config_version():
+    """
+    Get the active settings snapshot version
+    """
+    return {
+        "status": "success",
+        **snapshot_info()
+    }
+
+
+@router.post("/admin/config/reload")
+async def reload_config(request: AdminAuthRequest):
+    """
+    Reload config.yaml without restart
+
+    Requires admin password. An invalid config is rejected and the current
+    version stays active.
+    """
+    settings = get_settings()
+
+    if request.password != settings.security.admin_password:
+        logger.warning("Config reload: Invalid admin password")
+        raise HTTPException(status_code=401, detail="Invalid admin password")
+
+    try:
+        snapshot = reload_settings()
+    except Exception as e:
+        logger.error(f"Config reload failed, keeping current settings: {e}")
+        raise HTTPException(status_code=400, detail=f"Invalid configuration: {e}")
+
+    return {
+        "status": "success",
+        "message": f"Settings reloaded (v{snapshot.version})",
+        **snapshot_info(snapshot),
+        "timestamp": datetime.now()
+    }
+
+
+@router.get("/admin/archive")
+async def get_archive_status(db: Session = Depends(get_db)):
+    """
+    Get hot / archive row counts per table and the last archive run
+    """
+    return {
+        "status": "success",
+        **get_archiver().stats(db)
+    }
+
+
+@router.post("/admin/archive/run")
+async def run_archive(request: AdminAuthRequest):
+    """
+    Archive rows older than archive.retention_days now
+
+    Requires admin password.
+    """
+    settings = get_settings()
+
+    if request.password != settings.security.admin_password:
+        logger.warning("Archive run: Invalid admin password")
+        raise HTTPException(status_code=401, detail="Invalid admin password")
+
+    result = await asyncio.to_thread(get_archiver().run)
+
+    return {
+        "status": "success",
+        **result,
+        "timestamp": datetime.now()
+    }
+
+
+@router.get("/admin/outbox/parked")
+async def get_parked_outbox_events(limit: int = 100, db: Session = Depends(get_db)):
+    """
+    Get outbox events parked after outbox.max_attempts failed deliveries
+    """
+    events = get_outbox_relay().parked(db, limit)
+    return {
+        "status": "success",
+        "count": len(events),
+        "events": [
+            {
+                "id": event.id,
+                "event_type": event.event_type,
+                "signal_id": event.signal_id,
+                "occurred_at": event.occurred_at,
+                "attempts": event.attempts,
+                "last_error": event.last_error
+            }
+            for event in events
+        ]
+    }
+
+
+@router.post("/admin/outbox/requeue")
+async def requeue_outbox_events(request: OutboxRequeueRequest, db: Session = Depends(get_db)):
+    """
+    Put parked outbox events back in the delivery queue
+
+    Requires admin password. Use after fixing the cause (e.g. closing the CSV in Excel).
+    """
+    settings = get_settings()
+
+    if request.password != settings.security.admin_password:
+        logger.warning("Outbox requeue: Invalid admin password")
+        raise HTTPException(status_code=401, detail="Invalid admin password")
+
+    requeued = get_outbox_relay().requeue_parked(db, request.event_ids)
+
+    return {
+        "status": "success",
+        "requeued": requeued,
+        "timestamp": datetime.now()
+    }
+
+
+@router.get("/admin/history/daily-stats")
+async def get_daily_stats_history(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Get daily stats over a date range (hot and archived days)
+
+    Parameters:
+    - start_date / end_date: inclusive, YYYY-MM-DD (default: all)
+    """
+    rows = history(
+        db.get_bind(), "daily_stats", start_date,
+        end_date + timedelta(days=1) if end_date else None
+    )
+    result = [
+        {
+            "date": row.date.date().isoformat(),
+            "entry_count": row.entry_count,
+            "exit_count": row.exit_count,
+            "total_trades": row.total_trades,
+            "total_pnl": row.total_pnl,
+            "total_commission": row.total_commission,
+            "archived": bool(row.archived)
+        }
+        for row in db.execute(select(rows).order_by(rows.c.date))
+    ]
+
+    return {
+        "status": "success",
+        "count": len(result),
+        "total_pnl": round(sum(r["total_pnl"] or 0 for r in result), 2),
+        "total_trades": sum(r["total_trades"] or 0 for r in result),
+        "days": result
+    }
+
+
+@router.get("/admin/traces/report")
+async def get_trace_report(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Get signal latency distributions per hop and per hour of day (JST)
+
+    Parameters:
+    - start_date / end_date: inclusive accept dates, YYYY-MM-DD (default: today)
+    """
+    if start_date is None and end_date is None:
+        start_date = end_date = clock.today()
+    return {
+        "status": "success",
+        "start_date": start_date.isoformat() if start_date else None,
+        "end_date": end_date.isoformat() if end_date else None,
+        **latency_report(query_timings(db, start_date, end_date))
+    }
+
+
+@router.get("/admin/traces/{signal_id}")
+async def get_trace(signal_id: str, db: Session = Depends(get_db)):
+    """
+    Get the hop timestamps and latencies of one signal
+    """
+    timing = db.query(SignalTiming).filter(SignalTiming.signal_id == signal_id).first()
+    if not timing:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return {
+        "status": "success",
+        **trace_dict(timing)
+    }
+
+
+@router.get("/admin/stats/summary")
+async def get_stats_summary(day: Optional[date] = None, db: Session = Depends(get_db)):
+    """
+    Get the day's signal / trade / PnL / rejection totals (maintained on write)
+
+    Parameters:
+    - day: YYYY-MM-DD (default: today)
+    """
+    day = day or clock.today()
+    totals = get_stats_aggregator().view(db, day, "day").get("", {})
+    decided = totals.get("wins", 0) + totals.get("losses", 0)
+    return {
+        "status": "success",
+        "day": day.isoformat(),
+        **{metric: totals.get(metric, 0) for metric in (
+            "signals", "trades", "entries", "exits", "volume", "pnl", "wins", "losses", "commission", "rejections"
+        )},
+        "win_rate": round(totals.get("wins", 0) / decided, 3) if decided else None
+    }
+
+
+@router.get("/admin/stats/tickers")
+async def get_stats_tickers(day: Optional[date] = None, db: Session = Depends(get_db)):
+    """
+    Get the day's counters per ticker, most traded first
+
+    Parameters:
+    - day: YYYY-MM-DD (default: today)
+    """
+    day = day or clock.today()
+    tickers = get_stats_aggregator().view(db, day, "ticker")
+    ordered = sorted(tickers.items(), key=lambda item: (-item[1].get("trades", 0), item[0]))
+    return {
+        "status": "success",
+        "day": day.isoformat(),
+        "count": len(ordered),
+        "tickers": [{"ticker": ticker, **metrics} for ticker, metrics in ordered]
+    }
+
+
+@router.get("/admin/stats/rejections")
+async def get_stats_rejections(day: Optional[date] = None, db: Session = Depends(get_db)):
+    """
+    Get the day's risk violations by reason, most frequent first
+
+    Parameters:
+    - day: YYYY-MM-DD (default: today)
+    """
+    day = day or clock.today()
+    reasons = get_stats_aggregator().view(db, day, "reason")
+    ordered = sorted(reasons.items(), key=lambda item: (-item[1].get("count", 0), item[0]))
+    return {
+        "status": "success",
+        "day": day.isoformat(),
+        "total": sum(metrics.get("count", 0) for _, metrics in ordered),
+        "reasons": [{"reason": reason, "count": metrics.get("count", 0)} for reason, metrics in ordered]
+    }
+
+
+@router.get("/admin/stats/hours")
+async def get_stats_hours(day: Optional[date] = None, db: Session = Depends(get_db)):
+    """
+    Get the day's signals / trades / rejections per hour (JST)
+
+    Parameters:
+    - day: YYYY-MM-DD (default: today)
+    """
+    day = day or clock.today()
+    hours = get_stats_aggregator().view(db, day, "hour")
+    return {
+        "status": "success",
+        "day": day.isoformat(),
+        "hours": [
+            {
+                "hour": hour,
+                **{metric: hours[hour].get(metric, 0) for metric in ("signals", "trades", "rejections")}
+            }
+            for hour in sorted(hours)
+        ]
+    }
@@ -2,6 +2,7 @@
 Health and Status API endpoints
 """
 from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from datetime import datetime, date
@@ -10,6 +11,14 @@ import redis
 from app.database import get_db
 from app.schemas import HealthResponse, StatusResponse
 from app.core.config import get_settings
+from app.core.logging import get_log_pipeline_stats
+from app.redis_cache import get_hybrid_cache
+from app.core.ip_allowlist import get_ip_allowlist_stats
+from app.core.rate_limit import get_rate_limiter
+from app.core.deployment import deployment_info
+from app.core.lifecycle import get_lifecycle
+from app.core.runtime_monitor import get_runtime_monitor
+from app.services.outbox import get_outbox_relay
 from app.models import DailyStats, Position
 from app.services.kill_switch import KillSwitchService
 from app.services.market_hours import MarketHoursService
@@ -59,6 +68,28 @@ async def health_check(db: Session = Depends(get_db)):
     )
 
 
+@router.get("/live")
+async def liveness():
+    """
+    Liveness probe - the process is up and serving HTTP (any phase)
+    """
+    return {"status": "alive", "phase": get_lifecycle().phase}
+
+
+@router.get("/ready")
+async def readiness():
+    """
+    Readiness probe - 200 once startup finished, 503 while starting or draining
+
+    No database / Redis round trip: Redis outages are served by the local
+    cache, and /health reports the dependencies.
+    """
+    lifecycle = get_lifecycle()
+    info = lifecycle.info()
+    info["status"] = "ready" if lifecycle.is_ready else "not_ready"
+    return JSONResponse(info, status_code=200 if lifecycle.is_ready else 503)
+
+
 @router.get("/status", response_model=StatusResponse)
 async def get_status(db: Session = Depends(get_db)):
     """
@@ -121,5 +152,12 @@ async def get_status(db: Session = Depends(get_db)):
         market_open=market_open,
         daily_stats=daily_stats,
         risk_metrics=risk_metrics,
+        log_pipeline=get_log_pipeline_stats(),
+        redis_cache=get_hybrid_cache().stats(),
+        ip_allowlist=get_ip_allowlist_stats(),
+        rate_limit=get_rate_limiter().stats(),
+        deployment=deployment_info(settings),
+        outbox=get_outbox_relay().stats(db),
+        runtime=get_runtime_monitor().stats(),
         timestamp=datetime.now()
     )
@@ -1,9 +1,8 @@
 """
 Signals API endpoints - Excel Pull API
 """
-from fastapi import APIRouter, Depends, HTTPException, Header
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 from typing import Optional
 
@@ -13,13 +12,25 @@ from app.schemas import (
     SignalAcknowledgeRequest, SignalAcknowledgeResponse,
     SignalExecutionRequest, SignalExecutionResponse,
     SignalFailureRequest, SignalFailureResponse,
-    ErrorResponse
+    ErrorResponse,
+    signal_response_dict, signal_list_dict, SIGNAL_TABLE_COLUMNS
 )
 from app.models import Signal, SignalState, ExecutionLog, Position
+from app.core import clock, tabular
 from app.core.config import get_settings
-from app.core.logging import log_order_executed, log_risk_violation, logger
+from app.core.serialization import FastJSONResponse
+from app.core.logging import log_risk_violation, logger
 from app.services.risk_control import RiskControlService
+from app.services.pnl_engine import PnLEngine, is_win
+from app.services.commission import calculate_execution_commission
 from app.services.pre_order_validation import PreOrderValidationService
+from app.services.outbox import enqueue_event, notify_outbox
+from app.services.archive import find_archived
+from app.services.trade_rate_limiter import TradeRateLimiter
+from app.services.price_store import get_price_store
+from app.services.ticker_master import get_ticker_master
+from app.services.tracing import finish_trace, mark_acked, mark_polled
+from app.services.stats_aggregates import get_stats_aggregator
 
 router = APIRouter()
 
@@ -45,24 +56,35 @@ def verify_api_key(authorization: str = Header(...)) -> bool:
 
 @router.get("/signals/pending", response_model=SignalListResponse)
 async def get_pending_signals(
+    limit: Optional[int] = Query(None, ge=1, le=1000),
     db: Session = Depends(get_db),
-    authorized: bool = Depends(verify_api_key)
+    authorized: bool = Depends(verify_api_key),
+    accept: Optional[str] = Header(None)
 ):
     """
     Get list of pending signals (not yet fetched by Excel)
 
     Excel VBA polls this endpoint every 5 seconds
 
+    Returns at most `limit` signals (default: signal.poll_limit), most urgent
+    first: by priority (exits ahead of entries, see
+    app.services.signal_priority), then oldest first.
+
+    `Accept: text/tab-separated-values` (or `text/csv`) returns the fixed-column
+    table format instead of JSON.
+
     **Important**: This endpoint performs 5-level safety validation
     before returning signals. Only validated signals are sent to Excel.
     """
     settings = get_settings()
 
-    # Query pending signals that haven't expired
-    signals = db.query(Signal).filter(
+    # Top pending signals that haven't expired (ix_signals_state_priority)
+    query = db.query(Signal).filter(
         Signal.state == SignalState.PENDING,
-        Signal.expires_at > datetime.now()
-    ).order_by(Signal.created_at.asc()).all()
+        Signal.expires_at > clock.now()
+    ).order_by(Signal.priority.desc(), Signal.created_at.asc())
+    limit = limit or settings.signal.poll_limit
+    signals = query.limit(limit).all() if limit > 0 else query.all()
 
     if not signals:
         # Return 204 No Content
@@ -101,42 +123,36 @@ async def get_pending_signals(
                 )
                 s.state = SignalState.FAILED
                 s.error_message = f"Pre-order validation failed: {reason}"
+                enqueue_event(db, "signal_state", s.signal_id, {"state": SignalState.FAILED.value})
+                finish_trace(db, s.signal_id, "rejected")
                 log_risk_violation(reason, s.ticker)
 
         # Commit any rejected signals
         db.commit()
+        if len(validated_signals) < len(signals):
+            notify_outbox()
 
     if not validated_signals:
         # No validated signals to return
         from fastapi.responses import Response
         return Response(status_code=204)
 
-    # Convert validated signals to response schema
+    # Trace: the first poll that hands each signal to Excel
+    mark_polled(db, [s.signal_id for s in validated_signals])
+    db.commit()
+
+    # Serialize validated signals (pre-built dicts, rendered with orjson)
+    master = get_ticker_master()
     signal_list = [
-        SignalResponse(
-            signal_id=s.signal_id,
-            action=s.action,
-            ticker=s.ticker,
-            quantity=s.quantity,
-            price=s.price,
-            entry_price=s.entry_price,
-            stop_loss=s.stop_loss,
-            take_profit=s.take_profit,
-            atr=s.atr,
-            state=s.state.value,
-            created_at=s.created_at,
-            expires_at=s.expires_at,
-            checksum=s.checksum
-        )
+        signal_response_dict(s, master.name(s.ticker), master.sector(s.ticker))
         for s in validated_signals
     ]
 
-    return SignalListResponse(
-        status="success",
-        timestamp=datetime.now(),
-        count=len(signal_list),
-        signals=signal_list
-    )
+    fmt = tabular.negotiate(accept)
+    if fmt:
+        return tabular.TabularResponse(fmt, "signals", SIGNAL_TABLE_COLUMNS, signal_list, datetime.now())
+
+    return FastJSONResponse(signal_list_dict(signal_list, datetime.now()))
 
 
 @router.post("/signals/{signal_id}/ack", response_model=SignalAcknowledgeResponse)
@@ -151,8 +167,8 @@ async def acknowledge_signal(
 
     Excel VBA calls this after successfully receiving the signal
     """
-    # Find signal
-    signal = db.query(Signal).filter(Signal.signal_id == signal_id).first()
+    # Find signal (row lock: concurrent reports on other workers wait for this one)
+    signal = db.query(Signal).filter(Signal.signal_id == signal_id).with_for_update().first()
 
     if not signal:
         raise HTTPException(status_code=404, detail="Signal not found")
@@ -175,9 +191,12 @@ async def acknowledge_signal(
     # Update signal state
     signal.state = SignalState.FETCHED
     signal.fetched_by = request.client_id
-    signal.fetched_at = datetime.now()
+    signal.fetched_at = clock.now()
+    enqueue_event(db, "signal_state", signal_id, {"state": SignalState.FETCHED.value})
+    mark_acked(db, signal_id)
 
     db.commit()
+    notify_outbox()
 
     logger.info(f"Signal acknowledged: {signal_id} by {request.client_id}")
 
@@ -201,8 +220,8 @@ async def report_execution(
 
     Excel VBA calls this after successfully executing the order via RSS
     """
-    # Find signal
-    signal = db.query(Signal).filter(Signal.signal_id == signal_id).first()
+    # Find signal (row lock: concurrent reports on other workers wait for this one)
+    signal = db.query(Signal).filter(Signal.signal_id == signal_id).with_for_update().first()
 
     if not signal:
         raise HTTPException(status_code=404, detail="Signal not found")
@@ -220,6 +239,7 @@ async def report_execution(
 
     # Create execution log
     execution_id = f"EXE_{request.executed_at.strftime('%Y%m%d_%H%M%S')}_{signal.ticker}"
+    total_amount = request.execution_price * request.execution_quantity
 
     execution_log = ExecutionLog(
         execution_id=execution_id,
@@ -229,49 +249,54 @@ async def report_execution(
         ticker=signal.ticker,
         quantity=request.execution_quantity,
         price=request.execution_price,
-        commission=0,  # TODO: Calculate commission
-        total_amount=request.execution_price * request.execution_quantity,
+        commission=calculate_execution_commission(db, total_amount, request.executed_at),
+        total_amount=total_amount,
         position_effect="open" if signal.action == "buy" else "close",
         executed_at=request.executed_at
     )
 
     db.add(execution_log)
 
+    # CSV state journal and "Order executed" line: outbox events in the same commit
+    enqueue_event(db, "signal_state", signal_id, {"state": SignalState.EXECUTED.value})
+    enqueue_event(db, "order_executed", signal_id, {
+        "order_id": request.order_id,
+        "ticker": signal.ticker,
+        "execution_price": request.execution_price,
+        "quantity": request.execution_quantity
+    })
+    finish_trace(db, signal_id, "executed", request.executed_at)
+
+    # Realized PnL (FIFO lots) - before the position is reduced
+    realized = PnLEngine(db).apply(execution_log)
+
     # Update position
     _update_position(db, signal, request)
 
-    # Commit main changes first
+    # Daily counts, PnL and win/loss streaks (SQL increments). A break-even
+    # close counts as a loss (pnl_engine.is_win, shared with tools.backfill_pnl).
+    RiskControlService(db).update_daily_stats(
+        signal.action,
+        pnl=realized,
+        is_win=is_win(realized) if realized is not None else None,
+        commission=execution_log.commission or 0
+    )
+
+    # One commit: state, execution log, lots, position, daily stats, outbox
+    # events and timing
     db.commit()
+    notify_outbox()
+    get_stats_aggregator().record_execution(
+        signal.ticker, signal.action, total_amount, realized, execution_log.commission or 0
+    )
 
-    # Update daily stats in a separate operation (to avoid UNIQUE constraint issues)
-    try:
-        risk_service = RiskControlService(db)
-        risk_service.update_daily_stats(signal.action)
-        db.commit()
-    except IntegrityError as e:
-        if "UNIQUE constraint failed: daily_stats.date" in str(e):
-            logger.warning(f"UNIQUE constraint violation when updating daily_stats, retrying: {e}")
-            db.rollback()
-            try:
-                # Retry once
-                risk_service = RiskControlService(db)
-                risk_service.update_daily_stats(signal.action)
-                db.commit()
-            except Exception as retry_error:
-                logger.error(f"Failed to update daily_stats after retry: {retry_error}")
-                # Continue anyway - main execution was successful
-        else:
-            logger.error(f"Unexpected IntegrityError when updating daily_stats: {e}")
-            db.rollback()
-            # Continue anyway - main execution was successful
+    # Auto kill switch on realized losses (consecutive losses / daily loss)
+    if realized is not None:
+        RiskControlService(db).check_auto_kill_switch()
 
-    # Log execution
-    log_order_executed(
-        signal_id=signal_id,
-        order_id=request.order_id,
-        ticker=signal.ticker,
-        execution_price=request.execution_price,
-        quantity=request.execution_quantity
+    TradeRateLimiter().record_trade(signal.ticker, signal_id)
+    get_price_store().update(
+        signal.ticker, request.execution_price, "execution", request.executed_at.timestamp()
     )
 
     return SignalExecutionResponse(
@@ -294,8 +319,8 @@ async def report_failure(
 
     Excel VBA calls this if RSS.ORDER() fails
     """
-    # Find signal
-    signal = db.query(Signal).filter(Signal.signal_id == signal_id).first()
+    # Find signal (row lock: concurrent reports on other workers wait for this one)
+    signal = db.query(Signal).filter(Signal.signal_id == signal_id).with_for_update().first()
 
     if not signal:
         raise HTTPException(status_code=404, detail="Signal not found")
@@ -303,8 +328,11 @@ async def report_failure(
     # Update signal state
     signal.state = SignalState.FAILED
     signal.error_message = request.error
+    enqueue_event(db, "signal_state", signal_id, {"state": SignalState.FAILED.value})
+    finish_trace(db, signal_id, "failed")
 
     db.commit()
+    notify_outbox()
 
     logger.error(f"Signal execution failed: {signal_id} - {request.error}")
 
@@ -329,6 +357,10 @@ async def get_signal_by_id(
     """
     signal = db.query(Signal).filter(Signal.signal_id == signal_id).first()
 
+    if not signal:
+        # Signals past archive.retention_days live in the archive tables
+        signal = find_archived(db, "signals", signal_id)
+
     if not signal:
         raise HTTPException(status_code=404, detail="Signal not found")
 
@@ -342,10 +374,12 @@ async def get_signal_by_id(
         stop_loss=signal.stop_loss,
         take_profit=signal.take_profit,
         atr=signal.atr,
-        state=signal.state.value,
+        state=SignalState(signal.state).value,
         created_at=signal.created_at,
         expires_at=signal.expires_at,
-        checksum=signal.checksum
+        checksum=signal.checksum,
+        ticker_name=get_ticker_master().name(signal.ticker),
+        sector=get_ticker_master().sector(signal.ticker)
     )
 
 
@@ -355,7 +389,7 @@ def _update_position(
     request: SignalExecutionRequest
 ):
     """
-    Update position after execution
+    Update position after execution (committed by the caller)
 
     Args:
         db: Database session
@@ -366,7 +400,7 @@ def _update_position(
         # Buy: add to position
         position = db.query(Position).filter(
             Position.ticker == signal.ticker
-        ).first()
+        ).with_for_update().first()
 
         if position:
             # Update existing position
@@ -376,12 +410,13 @@ def _update_position(
             position.quantity = total_quantity
         else:
             # Create new position
+            info = get_ticker_master().get(signal.ticker)
             position = Position(
                 ticker=signal.ticker,
-                ticker_name=None,  # TODO: Get ticker name
+                ticker_name=info.name if info else None,
                 quantity=request.execution_quantity,
                 avg_cost=request.execution_price,
-                sector=None,  # TODO: Get sector
+                sector=info.sector if info else None,
                 entry_signal_id=signal.signal_id
             )
             db.add(position)
@@ -390,7 +425,7 @@ def _update_position(
         # Sell: reduce or close position
         position = db.query(Position).filter(
             Position.ticker == signal.ticker
-        ).first()
+        ).with_for_update().first()
 
         if position:
             if position.quantity <= request.execution_quantity:
@@ -399,5 +434,3 @@ def _update_position(
             else:
                 # Reduce position
                 position.quantity -= request.execution_quantity
-
-    db.commit()
@@ -2,22 +2,33 @@
 Webhook API endpoints - Receive signals from TradingView
 """
 from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import List, Optional
 import hashlib
 import json
 
 from app.database import get_db
-from app.schemas import WebhookSignal, WebhookResponse, ErrorResponse
+from app.schemas import WebhookSignal, WebhookResponse, WebhookBatchResponse, ErrorResponse
 from app.models import Signal, SignalState, Position
+from app.core import clock
 from app.core.config import get_settings
-from app.core.logging import log_signal_received, log_risk_violation, logger
+from app.core.serialization import FastJSONResponse
+from app.core.logging import log_risk_violation, logger
+from app.redis_cache import SharedStateUnavailable
 from app.services.deduplication import DeduplicationService
 from app.services.cooldown import CooldownService
 from app.services.market_hours import MarketHoursService
 from app.services.risk_control import RiskControlService
-from app.services.csv_logger import CSVLoggerService
 from app.services.day_trading_check import DayTradingCheckService
+from app.services.outbox import enqueue_event, notify_outbox
+from app.services.price_store import get_price_store
+from app.services.signal_priority import signal_priority
+from app.services.stats_aggregates import get_stats_aggregator
+from app.services.tracing import start_trace
 
 router = APIRouter()
 
@@ -28,7 +39,7 @@ def generate_signal_id(signal: WebhookSignal) -> str:
 
     Format: sig_YYYYMMDD_HHMMSS_TICKER_ACTION
     """
-    now = datetime.now()
+    now = clock.now()
     timestamp_str = now.strftime("%Y%m%d_%H%M%S")
     return f"sig_{timestamp_str}_{signal.ticker}_{signal.action}"
 
@@ -51,6 +62,50 @@ def generate_checksum(signal: WebhookSignal, signal_id: str) -> str:
     return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
 
 
+# Item states in the batched core
+PENDING = "pending"
+SUCCESS = "success"
+DUPLICATE = "duplicate"
+REJECTED = "rejected"
+
+
+@dataclass
+class SignalItem:
+    """One signal of a webhook request on its way through process_signals()"""
+    index: int
+    signal: WebhookSignal
+    status: str = PENDING
+    status_code: int = 200
+    detail: Optional[str] = None
+    idempotency_key: Optional[str] = None
+    claimed: bool = False            # owns its idempotency key
+    signal_id: Optional[str] = None
+    response: Optional[dict] = None  # response data (accepted or cached duplicate)
+
+    def reject(self, status_code: int, detail: str, status: str = REJECTED):
+        self.status = status
+        self.status_code = status_code
+        self.detail = detail
+
+    def result(self) -> dict:
+        """Per-item entry of a /webhook/batch response"""
+        if self.response is not None:
+            return {
+                "index": self.index,
+                "status_code": 200,
+                "status": self.status,
+                "signal_id": self.response.get("signal_id"),
+                "message": self.response.get("message", "")
+            }
+        return {
+            "index": self.index,
+            "status_code": self.status_code,
+            "status": self.status,
+            "signal_id": None,
+            "message": self.detail
+        }
+
+
 @router.post("/webhook", response_model=WebhookResponse)
 async def receive_webhook(
     signal: WebhookSignal,
@@ -69,83 +124,311 @@ async def receive_webhook(
         logger.warning(f"Invalid passphrase from {request.client.host}")
         raise HTTPException(status_code=401, detail="Invalid passphrase")
 
-    # TEST MODE: Skip all validations and redis operations
-    if settings.test_mode.enabled:
-        logger.info(f"[TEST MODE] Receiving signal: {signal.action} {signal.ticker}")
+    # Last price for risk sizing (authenticated payloads only)
+    get_price_store().update(signal.ticker, signal.entry_price, "webhook")
 
-        # Generate signal ID
-        signal_id = generate_signal_id(signal)
-        checksum = generate_checksum(signal, signal_id)
-
-        # Round stop_loss and take_profit to integers (Japanese stocks use integer prices)
-        stop_loss_int = round(signal.stop_loss) if signal.stop_loss is not None else None
-        take_profit_int = round(signal.take_profit) if signal.take_profit is not None else None
-
-        # Create signal in database (PENDING state)
-        expires_at = datetime.now() + timedelta(minutes=settings.signal.expiration_minutes)
-        db_signal = Signal(
-            signal_id=signal_id,
-            action=signal.action,
-            ticker=signal.ticker,
-            quantity=signal.quantity,
-            price=signal.price,
-            entry_price=signal.entry_price,
-            stop_loss=stop_loss_int,
-            take_profit=take_profit_int,
-            atr=signal.atr,
-            rr_ratio=signal.rr_ratio,
-            rsi=signal.rsi,
-            state=SignalState.PENDING,
-            checksum=checksum,
-            passphrase_valid=True,
-            expires_at=expires_at
-        )
-        db.add(db_signal)
-        db.commit()
-        db.refresh(db_signal)
+    item = process_signals([signal], request.client.host, db)[0]
+    if item.response is None:
+        raise HTTPException(status_code=item.status_code, detail=item.detail)
+    return FastJSONResponse(item.response)
+
+
+@router.post("/webhook/batch", response_model=WebhookBatchResponse)
+async def receive_webhook_batch(
+    signals: List[WebhookSignal],
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """
+    Receive several signals (e.g. one alert per ticker) in one request
 
-        logger.info(f"[TEST MODE] Signal {signal_id} created - NO VALIDATIONS, NO REDIS")
+    The array is validated as a whole (one invalid item -> 422). Each signal
+    then goes through the same checks as POST /webhook; accepted signals are
+    stored in one transaction, each in its own savepoint (a signal_id that
+    already exists rejects only that item with 409). Per-item results carry
+    the status code the single endpoint would have answered.
+    """
+    settings = get_settings()
 
-        return WebhookResponse(
-            status="success",
-            signal_id=signal_id,
-            message="[TEST MODE] Signal received and queued (no validations, no redis)",
-            timestamp=datetime.now()
+    if not signals:
+        raise HTTPException(status_code=400, detail="Empty batch")
+    if len(signals) > settings.signal.batch_max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(signals)} signals (max {settings.signal.batch_max_size})"
         )
 
-    # 2. Deduplication check
-    dedup_service = DeduplicationService()
-    idempotency_key = dedup_service.generate_idempotency_key(
-        signal.timestamp,
-        signal.ticker,
-        signal.action
+    # 1. Validate passphrase (the request is authenticated as a whole)
+    if any(signal.passphrase != settings.security.webhook_secret for signal in signals):
+        logger.warning(f"Invalid passphrase in batch from {request.client.host}")
+        raise HTTPException(status_code=401, detail="Invalid passphrase")
+
+    for signal in signals:
+        get_price_store().update(signal.ticker, signal.entry_price, "webhook")
+
+    items = process_signals(signals, request.client.host, db)
+    accepted = sum(1 for item in items if item.status == SUCCESS)
+    logger.info(f"Webhook batch from {request.client.host}: {accepted}/{len(items)} accepted")
+
+    return FastJSONResponse({
+        "accepted": accepted,
+        "rejected": len(items) - accepted,
+        "results": [item.result() for item in items],
+        "timestamp": datetime.now()
+    })
+
+
+@router.post("/webhook/test", response_model=WebhookResponse)
+async def test_webhook(
+    signal: WebhookSignal,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """
+    Test webhook endpoint (dry run - doesn't create signal)
+
+    Useful for testing TradingView webhook configuration
+    """
+    settings = get_settings()
+
+    # Validate passphrase
+    if signal.passphrase != settings.security.webhook_secret:
+        logger.warning(f"Test webhook: Invalid passphrase from {request.client.host}")
+        raise HTTPException(status_code=401, detail="Invalid passphrase")
+
+    logger.info(f"Test webhook received: {signal.action} {signal.ticker}")
+
+    return WebhookResponse(
+        status="test_success",
+        signal_id="test_signal_id",
+        message="Test webhook received successfully (dry run)",
+        timestamp=datetime.now()
     )
 
-    if dedup_service.is_duplicate(idempotency_key):
-        # Return cached response
-        cached = dedup_service.get_cached_response(idempotency_key)
+
+def process_signals(signals: List[WebhookSignal], source_ip: str, db: Session) -> List[SignalItem]:
+    """
+    Batched core of the webhook endpoints (steps 2-11)
+
+    Idempotency keys and cooldowns are claimed with one pipelined Redis call
+    each, and all accepted signals are stored in one commit. A rejection only
+    affects its own item.
+
+    Raises:
+        HTTPException: 503 in multi-worker mode while Redis is unreachable
+            (claims cannot be shared by the workers; nothing is stored)
+        Exception: Database error while storing (no signal of the batch is stored)
+
+    Returns:
+        One SignalItem per signal, in order
+    """
+    items = [SignalItem(index, signal) for index, signal in enumerate(signals)]
+
+    # TEST MODE: Skip all validations and redis operations
+    if get_settings().test_mode.enabled:
+        _store_test_signals(items, db)
+        return items
+
+    # 2. Deduplication: within the batch, then atomically across requests and workers
+    dedup_service = DeduplicationService()
+    seen = set()
+    for item in items:
+        item.idempotency_key = dedup_service.generate_idempotency_key(
+            item.signal.timestamp,
+            item.signal.ticker,
+            item.signal.action
+        )
+        if item.idempotency_key in seen:
+            item.reject(409, "Duplicate of an earlier signal in the batch", DUPLICATE)
+        seen.add(item.idempotency_key)
+
+    fresh = [item for item in items if item.status == PENDING]
+    try:
+        claims = dedup_service.claim_many([item.idempotency_key for item in fresh])
+    except SharedStateUnavailable as e:
+        raise _shared_state_error(e)
+    for item, claimed in zip(fresh, claims):
+        if claimed:
+            item.claimed = True
+            continue
+        cached = dedup_service.get_cached_response(item.idempotency_key)
         if cached:
-            logger.info(f"Duplicate request detected: {idempotency_key}")
-            return WebhookResponse(**cached)
+            logger.info(f"Duplicate request detected: {item.idempotency_key}")
+            item.status = DUPLICATE
+            item.response = cached
+        else:
+            logger.info(f"Duplicate request in progress: {item.idempotency_key}")
+            item.reject(409, "Duplicate request in progress", DUPLICATE)
+
+    claimed_items = [item for item in items if item.claimed]
+    try:
+        _accept_signals(claimed_items, source_ip, db)
+    except Exception as e:
+        # Failed: a retry of the same alerts is evaluated again
+        for item in claimed_items:
+            dedup_service.release(item.idempotency_key)
+        if isinstance(e, SharedStateUnavailable):
+            raise _shared_state_error(e)
+        raise
+
+    for item in claimed_items:
+        if item.status == SUCCESS:
+            # Cache response for idempotency
+            dedup_service.mark_processed(item.idempotency_key, item.response)
+        else:
+            # Rejected: a retry of the same alert is evaluated again
+            dedup_service.release(item.idempotency_key)
+
+    return items
+
+
+def _shared_state_error(error: SharedStateUnavailable) -> HTTPException:
+    """Multi-worker claims fail closed: refuse the request instead of claiming locally"""
+    logger.error(f"Webhook refused: {error}")
+    return HTTPException(
+        status_code=503,
+        detail="Shared state (Redis) unavailable, retry later",
+        headers={"Retry-After": "5"}
+    )
+
+
+def _accept_signals(items: List[SignalItem], source_ip: str, db: Session):
+    """
+    Run the acceptance checks and store the passing signals as PENDING (steps 3-11)
 
-    # 3. Market hours check
+    Rejections are recorded on the items.
+    """
+    if not items:
+        return
+    settings = get_settings()
+
+    # 3. Market hours check (one answer for the whole batch)
     market_hours_service = MarketHoursService()
     market_check = market_hours_service.should_accept_signal()
 
-    if not market_check["accept"]:
-        if market_check["action"] == "REJECT":
-            log_risk_violation(f"market_hours_{market_check['reason']}", signal.ticker)
-            raise HTTPException(
-                status_code=400,
-                detail=f"Signal rejected: {market_check['reason']}"
-            )
-        # QUEUE action will be handled below
+    if not market_check["accept"] and market_check["action"] == "REJECT":
+        for item in items:
+            log_risk_violation(f"market_hours_{market_check['reason']}", item.signal.ticker)
+            item.reject(400, f"Signal rejected: {market_check['reason']}")
+        return
+    # QUEUE action: signals are stored as usual
 
-    # 4. Generate signal ID
-    signal_id = generate_signal_id(signal)
+    cooldown_service = CooldownService()
+    day_trading_service = DayTradingCheckService(db)
+    signal_ids = set()
+    # Sell quantity per ticker taken by earlier signals of the batch
+    selling = defaultdict(int)
+
+    for item in items:
+        signal = item.signal
+
+        # 4. Generate signal ID
+        item.signal_id = generate_signal_id(signal)
+        if item.signal_id in signal_ids:
+            item.reject(409, f"Duplicate signal_id in batch: {item.signal_id}", DUPLICATE)
+            continue
+
+        try:
+            _check_signal(signal, db, cooldown_service, day_trading_service, selling[signal.ticker])
+        except HTTPException as e:
+            item.reject(e.status_code, e.detail)
+            continue
+
+        signal_ids.add(item.signal_id)
+        if signal.action == "sell":
+            selling[signal.ticker] += signal.quantity
+
+    passed = [item for item in items if item.status == PENDING]
+    if not passed:
+        return
+
+    # Start cooldowns atomically, one round trip (check_cooldown is only a read)
+    claims = cooldown_service.claim_cooldowns([(item.signal.ticker, item.signal.action) for item in passed])
+
+    stored = []
+    for item, claimed in zip(passed, claims):
+        if not claimed:
+            log_risk_violation("cooldown_claimed_concurrently", item.signal.ticker)
+            item.reject(429, "Cooldown active: claimed by a concurrent signal")
+            continue
+
+        # 7-8. Checksum and signal row
+        db_signal = _build_signal(item.signal, item.signal_id, settings)
+
+        # Savepoint per signal: a signal_id that is already stored (ids have
+        # second resolution, or a concurrent request) rejects only this item
+        try:
+            with db.begin_nested():
+                # 9-10. CSV log and "Signal received" line: outbox event in the same commit
+                enqueue_event(db, "signal_received", item.signal_id, {
+                    "signal": {
+                        "signal_id": item.signal_id,
+                        "action": db_signal.action,
+                        "ticker": db_signal.ticker,
+                        "quantity": db_signal.quantity,
+                        "price": db_signal.price,
+                        "entry_price": db_signal.entry_price,
+                        "stop_loss": db_signal.stop_loss,
+                        "take_profit": db_signal.take_profit,
+                        "atr": db_signal.atr,
+                        "rr_ratio": db_signal.rr_ratio,
+                        "rsi": db_signal.rsi,
+                        "checksum": db_signal.checksum,
+                        "state": SignalState.PENDING.value
+                    },
+                    "source_ip": source_ip
+                })
+                db.add(db_signal)
+                start_trace(db, item.signal_id, db_signal.ticker, db_signal.action, item.signal.timestamp)
+        except IntegrityError:
+            logger.warning(f"Signal rejected: signal_id already exists: {item.signal_id}")
+            cooldown_service.release_cooldown(item.signal.ticker, item.signal.action)
+            item.reject(409, f"Duplicate signal_id: {item.signal_id}", DUPLICATE)
+            continue
+        stored.append(item)
+
+    if not stored:
+        return
+
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+        for item in stored:
+            cooldown_service.release_cooldown(item.signal.ticker, item.signal.action)
+        raise
+    notify_outbox()
+
+    # 11. Prepare response
+    stats = get_stats_aggregator()
+    for item in stored:
+        stats.record_signal(item.signal.ticker, item.signal.action)
+        item.status = SUCCESS
+        item.response = {
+            "status": "success",
+            "signal_id": item.signal_id,
+            "message": "Signal received and queued",
+            "timestamp": datetime.now()
+        }
+
+
+def _check_signal(
+    signal: WebhookSignal,
+    db: Session,
+    cooldown_service: CooldownService,
+    day_trading_service: DayTradingCheckService,
+    selling: int = 0
+):
+    """
+    Per-signal acceptance checks (steps 5-6.5)
 
+    Args:
+        selling: Quantity of the ticker already being sold by earlier signals of the batch
+
+    Raises:
+        HTTPException: Signal rejected
+    """
     # 5. Cooldown check
-    cooldown_service = CooldownService()
     cooldown_result = cooldown_service.check_cooldown(signal.ticker, signal.action)
 
     if not cooldown_result["allowed"]:
@@ -166,16 +449,16 @@ async def receive_webhook(
                 status_code=400,
                 detail=f"Cannot sell {signal.ticker}: No position held"
             )
-        elif position.quantity < signal.quantity:
-            logger.warning(f"Sell signal rejected: Insufficient position for {signal.ticker} (have {position.quantity}, trying to sell {signal.quantity})")
+        available = position.quantity - selling
+        if available < signal.quantity:
+            logger.warning(f"Sell signal rejected: Insufficient position for {signal.ticker} (have {available}, trying to sell {signal.quantity})")
             log_risk_violation("insufficient_position", signal.ticker)
             raise HTTPException(
                 status_code=400,
-                detail=f"Cannot sell {signal.quantity} shares of {signal.ticker}: Only {position.quantity} shares held"
+                detail=f"Cannot sell {signal.quantity} shares of {signal.ticker}: Only {available} shares held"
             )
 
     # 6.5. Day trading check (差金決済チェック)
-    day_trading_service = DayTradingCheckService(db)
     day_trading_ok, day_trading_reason = day_trading_service.check_day_trading(
         signal.ticker,
         signal.action
@@ -188,17 +471,19 @@ async def receive_webhook(
             detail=f"差金決済違反: {day_trading_reason}"
         )
 
+
+def _build_signal(signal: WebhookSignal, signal_id: str, settings) -> Signal:
+    """PENDING Signal row for an accepted webhook signal"""
     # 7. Generate checksum
     checksum = generate_checksum(signal, signal_id)
 
-    # 8. Create signal in database
-    expires_at = datetime.now() + timedelta(minutes=settings.signal.expiration_minutes)
+    expires_at = clock.now() + timedelta(minutes=settings.signal.expiration_minutes)
 
     # Round stop_loss and take_profit to integers (Japanese stocks use integer prices)
     stop_loss_int = round(signal.stop_loss) if signal.stop_loss is not None else None
     take_profit_int = round(signal.take_profit) if signal.take_profit is not None else None
 
-    db_signal = Signal(
+    return Signal(
         signal_id=signal_id,
         action=signal.action,
         ticker=signal.ticker,
@@ -210,86 +495,48 @@ async def receive_webhook(
         atr=signal.atr,
         rr_ratio=signal.rr_ratio,
         rsi=signal.rsi,
+        exit_reason=signal.exit_reason,
+        priority=signal_priority(settings.signal.priority, signal.action, signal.ticker, signal.exit_reason),
         state=SignalState.PENDING,
         checksum=checksum,
         passphrase_valid=True,
+        created_at=clock.now(),  # sub-second: orders the pending queue within a priority
         expires_at=expires_at
     )
 
-    db.add(db_signal)
-    db.commit()
-    db.refresh(db_signal)
-
-    # 9. Log to CSV file
-    csv_logger = CSVLoggerService()
-    csv_logger.log_signal(
-        signal_data={
-            "signal_id": signal_id,
-            "action": signal.action,
-            "ticker": signal.ticker,
-            "quantity": signal.quantity,
-            "price": signal.price,
-            "entry_price": signal.entry_price,
-            "stop_loss": stop_loss_int,
-            "take_profit": take_profit_int,
-            "atr": signal.atr,
-            "rr_ratio": signal.rr_ratio,
-            "rsi": signal.rsi,
-            "checksum": checksum,
-            "state": SignalState.PENDING.value
-        },
-        source_ip=request.client.host
-    )
-
-    # 10. Set cooldown
-    cooldown_service.set_cooldown(signal.ticker, signal.action)
 
-    # 11. Log signal received
-    log_signal_received(
-        signal_id=signal_id,
-        ticker=signal.ticker,
-        action=signal.action,
-        quantity=signal.quantity,
-        entry_price=signal.entry_price
-    )
-
-    # 12. Prepare response
-    response_data = {
-        "status": "success",
-        "signal_id": signal_id,
-        "message": "Signal received and queued",
-        "timestamp": datetime.now()
-    }
-
-    # Cache response for idempotency
-    dedup_service.mark_processed(idempotency_key, response_data)
-
-    return WebhookResponse(**response_data)
-
-
-@router.post("/webhook/test", response_model=WebhookResponse)
-async def test_webhook(
-    signal: WebhookSignal,
-    request: Request,
-    db: Session = Depends(get_db)
-):
-    """
-    Test webhook endpoint (dry run - doesn't create signal)
-
-    Useful for testing TradingView webhook configuration
-    """
+def _store_test_signals(items: List[SignalItem], db: Session):
+    """TEST MODE: store every signal as PENDING without checks or Redis"""
     settings = get_settings()
+    stored = []
+    for item in items:
+        signal = item.signal
+        logger.info(f"[TEST MODE] Receiving signal: {signal.action} {signal.ticker}")
 
-    # Validate passphrase
-    if signal.passphrase != settings.security.webhook_secret:
-        logger.warning(f"Test webhook: Invalid passphrase from {request.client.host}")
-        raise HTTPException(status_code=401, detail="Invalid passphrase")
+        item.signal_id = generate_signal_id(signal)
+        if any(other.signal_id == item.signal_id for other in stored):
+            item.reject(409, f"Duplicate signal_id in batch: {item.signal_id}", DUPLICATE)
+            continue
+        db_signal = _build_signal(signal, item.signal_id, settings)
+        try:
+            with db.begin_nested():
+                db.add(db_signal)
+                start_trace(db, item.signal_id, db_signal.ticker, db_signal.action, signal.timestamp)
+        except IntegrityError:
+            item.reject(409, f"Duplicate signal_id: {item.signal_id}", DUPLICATE)
+            continue
+        stored.append(item)
 
-    logger.info(f"Test webhook received: {signal.action} {signal.ticker}")
+    db.commit()
 
-    return WebhookResponse(
-        status="test_success",
-        signal_id="test_signal_id",
-        message="Test webhook received successfully (dry run)",
-        timestamp=datetime.now()
-    )
+    stats = get_stats_aggregator()
+    for item in stored:
+        logger.info(f"[TEST MODE] Signal {item.signal_id} created - NO VALIDATIONS, NO REDIS")
+        stats.record_signal(item.signal.ticker, item.signal.action)
+        item.status = SUCCESS
+        item.response = {
+            "status": "success",
+            "signal_id": item.signal_id,
+            "message": "[TEST MODE] Signal received and queued (no validations, no redis)",
+            "timestamp": datetime.now()
+        }
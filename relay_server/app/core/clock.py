@@ -0,0 +1,87 @@
+"""
+Clock for trading decisions
+
+Services that depend on "now" (market hours, signal expiry, daily limits,
+cooldown TTLs) read time through this module instead of datetime.now(),
+so tools such as the signal replay can run the pipeline on a virtual clock.
+"""
+import time
+from datetime import datetime, date, timedelta, tzinfo
+from typing import Optional
+
+
+class SystemClock:
+    """Wall clock (default)"""
+
+    def now(self, tz: Optional[tzinfo] = None) -> datetime:
+        return datetime.now(tz)
+
+    def timestamp(self) -> float:
+        return time.time()
+
+
+class VirtualClock(SystemClock):
+    """
+    Clock anchored to an arbitrary instant
+
+    Advances at `speed` x real time from the last anchor (speed=0 freezes
+    it between explicit set() calls).
+    """
+
+    def __init__(self, start: datetime, speed: float = 1.0):
+        if start.tzinfo is None:
+            start = start.astimezone()
+        self.speed = speed
+        self._anchor_virtual = start
+        self._anchor_real = time.perf_counter()
+
+    def set(self, instant: datetime):
+        """Jump the clock to the given instant"""
+        if instant.tzinfo is None:
+            instant = instant.astimezone()
+        self._anchor_virtual = instant
+        self._anchor_real = time.perf_counter()
+
+    def _current(self) -> datetime:
+        elapsed = (time.perf_counter() - self._anchor_real) * self.speed
+        return self._anchor_virtual + timedelta(seconds=elapsed)
+
+    def now(self, tz: Optional[tzinfo] = None) -> datetime:
+        current = self._current()
+        if tz is None:
+            # Naive local time, like datetime.now()
+            return current.astimezone().replace(tzinfo=None)
+        return current.astimezone(tz)
+
+    def timestamp(self) -> float:
+        return self._current().timestamp()
+
+
+# Global clock instance
+_clock: SystemClock = SystemClock()
+
+
+def get_clock() -> SystemClock:
+    """Get the active clock"""
+    return _clock
+
+
+def set_clock(clock: Optional[SystemClock]):
+    """Install a clock (None restores the wall clock)"""
+    global _clock
+    _clock = clock or SystemClock()
+
+
+def now(tz: Optional[tzinfo] = None) -> datetime:
+    """Current time on the active clock"""
+    return _clock.now(tz)
+
+
+def today() -> date:
+    """Current local date on the active clock"""
+    return _clock.now().date()
+
+
+def timestamp() -> float:
+    """Current POSIX timestamp on the active clock"""
+    return _clock.timestamp()
@@ -2,8 +2,9 @@
 Configuration management for Kabuto Relay Server
 """
 import yaml
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Optional, List
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings
 
@@ -13,6 +14,9 @@ class ServerConfig(BaseModel):
     port: int = 5000
     debug: bool = False
     workers: int = 4
+    multi_worker: bool = False   # run `workers` processes (shared state in Redis / PostgreSQL)
+    startup_timeout_seconds: float = 30.0    # per startup step (database, Redis, ...)
+    shutdown_timeout_seconds: float = 30.0   # drain in-flight requests + flush queues
 
 
 class SecurityConfig(BaseModel):
@@ -25,6 +29,8 @@ class SecurityConfig(BaseModel):
 class DatabaseConfig(BaseModel):
     url: str
     echo: bool = False
+    pool_size: int = 5        # per worker (not used for SQLite)
+    max_overflow: int = 10
 
 
 class RedisConfig(BaseModel):
@@ -33,6 +39,11 @@ class RedisConfig(BaseModel):
     db: int = 0
     password: Optional[str] = None
     decode_responses: bool = True
+    socket_connect_timeout: float = 1.0
+    socket_timeout: float = 1.0
+    breaker_failure_threshold: int = 3     # consecutive errors before using local cache only
+    breaker_reset_seconds: float = 10.0    # wait before probing Redis again
+    local_cache_max_entries: int = 100000
 
 
 class TestModeConfig(BaseModel):
@@ -47,6 +58,8 @@ class RiskControlConfig(BaseModel):
     max_daily_entries: int = 5
     max_daily_trades: int = 15
     max_trades_per_hour: int = 5
+    max_trades_per_hour_per_ticker: int = 0  # 0 = no per-ticker limit
+    hourly_limit_backend: str = "redis"      # "redis" (sorted sets) or "memory" (per-minute buckets)
     max_consecutive_losses: int = 5
     max_daily_loss: int = -50000
 
@@ -58,9 +71,19 @@ class CooldownConfig(BaseModel):
     sell_any_ticker: int = 0
 
 
+class SignalPriorityConfig(BaseModel):
+    # Summed into signals.priority on arrival; the pending poll returns higher first, then oldest first
+    actions: Dict[str, int] = {"sell": 100, "buy": 0}
+    exit_reasons: Dict[str, int] = {"stop_loss": 50, "market_close": 30, "take_profit": 10}
+    tickers: Dict[str, int] = {}
+
+
 class SignalConfig(BaseModel):
     expiration_minutes: int = 15
     max_pending_signals: int = 100
+    poll_limit: int = 20               # signals per GET /api/signals/pending (?limit= overrides)
+    batch_max_size: int = 50           # signals per POST /webhook/batch
+    priority: SignalPriorityConfig = SignalPriorityConfig()
 
 
 class MarketHoursConfig(BaseModel):
@@ -72,6 +95,14 @@ class MarketHoursConfig(BaseModel):
     off_hours_action: str = "REJECT"
 
 
+class RequestLogRule(BaseModel):
+    path: str                           # fnmatch pattern, e.g. "/api/signals/pending"
+    status: Optional[int] = None        # only match this status code
+    sample_every: int = 1               # log 1 of N matching requests
+    max_per_minute: Optional[int] = None
+    level: Optional[str] = None         # log level for matching requests
+
+
 class LoggingConfig(BaseModel):
     level: str = "INFO"
     format: str = "json"
@@ -79,6 +110,19 @@ class LoggingConfig(BaseModel):
     rotation: str = "1 day"
     retention: str = "90 days"
     compression: str = "gz"
+    console_level: Optional[str] = None
+    # Bounded queue in front of the file sink (records beyond this are dropped and counted)
+    queue_size: int = 10000
+    # Request logging: errors / slow requests are always logged, others per rule
+    request_log_level: str = "INFO"
+    slow_request_ms: float = 1000
+    request_log_rules: List[RequestLogRule] = [
+        RequestLogRule(path="/api/signals/pending", status=204, sample_every=60),
+        RequestLogRule(path="*/heartbeat", sample_every=10),
+    ]
+    # Daily signal CSV files and state journal
+    signal_log_dir: str = "./data/logs"
+    signal_log_flush_interval: float = 2.0
 
 
 class AlertsConfig(BaseModel):
@@ -107,6 +151,90 @@ class AlertsConfig(BaseModel):
 class HeartbeatConfig(BaseModel):
     timeout_seconds: int = 300
     alert_enabled: bool = True
+    flush_interval_seconds: int = 30   # write in-memory heartbeats to DB
+    check_interval_seconds: int = 30   # timeout monitor interval
+    backend: str = "memory"            # "memory" (per process) or "redis" (shared by workers)
+
+
+class PriceStoreConfig(BaseModel):
+    seed_file: str = "./data/last_prices.csv"  # loaded on startup, saved on shutdown
+    max_age_seconds: int = 259200              # older prices are stale (3 days covers weekends)
+    stale_action: str = "use_last"             # use_last / fallback / reject
+    fallback_price: float = 1000               # yen per share when no usable price
+    backend: str = "memory"                    # "memory" (per process) or "redis" (shared by workers)
+
+
+class TickerMasterConfig(BaseModel):
+    file: str = "./ticker_master.csv"   # CSV or Parquet: ticker,name,sector,lot_size
+    default_lot_size: int = 100         # tickers missing from the master
+    reload_check_seconds: float = 30.0  # mtime check interval for hot reload
+
+
+class RateLimitRule(BaseModel):
+    name: str
+    paths: List[str]          # fnmatch patterns, e.g. "/api/signals/pending"
+    key: str = "ip"           # ip / api_key (requests without the configured API key fall back to ip)
+    rate: float = 1.0         # tokens refilled per second
+    burst: int = 10           # bucket capacity
+
+
+class RateLimitConfig(BaseModel):
+    enabled: bool = True
+    backend: str = "memory"   # memory / redis (buckets shared by all workers)
+    rules: List[RateLimitRule] = []
+
+
+class CommissionTier(BaseModel):
+    up_to: Optional[float] = None  # amount upper bound in yen (inclusive), None = no bound
+    fee: float = 0                 # fee in yen (tax included)
+    rate: float = 0                # plus rate * amount
+    step_amount: float = 0         # plus step_fee per step_amount above the previous tier's bound
+    step_fee: float = 0
+
+
+class CommissionConfig(BaseModel):
+    plan: str = "none"                      # none / per_trade / daily_flat
+    per_trade: List[CommissionTier] = []    # tiers by the execution amount
+    daily_flat: List[CommissionTier] = []   # tiers by the day's total traded amount
+
+
+class ConfigReloadConfig(BaseModel):
+    watch: bool = True                  # reload config.yaml when it changes
+    check_interval_seconds: float = 5.0
+
+
+class OutboxConfig(BaseModel):
+    poll_interval_seconds: float = 1.0  # relay runs at least this often (and right after commits)
+    batch_size: int = 200
+    max_attempts: int = 10              # then the event is parked and reported in /status
+    retry_base_seconds: float = 1.0     # backoff after a failed attempt: base x 2^(attempts-1)
+    retry_max_seconds: float = 300.0    # backoff cap
+    retention_hours: int = 24           # delivered events kept for inspection
+
+
+class ArchiveConfig(BaseModel):
+    enabled: bool = False               # background archiving (tools.archive runs it by hand)
+    retention_days: int = 90            # signals / execution_log / daily_stats kept in the hot tables
+    batch_size: int = 1000              # rows moved per transaction
+    interval_hours: float = 24.0        # background run interval (skipped during trading windows)
+
+
+class RuntimeMonitorConfig(BaseModel):
+    enabled: bool = True
+    interval_seconds: float = 0.5       # event-loop lag sample interval
+    lag_warning_ms: float = 200.0       # stall longer than this -> warning with the loop thread's stack
+    stack_log_interval_seconds: float = 30.0  # at most one stack warning per interval
+    window_samples: int = 240           # lag / GC pause samples kept for percentiles
+
+
+class TracingConfig(BaseModel):
+    enabled: bool = True                # per-signal hop timings (signal_timings table)
+    retention_days: int = 30            # older timings deleted by the archiver
+
+
+class StatsConfig(BaseModel):
+    flush_interval_seconds: float = 2.0  # in-memory counter deltas -> stats_aggregates
+    read_cache_seconds: float = 1.0      # multi_worker: /api/admin/stats reads the table, cached
 
 
 class Settings(BaseSettings):
@@ -115,7 +243,7 @@ class Settings(BaseSettings):
     security: SecurityConfig
     database: DatabaseConfig
     redis: RedisConfig
-    test_mode: TestModeConfig
+    test_mode: TestModeConfig = TestModeConfig()
     risk_control: RiskControlConfig
     cooldown: CooldownConfig
     signal: SignalConfig
@@ -123,6 +251,16 @@ class Settings(BaseSettings):
     logging: LoggingConfig
     alerts: AlertsConfig
     heartbeat: HeartbeatConfig
+    price_store: PriceStoreConfig = PriceStoreConfig()
+    ticker_master: TickerMasterConfig = TickerMasterConfig()
+    commission: CommissionConfig = CommissionConfig()
+    rate_limit: RateLimitConfig = RateLimitConfig()
+    config_reload: ConfigReloadConfig = ConfigReloadConfig()
+    outbox: OutboxConfig = OutboxConfig()
+    archive: ArchiveConfig = ArchiveConfig()
+    runtime_monitor: RuntimeMonitorConfig = RuntimeMonitorConfig()
+    tracing: TracingConfig = TracingConfig()
+    stats: StatsConfig = StatsConfig()
 
     class Config:
         env_file = ".env"
@@ -147,10 +285,16 @@ def load_config(config_path: str = "config.yaml") -> Settings:
 # Global settings instance
 settings: Optional[Settings] = None
 
+# Settings pinned for the current request (set by app.core.snapshot)
+request_settings: ContextVar[Optional[Settings]] = ContextVar("request_settings", default=None)
+
 
 def get_settings() -> Settings:
-    """Get global settings instance"""
+    """Get settings (the request's pinned version inside a request)"""
     global settings
+    pinned = request_settings.get()
+    if pinned is not None:
+        return pinned
     if settings is None:
         settings = load_config()
     return settings
@@ -0,0 +1,85 @@
+"""
+Deployment mode - one process, or several uvicorn workers sharing state
+
+server.multi_worker runs server.workers processes. All state that outlives
+a request must then be shared by the workers:
+
+- signals, positions, lots, daily stats, kill switch, blacklist: database
+  (PostgreSQL; row locks on signal / position updates)
+- idempotency keys, cooldowns: Redis (claimed with SET NX)
+- hourly trade counts: risk_control.hourly_limit_backend: redis
+- rate limit buckets: rate_limit.backend: redis
+- heartbeats: heartbeat.backend: redis
+- last prices: price_store.backend: redis
+- notification throttle: Redis (SET NX)
+- signal CSV files: whole-row appends under an flock
+
+Per worker by design: config snapshot and ticker master (each worker
+reloads the files), request-log sampling and the reject / rate-limited
+counters in /status.
+
+A multi-worker server refuses to start while any shared backing is missing.
+
+While Redis becomes unreachable at runtime (circuit open), the hybrid cache
+serves reads from each worker's local mirror, but claims fail closed: the
+webhook answers 503 instead of claiming an idempotency key or cooldown in
+one worker's memory, where another worker would not see it. The
+notification throttle fails open (a notification may be sent by several
+workers) and outage alerts are sent by every worker.
+"""
+import os
+from typing import Dict, List
+
+from app.core.config import Settings
+
+
+def multi_worker_problems(settings: Settings, redis_available: bool = True) -> List[str]:
+    """
+    Settings under which workers would diverge or race
+
+    Checked at startup. Redis failing later is not a startup problem: claims
+    then fail closed (webhooks answer 503 until Redis is back).
+    """
+    problems = []
+    if settings.database.url.startswith("sqlite"):
+        problems.append("database.url: SQLite does not support writes from several processes")
+    if not redis_available:
+        problems.append("redis: not reachable")
+    if settings.rate_limit.enabled and settings.rate_limit.backend != "redis":
+        problems.append("rate_limit.backend must be redis")
+    if settings.risk_control.hourly_limit_backend != "redis":
+        problems.append("risk_control.hourly_limit_backend must be redis")
+    if settings.heartbeat.backend != "redis":
+        problems.append("heartbeat.backend must be redis")
+    if settings.price_store.backend != "redis":
+        problems.append("price_store.backend must be redis")
+    return problems
+
+
+def resolve_workers(settings: Settings) -> int:
+    """Number of uvicorn workers to run (1 unless multi-worker mode)"""
+    if settings.server.debug or not settings.server.multi_worker:
+        return 1
+    return max(settings.server.workers, 1)
+
+
+def check_deployment(settings: Settings, redis_available: bool):
+    """
+    Refuse to start a multi-worker server without shared state
+
+    Raises:
+        RuntimeError: multi_worker is set and a shared backing is missing
+    """
+    if not settings.server.multi_worker:
+        return
+    problems = multi_worker_problems(settings, redis_available)
+    if problems:
+        raise RuntimeError("server.multi_worker: " + "; ".join(problems))
+
+
+def deployment_info(settings: Settings) -> Dict:
+    return {
+        "mode": "multi_worker" if settings.server.multi_worker else "single",
+        "workers": resolve_workers(settings),
+        "pid": os.getpid()
+    }
@@ -0,0 +1,156 @@
+"""
+IP Allowlist - security.allowed_ips enforcement
+
+The CIDR list is compiled with the settings snapshot into sorted, merged integer ranges per
+address family; a lookup is one bisect. The middleware is plain ASGI and
+answers 403 from the connection scope alone, so requests from other
+sources are rejected before the body is read or validated.
+
+An empty list, or a list containing 0.0.0.0/0 and ::/0, allows everything.
+"""
+import ipaddress
+import json
+import threading
+from bisect import bisect_right
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from app.core.logging import logger
+from app.core.snapshot import get_snapshot
+
+# Distinct sources tracked individually in the reject counters
+MAX_TRACKED_SOURCES = 10000
+
+
+def _merge(ranges: List[Tuple[int, int]]) -> Tuple[List[int], List[int]]:
+    starts, ends = [], []
+    for start, end in sorted(ranges):
+        if ends and start <= ends[-1] + 1:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+
+class IPAllowlist:
+    """
+    Compiled allowlist (IPv4 / IPv6)
+    """
+
+    def __init__(self, entries: List[str]):
+        ranges = {4: [], 6: []}
+        for entry in entries:
+            try:
+                network = ipaddress.ip_network(str(entry).strip(), strict=False)
+            except ValueError as e:
+                raise ValueError(f"Invalid security.allowed_ips entry {entry!r}: {e}")
+            ranges[network.version].append(
+                (int(network.network_address), int(network.broadcast_address))
+            )
+
+        self.entries = list(entries)
+        self._ranges = {version: _merge(r) for version, r in ranges.items()}
+        self.allow_all = not entries or (
+            self._ranges[4] == ([0], [2 ** 32 - 1]) and self._ranges[6] == ([0], [2 ** 128 - 1])
+        )
+
+    def is_allowed(self, host: Optional[str]) -> bool:
+        if self.allow_all:
+            return True
+        try:
+            address = ipaddress.ip_address(host)
+        except (TypeError, ValueError):
+            return False
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+
+        starts, ends = self._ranges[address.version]
+        value = int(address)
+        i = bisect_right(starts, value) - 1
+        return i >= 0 and value <= ends[i]
+
+
+class RejectCounter:
+    """Per-source reject counts (bounded)"""
+
+    def __init__(self, max_sources: int = MAX_TRACKED_SOURCES):
+        self.max_sources = max_sources
+        self.by_source: Dict[str, int] = {}
+        self.other = 0
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def add(self, source: str) -> int:
+        """Count a reject; returns the source's count (0 if not tracked)"""
+        with self._lock:
+            self.total += 1
+            count = self.by_source.get(source)
+            if count is None and len(self.by_source) >= self.max_sources:
+                self.other += 1
+                return 0
+            count = (count or 0) + 1
+            self.by_source[source] = count
+            return count
+
+    def stats(self, top: int = 10) -> Dict:
+        with self._lock:
+            worst = sorted(self.by_source.items(), key=lambda kv: kv[1], reverse=True)[:top]
+            return {
+                "rejected_total": self.total,
+                "rejected_sources": len(self.by_source),
+                "rejected_untracked": self.other,
+                "top_sources": dict(worst)
+            }
+
+
+_rejects = RejectCounter()
+
+
+def get_ip_allowlist() -> IPAllowlist:
+    """Compiled allowlist of the current settings snapshot"""
+    return get_snapshot().ip_allowlist
+
+
+def get_ip_allowlist_stats() -> Dict:
+    allowlist = get_ip_allowlist()
+    return {"allow_all": allowlist.allow_all, "entries": len(allowlist.entries), **_rejects.stats()}
+
+
+class IPAllowlistMiddleware:
+    """
+    Reject requests from sources outside security.allowed_ips with 403
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        client = scope.get("client")
+        host = client[0] if client else None
+        if get_ip_allowlist().is_allowed(host):
+            return await self.app(scope, receive, send)
+
+        count = _rejects.add(host or "unknown")
+        # First reject of a source, then every power of two
+        if count and count & (count - 1) == 0:
+            logger.warning(f"Rejected request from {host} (not in allowed_ips): {scope.get('path')} x{count}")
+
+        body = json.dumps({
+            "status": "error",
+            "error_code": "IP_NOT_ALLOWED",
+            "error_message": "Source IP not allowed",
+            "timestamp": datetime.now().isoformat()
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 403,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,197 @@
+"""
+Lifecycle - Startup / readiness / drain state of the server process
+
+Phases: starting -> ready -> draining -> stopped.
+
+- Startup runs independent initialisations concurrently, each under
+  server.startup_timeout_seconds (run_startup_steps). Work that is not
+  needed to serve the first request (notification setup, price seed and
+  ticker master preloads) runs after the server reports ready.
+- GET /live answers as long as the process serves HTTP; GET /ready only in
+  the ready phase, so a load balancer / supervisor routes traffic after
+  startup and stops before the drain.
+- Shutdown waits for in-flight requests, then flushes the queues (outbox,
+  CSV logs, heartbeats, price store, log queue) within
+  server.shutdown_timeout_seconds in total.
+"""
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional
+
+from app.core.logging import logger
+
+STARTING = "starting"
+READY = "ready"
+DRAINING = "draining"
+STOPPED = "stopped"
+
+# Probes answered in every phase and not counted as in-flight work
+PROBE_PATHS = ("/live", "/ready")
+
+
+class Lifecycle:
+    """Phase, step timings and in-flight request count of this process"""
+
+    def __init__(self):
+        self.phase = STARTING
+        self.started_at = time.monotonic()
+        self.ready_after_ms: Optional[float] = None
+        self.steps: Dict[str, Dict] = {}
+        self.in_flight = 0
+
+    def reset(self):
+        """Back to starting (the app's lifespan can run more than once per process)"""
+        self.__init__()
+
+    def set_phase(self, phase: str):
+        self.phase = phase
+        if phase == READY:
+            self.ready_after_ms = round((time.monotonic() - self.started_at) * 1000, 1)
+        logger.info(f"Lifecycle: {phase}")
+
+    def record(self, name: str, status: str, started: float, error: Optional[str] = None):
+        self.steps[name] = {
+            "status": status,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "error": error
+        }
+
+    @property
+    def is_ready(self) -> bool:
+        return self.phase == READY
+
+    async def wait_idle(self, timeout: float) -> bool:
+        """Wait until no request is in flight (True) or the timeout passes (False)"""
+        deadline = time.monotonic() + timeout
+        while self.in_flight > 0 and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        return self.in_flight == 0
+
+    def info(self) -> Dict:
+        return {
+            "phase": self.phase,
+            "uptime_seconds": round(time.monotonic() - self.started_at, 1),
+            "ready_after_ms": self.ready_after_ms,
+            "in_flight": self.in_flight,
+            "steps": self.steps
+        }
+
+
+# Global lifecycle (one per worker process)
+_lifecycle = Lifecycle()
+
+
+def get_lifecycle() -> Lifecycle:
+    return _lifecycle
+
+
+async def run_step(name: str, fn: Callable, timeout: float, critical: bool = True):
+    """
+    Run a blocking init/flush function in a thread under a timeout
+
+    Raises:
+        Exception: The step failed or timed out and is critical
+
+    Returns:
+        fn's result, or None if a non-critical step failed
+    """
+    started = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(asyncio.to_thread(fn), timeout)
+    except asyncio.TimeoutError:
+        _lifecycle.record(name, "timeout", started, f"no result after {timeout}s")
+        logger.error(f"{name}: timed out after {timeout}s")
+        if critical:
+            raise RuntimeError(f"{name} timed out after {timeout}s")
+        return None
+    except Exception as e:
+        _lifecycle.record(name, "error", started, str(e))
+        logger.error(f"{name} failed: {e}")
+        if critical:
+            raise
+        return None
+    _lifecycle.record(name, "ok", started)
+    return result
+
+
+async def run_startup_steps(steps: Dict[str, Callable], timeout: float, optional: tuple = ()) -> Dict:
+    """
+    Run independent blocking steps concurrently
+
+    Args:
+        steps: name -> function
+        timeout: Per-step timeout in seconds
+        optional: Names whose failure does not abort startup (result None)
+
+    Returns:
+        name -> result
+    """
+    names = list(steps)
+    results = await asyncio.gather(
+        *(run_step(name, steps[name], timeout, critical=name not in optional) for name in names)
+    )
+    return dict(zip(names, results))
+
+
+def start_deferred(steps: Dict[str, Callable], timeout: float) -> asyncio.Task:
+    """Run non-critical steps in the background once the server is ready"""
+    async def _run():
+        await run_startup_steps(steps, timeout, optional=tuple(steps))
+    return asyncio.create_task(_run())
+
+
+async def run_shutdown_steps(steps: List, deadline: float):
+    """
+    Run flush steps in order, each bounded by the remaining shutdown deadline
+
+    Args:
+        steps: [(name, function)]; a tuple of such pairs runs concurrently
+        deadline: time.monotonic() value by which shutdown must be done
+    """
+    for step in steps:
+        group = step if isinstance(step[0], tuple) else (step,)
+        remaining = max(deadline - time.monotonic(), 0.1)
+        await asyncio.gather(*(run_step(name, fn, remaining, critical=False) for name, fn in group))
+
+
+class InFlightMiddleware:
+    """
+    Count requests in flight (the drain waits for them) and refuse new
+    ones with 503 while the process is draining
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in PROBE_PATHS:
+            return await self.app(scope, receive, send)
+
+        if _lifecycle.phase in (DRAINING, STOPPED):
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [(b"content-type", b"application/json"), (b"retry-after", b"5"), (b"connection", b"close")]
+            })
+            await send({"type": "http.response.body", "body": b'{"detail":"Server is shutting down"}'})
+            return
+
+        _lifecycle.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _lifecycle.in_flight -= 1
+
+
+async def wait_for_tasks(tasks: List[asyncio.Task]):
+    """Cancel background tasks and wait for them to finish"""
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Background task failed during shutdown: {e}")
+
@@ -3,20 +3,37 @@ Logging configuration for Kabuto Relay Server
 """
 import sys
 import json
+import queue
+import re
+import fnmatch
+import threading
+import time
 from pathlib import Path
 from loguru import logger
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 from app.core.config import get_settings
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _dumps(obj: Dict[str, Any]) -> str:
+    """JSON-encode a log entry (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, default=str)
+
 
 def serialize_log_record(record: Dict[str, Any]) -> str:
     """
     Serialize log record to JSON format
     """
     log_entry = {
-        "timestamp": record["time"].strftime("%Y-%m-%dT%H:%M:%S.%f%z"),
+        "timestamp": record["time"].isoformat(),
         "level": record["level"].name,
         "module": record["name"],
         "function": record["function"],
@@ -24,57 +41,242 @@ def serialize_log_record(record: Dict[str, Any]) -> str:
         "message": record["message"],
     }
 
-    # Add extra fields if present
-    if record.get("extra"):
-        log_entry["extra"] = record["extra"]
+    # Add extra fields if present (kwargs passed as extra={...} are nested one level)
+    extra = record.get("extra")
+    if extra:
+        fields = {k: v for k, v in extra.items() if k != "extra" and not k.startswith("_")}
+        if isinstance(extra.get("extra"), dict):
+            fields.update(extra["extra"])
+        if fields:
+            log_entry["extra"] = fields
+
+    if record.get("exception") is not None:
+        log_entry["exception"] = str(record["exception"])
+
+    return _dumps(log_entry)
+
+
+def format_text_record(record: Dict[str, Any]) -> str:
+    """
+    Format log record as a plain text line
+    """
+    return (
+        f"{record['time']:%Y-%m-%d %H:%M:%S} | {record['level'].name: <8} | "
+        f"{record['name']}:{record['function']}:{record['line']} - {record['message']}"
+    )
+
 
-    return json.dumps(log_entry, ensure_ascii=False)
+class BoundedLogQueue:
+    """
+    Bounded, non-blocking front queue for the file log sink
+
+    Request threads only serialize and enqueue; a writer thread forwards
+    lines to the loguru file sink. When the queue is full, records are
+    dropped (never blocking a request) and counted per level.
+    """
+
+    FILE_MARKER = "_file_line"
+
+    def __init__(self, maxsize: int = 10000, formatter=None):
+        self.maxsize = maxsize
+        self.formatter = formatter or serialize_log_record
+        self._queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self.dropped: Dict[str, int] = {}
+        self.written = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def sink(self, message):
+        """loguru sink: enqueue serialized record without blocking"""
+        record = message.record
+        try:
+            self._queue.put_nowait((record["level"].name, self.formatter(record)))
+        except queue.Full:
+            level = record["level"].name
+            self.dropped[level] = self.dropped.get(level, 0) + 1
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        file_logger = logger.bind(**{self.FILE_MARKER: True})
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            level, line = item
+            file_logger.log(level, line)
+            self.written += 1
+            self._queue.task_done()
+
+    def stop(self, timeout: float = 5.0):
+        """Drain remaining records and stop the writer thread"""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "capacity": self.maxsize,
+            "written": self.written,
+            "dropped": dict(self.dropped),
+            "dropped_total": sum(self.dropped.values()),
+        }
+
+
+class RequestLogPolicy:
+    """
+    Per-endpoint sampling / rate limiting and level routing for request logs
+
+    Rules are compiled once from logging.request_log_rules. The first rule
+    matching (path, status) decides; unmatched requests are always logged.
+    Server errors, client errors and slow requests bypass sampling.
+    """
+
+    def __init__(self, rules: List[Any], default_level: str = "INFO", slow_request_ms: float = 1000):
+        self.default_level = default_level
+        self.slow_request_ms = slow_request_ms
+        self.rules = []
+        for rule in rules:
+            self.rules.append({
+                "pattern": re.compile(fnmatch.translate(rule.path)),
+                "status": rule.status,
+                "sample_every": max(rule.sample_every, 1),
+                "max_per_minute": rule.max_per_minute,
+                "level": rule.level or default_level,
+                "seen": 0,
+                "window_start": 0.0,
+                "window_count": 0,
+                "suppressed": 0,
+            })
+
+    def _match(self, path: str, status_code: int) -> Optional[Dict[str, Any]]:
+        for rule in self.rules:
+            if rule["status"] is not None and rule["status"] != status_code:
+                continue
+            if rule["pattern"].match(path):
+                return rule
+        return None
+
+    def decide(self, path: str, status_code: int, duration_ms: float):
+        """
+        Returns:
+            (level, suppressed_since_last) or None if the request is not logged
+        """
+        if status_code >= 500:
+            return "ERROR", 0
+        if status_code >= 400 or duration_ms >= self.slow_request_ms:
+            return "WARNING", 0
+
+        rule = self._match(path, status_code)
+        if rule is None:
+            return self.default_level, 0
+
+        rule["seen"] += 1
+        if rule["seen"] % rule["sample_every"] != 0:
+            rule["suppressed"] += 1
+            return None
+
+        if rule["max_per_minute"] is not None:
+            now = time.monotonic()
+            if now - rule["window_start"] >= 60:
+                rule["window_start"] = now
+                rule["window_count"] = 0
+            if rule["window_count"] >= rule["max_per_minute"]:
+                rule["suppressed"] += 1
+                return None
+            rule["window_count"] += 1
+
+        suppressed = rule["suppressed"]
+        rule["suppressed"] = 0
+        return rule["level"], suppressed
+
+
+# Global logging pipeline state
+_log_queue: Optional[BoundedLogQueue] = None
+_request_policy: Optional[RequestLogPolicy] = None
+
+
+def get_log_pipeline_stats() -> Dict[str, Any]:
+    """File log queue statistics (queued / written / dropped)"""
+    if _log_queue is None:
+        return {}
+    return _log_queue.stats()
+
+
+def shutdown_logging(timeout: float = 5.0):
+    """Flush the bounded log queue into the file sink"""
+    if _log_queue is not None:
+        _log_queue.stop(timeout)
+    logger.complete()
 
 
 def setup_logging():
     """
     Setup logging configuration
     """
+    global _log_queue, _request_policy
+
     settings = get_settings()
     log_config = settings.logging
 
     # Remove default logger
     logger.remove()
+    if _log_queue is not None:
+        _log_queue.stop()
 
     # Create log directory if it doesn't exist
     log_file_path = Path(log_config.file)
     log_file_path.parent.mkdir(parents=True, exist_ok=True)
 
+    marker = BoundedLogQueue.FILE_MARKER
+
+    def not_file_line(record):
+        return marker not in record["extra"]
+
+    def is_file_line(record):
+        return marker in record["extra"]
+
     # Console logger (human-readable)
     logger.add(
         sys.stdout,
-        level=log_config.level,
+        level=log_config.console_level or log_config.level,
         format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
         colorize=True,
+        filter=not_file_line,
     )
 
-    # File logger (JSON format)
-    if log_config.format == "json":
-        logger.add(
-            log_config.file,
-            level=log_config.level,
-            rotation=log_config.rotation,
-            retention=log_config.retention,
-            compression=log_config.compression,
-            serialize=True,
-            format="{message}",
-            enqueue=True,
-        )
-    else:
-        logger.add(
-            log_config.file,
-            level=log_config.level,
-            rotation=log_config.rotation,
-            retention=log_config.retention,
-            compression=log_config.compression,
-            format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-            enqueue=True,
-        )
+    # File logger: bounded front queue -> writer thread -> loguru file sink
+    formatter = serialize_log_record if log_config.format == "json" else format_text_record
+    _log_queue = BoundedLogQueue(log_config.queue_size, formatter)
+    logger.add(_log_queue.sink, level=log_config.level, format="{message}", filter=not_file_line)
+
+    logger.add(
+        log_config.file,
+        level=log_config.level,
+        rotation=log_config.rotation,
+        retention=log_config.retention,
+        # Workers share the file; only one could compress it on rotation
+        compression=None if settings.server.multi_worker else log_config.compression,
+        format="{message}",
+        enqueue=True,
+        filter=is_file_line,
+    )
+    _log_queue.start()
+
+    _request_policy = RequestLogPolicy(
+        log_config.request_log_rules,
+        default_level=log_config.request_log_level,
+        slow_request_ms=log_config.slow_request_ms,
+    )
 
     logger.info("Logging initialized")
 
@@ -88,9 +290,19 @@ def log_api_request(
     **kwargs
 ):
     """
-    Log API request
+    Log API request (subject to the per-endpoint sampling policy)
     """
-    logger.info(
+    level = "INFO"
+    if _request_policy is not None:
+        decision = _request_policy.decide(endpoint, status_code, duration_ms)
+        if decision is None:
+            return
+        level, suppressed = decision
+        if suppressed:
+            kwargs["sampled_out"] = suppressed
+
+    logger.log(
+        level,
         f"API Request: {method} {endpoint}",
         extra={
             "endpoint": endpoint,
@@ -135,7 +347,7 @@ def log_order_executed(signal_id: str, order_id: str, ticker: str, **kwargs):
 
 def log_risk_violation(reason: str, ticker: str = None, **kwargs):
     """
-    Log risk control violation
+    Log risk control violation (and count it in the dashboard stats)
     """
     logger.warning(
         f"Risk violation: {reason}",
@@ -145,6 +357,8 @@ def log_risk_violation(reason: str, ticker: str = None, **kwargs):
             **kwargs
         }
     )
+    from app.services.stats_aggregates import get_stats_aggregator
+    get_stats_aggregator().record_rejection(reason, ticker)
 
 
 def log_error(error_type: str, message: str, **kwargs):
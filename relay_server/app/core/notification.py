@@ -296,20 +296,11 @@ class NotificationManager:
             return True
 
         key = f"notification:last:{level}:{title}"
+        interval_seconds = max(int(self.frequency_limits.get(level, 30) * 60), 1)
 
         try:
-            last_notify_time_str = self.redis.get(key)
-
-            if not last_notify_time_str:
-                # 初回通知
-                return True
-
-            last_notify_time = datetime.fromisoformat(last_notify_time_str.decode() if isinstance(last_notify_time_str, bytes) else last_notify_time_str)
-            elapsed_minutes = (datetime.now() - last_notify_time).total_seconds() / 60
-
-            interval_minutes = self.frequency_limits.get(level, 30)
-
-            return elapsed_minutes >= interval_minutes
+            # SET NX: 間隔内に送信権を取れるのは1回だけ（複数ワーカーでも重複送信しない）
+            return bool(self.redis.set(key, datetime.now().isoformat(), nx=True, ex=interval_seconds))
 
         except Exception as e:
             logger.error(f"Error checking notification frequency: {e}")
@@ -327,9 +318,10 @@ class NotificationManager:
             return
 
         key = f"notification:last:{level}:{title}"
+        interval_seconds = max(int(self.frequency_limits.get(level, 30) * 60), 1)
         try:
-            # 24時間保持
-            self.redis.setex(key, 86400, datetime.now().isoformat())
+            # 頻度制限の間隔だけ保持
+            self.redis.setex(key, interval_seconds, datetime.now().isoformat())
         except Exception as e:
             logger.error(f"Error recording notification: {e}")
 
@@ -364,8 +356,9 @@ class NotificationManager:
         if self.email and level in ['ERROR', 'CRITICAL']:
             self.email.send(level, title, fields)
 
-        # 通知時刻を記録
-        self._record_notification(level, title)
+        # 通知時刻を記録（通常の送信は SET NX で記録済み）
+        if force or level == 'CRITICAL':
+            self._record_notification(level, title)
 
     def notify_signal_generation_failed(self, error: Exception):
         """信号生成失敗を通知"""
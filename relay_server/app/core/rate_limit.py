@@ -0,0 +1,275 @@
+"""
+Rate Limit - Per-source token buckets
+
+Rules (rate_limit.rules) map path patterns to a bucket keyed by client IP
+or API key. Only the configured API key (security.api_key) gets its own
+bucket; any other Bearer token is counted against the client IP, so
+rotating made-up tokens neither bypass the limit nor create buckets. The
+middleware is plain ASGI and answers 429 with Retry-After
+from the path and headers alone, before any body parsing, DB or Redis work
+in the endpoints.
+
+Backends:
+- memory: buckets in process (per worker)
+- redis: one hash per bucket updated by a Lua script, shared by all
+  workers; falls back to the in-process buckets while Redis is unavailable
+
+Rules are compiled into the settings snapshot (app.core.snapshot), so they
+change with a settings reload; bucket state is kept for rules that keep
+their name.
+"""
+import hashlib
+import hmac
+import json
+import math
+import re
+import threading
+import time
+from datetime import datetime
+from fnmatch import translate
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import RateLimitConfig, RateLimitRule
+from app.core.snapshot import get_snapshot
+
+BACKENDS = ("memory", "redis")
+KEYS = ("ip", "api_key")
+
+REDIS_KEY = "ratelimit:{rule}:{client}"
+
+# path -> matching rules, cleared when it grows past this (paths embed signal ids)
+PATH_CACHE_SIZE = 1024
+
+# Prune idle (already refilled) buckets every N new buckets
+PRUNE_EVERY = 1000
+
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local data = redis.call('HMGET', KEYS[1], 't', 'ts')
+local tokens = tonumber(data[1]) or burst
+local ts = tonumber(data[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 't', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+def _retry_after(tokens: float, rate: float) -> int:
+    return max(1, math.ceil((1 - tokens) / rate))
+
+
+class TokenBuckets:
+    """
+    In-process token buckets: key -> [tokens, last refill (monotonic)]
+    """
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[str, str], List[float]] = {}
+        self._lock = threading.Lock()
+        self._created = 0
+
+    def take(self, key: Tuple[str, str], rate: float, burst: int) -> Tuple[bool, float]:
+        """
+        Take one token
+
+        Returns:
+            (allowed, tokens left)
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(burst), now]
+                self._created += 1
+                if self._created % PRUNE_EVERY == 0:
+                    self._prune(now)
+            tokens = min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return True, bucket[0]
+            bucket[0] = tokens
+            return False, tokens
+
+    def _prune(self, now: float, idle_seconds: float = 3600):
+        stale = [k for k, (_, ts) in self._buckets.items() if now - ts > idle_seconds]
+        for k in stale:
+            del self._buckets[k]
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class CompiledRule:
+    def __init__(self, rule: RateLimitRule):
+        if rule.key not in KEYS:
+            raise ValueError(f"rate_limit rule {rule.name}: key must be one of {', '.join(KEYS)}")
+        if rule.rate <= 0 or rule.burst < 1:
+            raise ValueError(f"rate_limit rule {rule.name}: rate must be > 0 and burst >= 1")
+        self.name = rule.name
+        self.key = rule.key
+        self.rate = rule.rate
+        self.burst = rule.burst
+        self.pattern = re.compile("|".join(f"(?:{translate(p)})" for p in rule.paths))
+
+
+def compile_rules(config: RateLimitConfig) -> Tuple[CompiledRule, ...]:
+    """
+    Validate and compile rate_limit rules (part of the settings snapshot)
+
+    Raises:
+        ValueError: Invalid rule or backend
+    """
+    if config.backend not in BACKENDS:
+        raise ValueError(f"rate_limit.backend must be one of {', '.join(BACKENDS)}")
+    return tuple(CompiledRule(r) for r in config.rules)
+
+
+class RateLimiter:
+    """
+    Token buckets for the rules of the current settings snapshot
+
+    Buckets are keyed by rule name, so they carry over a settings reload for
+    rules that keep their name (removed rules' buckets age out).
+    """
+
+    def __init__(self):
+        self.buckets = TokenBuckets()
+        self.limited: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._path_cache: Dict[str, List[CompiledRule]] = {}
+        self._path_cache_version: Optional[int] = None
+
+    def _rules_for(self, snapshot, path: str) -> List[CompiledRule]:
+        if self._path_cache_version != snapshot.version:
+            self._path_cache = {}
+            self._path_cache_version = snapshot.version
+        rules = self._path_cache.get(path)
+        if rules is None:
+            rules = [r for r in snapshot.rate_limit_rules if r.pattern.match(path)]
+            if len(self._path_cache) >= PATH_CACHE_SIZE:
+                self._path_cache = {}
+            self._path_cache[path] = rules
+        return rules
+
+    def _take_redis(self, rule: CompiledRule, client: str) -> Optional[Tuple[bool, float]]:
+        from app.redis_cache import get_hybrid_cache
+
+        def _eval(redis_client):
+            return redis_client.eval(
+                TOKEN_BUCKET_LUA, 1, REDIS_KEY.format(rule=rule.name, client=client),
+                rule.rate, rule.burst, time.time()
+            )
+
+        ok, result = get_hybrid_cache().execute(_eval)
+        if not ok:
+            return None
+        return bool(int(result[0])), float(result[1])
+
+    def check(self, path: str, ip: Optional[str], api_key: Optional[str]) -> Optional[Tuple[str, int]]:
+        """
+        Take a token from every bucket the request falls into
+
+        Returns:
+            None if allowed, else (rule name, retry-after seconds)
+        """
+        snapshot = get_snapshot()
+        config = snapshot.settings.rate_limit
+        if not config.enabled:
+            return None
+        use_redis = config.backend == "redis"
+        valid_key = bool(api_key) and hmac.compare_digest(
+            api_key.encode(), snapshot.settings.security.api_key.encode())
+
+        for rule in self._rules_for(snapshot, path):
+            if rule.key == "api_key" and valid_key:
+                client = "key:" + hashlib.sha256(api_key.encode()).hexdigest()[:16]
+            else:
+                client = f"ip:{ip}"
+
+            taken = self._take_redis(rule, client) if use_redis else None
+            if taken is None:
+                taken = self.buckets.take((rule.name, client), rule.rate, rule.burst)
+
+            allowed, tokens = taken
+            if not allowed:
+                with self._lock:
+                    self.limited[rule.name] = self.limited.get(rule.name, 0) + 1
+                return rule.name, _retry_after(tokens, rule.rate)
+        return None
+
+    def stats(self) -> Dict:
+        snapshot = get_snapshot()
+        config = snapshot.settings.rate_limit
+        return {
+            "enabled": config.enabled and bool(snapshot.rate_limit_rules),
+            "backend": config.backend,
+            "config_version": snapshot.version,
+            "rules": {r.name: {"rate": r.rate, "burst": r.burst, "key": r.key} for r in snapshot.rate_limit_rules},
+            "limited": dict(self.limited),
+            "local_buckets": len(self.buckets)
+        }
+
+
+# Global rate limiter (bucket state; rules come from the settings snapshot)
+_rate_limiter = RateLimiter()
+
+
+def get_rate_limiter() -> RateLimiter:
+    return _rate_limiter
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class RateLimitMiddleware:
+    """
+    Answer 429 + Retry-After when a request's bucket is empty
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        limiter = get_rate_limiter()
+        client = scope.get("client")
+        auth = _header(scope, b"authorization")
+        api_key = auth[7:] if auth and auth.startswith("Bearer ") else None
+
+        limited = limiter.check(scope.get("path", ""), client[0] if client else None, api_key)
+        if limited is None:
+            return await self.app(scope, receive, send)
+
+        rule, retry_after = limited
+        body = json.dumps({
+            "status": "error",
+            "error_code": "RATE_LIMITED",
+            "error_message": f"Rate limit exceeded ({rule})",
+            "retry_after": retry_after,
+            "timestamp": datetime.now().isoformat()
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,214 @@
+"""
+Runtime Monitor - Event-loop lag, threadpool saturation and GC pauses
+
+Many handlers are `async def` but do blocking work (SQLAlchemy, Redis), so
+one slow request stalls every other request on the loop. This monitor
+makes that visible:
+
+- Loop lag: a task sleeps runtime_monitor.interval_seconds and measures how
+  late it wakes up.
+- Stall stacks: a watchdog thread sees when the loop task is overdue by more
+  than lag_warning_ms and logs the loop thread's current stack - the code
+  blocking the loop - while it is still blocked.
+- Threadpool: Starlette runs sync dependencies (get_db) and sync endpoints
+  on anyio's default thread limiter; borrowed / total tokens and waiting
+  tasks show when it is saturated. asyncio.to_thread work (outbox relay,
+  archiver) uses the loop's default executor, reported separately.
+- GC: pause time per collection (gc.callbacks).
+
+Reported in /status ("runtime") and GET /api/admin/runtime.
+"""
+import asyncio
+import gc
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import anyio.to_thread
+
+from app.core.config import get_settings
+from app.core.logging import logger
+
+# Innermost frames of the blocked loop thread included in the warning
+STACK_LIMIT = 25
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)
+    return round(ordered[index], 2)
+
+
+class RuntimeMonitor:
+    """Samples loop lag / threadpool depth and records GC pauses"""
+
+    def __init__(self):
+        window = get_settings().runtime_monitor.window_samples
+        self.lag_samples: deque = deque(maxlen=window)
+        self.gc_pauses: deque = deque(maxlen=window)
+        self.max_lag_ms = 0.0
+        self.stalls = 0
+        self.last_stall: Optional[Dict] = None
+        self.threadpool: Dict = {}
+        self.max_threadpool_waiting = 0
+        self.gc_collections = {0: 0, 1: 0, 2: 0}
+        self.gc_pause_total_ms = 0.0
+        self.gc_pause_max_ms = 0.0
+
+        self._tick: Optional[float] = None
+        self._reported_tick: Optional[float] = None
+        self._last_stack_log = 0.0
+        self._loop_thread_id: Optional[int] = None
+        self._gc_started: Optional[float] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    # ----- loop lag -----
+
+    def record_lag(self, lag_ms: float):
+        self.lag_samples.append(lag_ms)
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        if lag_ms >= get_settings().runtime_monitor.lag_warning_ms:
+            self.stalls += 1
+            self.last_stall = {"lag_ms": round(lag_ms, 1), "at": datetime.now().isoformat()}
+
+    def _watch(self):
+        """Watchdog thread: log the loop thread's stack while the loop is blocked"""
+        while True:
+            config = get_settings().runtime_monitor
+            check_interval = max(min(config.interval_seconds, config.lag_warning_ms / 1000) / 2, 0.02)
+            if self._stop.wait(check_interval):
+                return
+
+            tick = self._tick
+            if not config.enabled or tick is None or tick == self._reported_tick:
+                continue
+            overdue_ms = (time.monotonic() - tick - config.interval_seconds) * 1000
+            if overdue_ms < config.lag_warning_ms:
+                continue
+
+            self._reported_tick = tick
+            now = time.monotonic()
+            if now - self._last_stack_log < config.stack_log_interval_seconds:
+                continue
+            self._last_stack_log = now
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame, limit=-STACK_LIMIT)) if frame else "(unavailable)\n"
+            logger.warning(f"Event loop blocked for {overdue_ms:.0f} ms (still running), loop thread stack:\n{stack}")
+
+    # ----- threadpool -----
+
+    def sample_threadpool(self, loop: asyncio.AbstractEventLoop):
+        """Read the thread limiter / default executor (call on the loop)"""
+        limiter = anyio.to_thread.current_default_thread_limiter().statistics()
+        self.max_threadpool_waiting = max(self.max_threadpool_waiting, limiter.tasks_waiting)
+
+        executor = getattr(loop, "_default_executor", None)
+        work_queue = getattr(executor, "_work_queue", None)
+        self.threadpool = {
+            "sync_handlers": {
+                "borrowed": limiter.borrowed_tokens,
+                "total": limiter.total_tokens,
+                "waiting": limiter.tasks_waiting,
+                "max_waiting": self.max_threadpool_waiting
+            },
+            "background": {
+                "threads": len(getattr(executor, "_threads", ())),
+                "max_workers": getattr(executor, "_max_workers", None),
+                "queued": work_queue.qsize() if work_queue is not None else 0
+            }
+        }
+
+    # ----- GC -----
+
+    def _gc_callback(self, phase: str, info: Dict):
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+            return
+        if self._gc_started is None:
+            return
+        pause_ms = (time.perf_counter() - self._gc_started) * 1000
+        self._gc_started = None
+        generation = info.get("generation", 0)
+        self.gc_collections[generation] = self.gc_collections.get(generation, 0) + 1
+        self.gc_pauses.append(pause_ms)
+        self.gc_pause_total_ms += pause_ms
+        self.gc_pause_max_ms = max(self.gc_pause_max_ms, pause_ms)
+
+    # ----- task -----
+
+    async def run(self):
+        """Sample until cancelled (watchdog thread and GC hook live as long)"""
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        gc.callbacks.append(self._gc_callback)
+
+        try:
+            while True:
+                config = get_settings().runtime_monitor
+                self._tick = time.monotonic()
+                expected = loop.time() + config.interval_seconds
+                await asyncio.sleep(config.interval_seconds)
+                if not config.enabled:
+                    continue
+                self.record_lag(max(loop.time() - expected, 0.0) * 1000)
+                self.sample_threadpool(loop)
+        finally:
+            self._tick = None
+            self._stop.set()
+            if self._gc_callback in gc.callbacks:
+                gc.callbacks.remove(self._gc_callback)
+
+    def stats(self) -> Dict:
+        lags = list(self.lag_samples)
+        pauses = list(self.gc_pauses)
+        return {
+            "enabled": get_settings().runtime_monitor.enabled,
+            "loop_lag_ms": {
+                "last": round(lags[-1], 2) if lags else None,
+                "p50": _percentile(lags, 0.5),
+                "p99": _percentile(lags, 0.99),
+                "max": round(self.max_lag_ms, 2),
+                "samples": len(lags)
+            },
+            "stalls": self.stalls,
+            "last_stall": self.last_stall,
+            "threadpool": self.threadpool,
+            "gc": {
+                "collections": {str(gen): count for gen, count in self.gc_collections.items()},
+                "pause_ms": {
+                    "p50": _percentile(pauses, 0.5),
+                    "p99": _percentile(pauses, 0.99),
+                    "max": round(self.gc_pause_max_ms, 2),
+                    "total": round(self.gc_pause_total_ms, 1)
+                }
+            }
+        }
+
+
+# Global monitor (one per worker process)
+_monitor: Optional[RuntimeMonitor] = None
+
+
+def get_runtime_monitor() -> RuntimeMonitor:
+    global _monitor
+    if _monitor is None:
+        _monitor = RuntimeMonitor()
+    return _monitor
+
+
+async def run_runtime_monitor():
+    """Background task: loop lag / threadpool sampling with a stall watchdog"""
+    global _monitor
+    _monitor = RuntimeMonitor()
+    await _monitor.run()
@@ -0,0 +1,41 @@
+"""
+Serialization - Fast JSON for hot endpoints and the Redis idempotency cache
+
+orjson when installed (optional, same as the log pipeline), stdlib json
+otherwise. Endpoints that return FastJSONResponse skip FastAPI's
+response_model validation/encoding pass, so their payloads are built as
+plain dicts by the serializers in app/schemas.py, which mirror the models.
+"""
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode to compact UTF-8 JSON (datetimes as ISO 8601)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(
+        obj, ensure_ascii=False, separators=(",", ":"),
+        default=lambda o: o.isoformat() if hasattr(o, "isoformat") else str(o)
+    ).encode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """Decode JSON from str or bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps (content must already be plain data)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
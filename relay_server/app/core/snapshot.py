@@ -0,0 +1,226 @@
+"""
+Settings Snapshot - Hot-reloadable, precompiled configuration
+
+config.yaml is validated and compiled into an immutable, versioned snapshot:
+the Settings object plus everything that would otherwise be parsed per call
+(trading-window times, timezone, IP allowlist ranges, rate limit rules,
+commission tiers). A reload builds a complete new snapshot and swaps it in
+with one assignment; if anything fails to validate the current snapshot
+stays active.
+
+Each request pins the snapshot current at its start (contextvar), so
+get_settings() / get_snapshot() return one consistent version for the whole
+request even if a reload happens meanwhile. The version is sent back in the
+X-Config-Version response header.
+
+Sections bound at startup (server, database, redis, logging, alerts,
+ticker_master file) are reloaded into the snapshot but only take effect
+after a restart; a reload that changes them logs a warning.
+"""
+import asyncio
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import time as dtime, tzinfo
+from typing import Dict, Optional, Tuple
+
+import pytz
+
+from app.core import config as config_module
+from app.core.config import Settings, get_settings, load_config
+from app.core.logging import logger
+
+CONFIG_PATH = "config.yaml"
+
+RESTART_ONLY_SECTIONS = ("server", "database", "redis", "logging", "alerts", "ticker_master")
+
+# Defaults used by MarketHoursService before windows were precompiled
+DEFAULT_SAFE_WINDOWS = {
+    "morning": ("09:30", "11:20"),
+    "afternoon": ("13:00", "14:30"),
+}
+
+
+@dataclass(frozen=True)
+class SettingsSnapshot:
+    version: int
+    settings: Settings
+    loaded_at: float
+    timezone: tzinfo
+    safe_windows: Tuple[Tuple[dtime, dtime], ...]
+    ip_allowlist: object       # app.core.ip_allowlist.IPAllowlist
+    rate_limit_rules: tuple    # app.core.rate_limit.CompiledRule
+    commission: object         # app.services.commission.CommissionSchedule
+
+
+def _parse_hhmm(value: str) -> dtime:
+    try:
+        h, m = map(int, str(value).split(":"))
+        return dtime(h, m)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid time {value!r} (expected HH:MM)")
+
+
+def parse_safe_windows(windows: Dict) -> Tuple[Tuple[dtime, dtime], ...]:
+    """market_hours.safe_trading_windows -> ((start, end), ...)"""
+    parsed = []
+    for name, (default_start, default_end) in DEFAULT_SAFE_WINDOWS.items():
+        window = windows.get(name, {})
+        start = _parse_hhmm(window.get("start", default_start))
+        end = _parse_hhmm(window.get("end", default_end))
+        if start > end:
+            raise ValueError(f"safe_trading_windows.{name}: start is after end")
+        parsed.append((start, end))
+    return tuple(parsed)
+
+
+def compile_settings(settings: Settings, version: int) -> SettingsSnapshot:
+    """
+    Validate and precompile settings
+
+    Raises:
+        ValueError: Invalid configuration
+    """
+    from app.core.ip_allowlist import IPAllowlist
+    from app.core.rate_limit import compile_rules
+    from app.services.commission import CommissionSchedule
+
+    try:
+        timezone = pytz.timezone(settings.market_hours.timezone)
+    except pytz.UnknownTimeZoneError:
+        raise ValueError(f"Unknown market_hours.timezone: {settings.market_hours.timezone}")
+
+    commission = settings.commission
+    return SettingsSnapshot(
+        version=version,
+        settings=settings,
+        loaded_at=time.time(),
+        timezone=timezone,
+        safe_windows=parse_safe_windows(settings.market_hours.safe_trading_windows),
+        ip_allowlist=IPAllowlist(settings.security.allowed_ips),
+        rate_limit_rules=compile_rules(settings.rate_limit),
+        commission=CommissionSchedule(commission.plan, commission.per_trade, commission.daily_flat)
+    )
+
+
+_snapshot: Optional[SettingsSnapshot] = None
+_request_snapshot: ContextVar[Optional[SettingsSnapshot]] = ContextVar("request_snapshot", default=None)
+_reload_lock = threading.Lock()
+_config_mtime: Optional[float] = None
+
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def init_settings_snapshot() -> SettingsSnapshot:
+    """Compile the loaded settings as version 1"""
+    global _snapshot, _config_mtime
+    _snapshot = compile_settings(get_settings(), 1)
+    _config_mtime = _mtime(CONFIG_PATH)
+    logger.info("Settings snapshot v1 compiled")
+    return _snapshot
+
+
+def get_snapshot() -> SettingsSnapshot:
+    """Snapshot pinned for the current request, else the current one"""
+    pinned = _request_snapshot.get()
+    if pinned is not None:
+        return pinned
+    if _snapshot is None:
+        return init_settings_snapshot()
+    return _snapshot
+
+
+def reload_settings(config_path: str = CONFIG_PATH) -> SettingsSnapshot:
+    """
+    Load, validate and compile config.yaml, then swap it in
+
+    Raises:
+        Exception: Load or validation error (the current snapshot stays active)
+    """
+    global _snapshot, _config_mtime
+    with _reload_lock:
+        current = _snapshot or init_settings_snapshot()
+        mtime = _mtime(config_path) if config_path == CONFIG_PATH else _config_mtime
+        new_settings = load_config(config_path)
+        snapshot = compile_settings(new_settings, current.version + 1)
+
+        changed = [
+            name for name in RESTART_ONLY_SECTIONS
+            if getattr(current.settings, name) != getattr(new_settings, name)
+        ]
+
+        config_module.settings = new_settings
+        _snapshot = snapshot
+        _config_mtime = mtime
+
+    logger.info(f"Settings reloaded: v{snapshot.version}")
+    if changed:
+        logger.warning(f"Changed settings take effect after restart: {', '.join(changed)}")
+    return snapshot
+
+
+def snapshot_info(snapshot: Optional[SettingsSnapshot] = None) -> Dict:
+    snapshot = snapshot or get_snapshot()
+    return {
+        "version": snapshot.version,
+        "loaded_at": snapshot.loaded_at,
+        "config_path": CONFIG_PATH,
+        "watch": snapshot.settings.config_reload.watch,
+        "restart_only_sections": list(RESTART_ONLY_SECTIONS)
+    }
+
+
+async def run_config_watcher():
+    """Reload config.yaml when its mtime changes (errors keep the current snapshot)"""
+    global _config_mtime
+    while True:
+        config = get_snapshot().settings.config_reload
+        await asyncio.sleep(config.check_interval_seconds)
+        if not get_snapshot().settings.config_reload.watch:
+            continue
+
+        mtime = _mtime(CONFIG_PATH)
+        if mtime is None or mtime == _config_mtime:
+            continue
+        try:
+            reload_settings()
+        except Exception as e:
+            _config_mtime = mtime  # do not retry until the file changes again
+            logger.error(f"Settings reload failed, keeping v{get_snapshot().version}: {e}")
+
+
+class SettingsSnapshotMiddleware:
+    """
+    Pin the current snapshot for the request and report its version
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        snapshot = get_snapshot()
+        version = str(snapshot.version).encode()
+        snapshot_token = _request_snapshot.set(snapshot)
+        settings_token = config_module.request_settings.set(snapshot.settings)
+
+        async def send_with_version(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-config-version", version)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_version)
+        finally:
+            config_module.request_settings.reset(settings_token)
+            _request_snapshot.reset(snapshot_token)
@@ -0,0 +1,95 @@
+"""
+Tabular responses - Fixed-column TSV / CSV for the Excel VBA client
+
+Selected with the Accept header; JSON stays the default.
+
+    Accept: text/tab-separated-values   -> TSV (split with VBA Split())
+    Accept: text/csv                    -> CSV (RFC 4180 quoting)
+
+Layout (UTF-8, LF line endings):
+
+    #kabuto<TAB><kind><TAB>v<version><TAB><count><TAB><timestamp>
+    <column names>
+    <one row per record>
+
+Columns of a version are fixed; new columns are only appended (and bump
+the version). Empty field = null. In TSV, tabs and line breaks inside
+values are replaced with spaces so every line is exactly one record.
+"""
+import csv
+import io
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence
+
+from fastapi.responses import Response
+
+TSV_MEDIA_TYPE = "text/tab-separated-values"
+CSV_MEDIA_TYPE = "text/csv"
+
+SCHEMA_VERSION = 1
+
+_FORMATS = {TSV_MEDIA_TYPE: "tsv", "text/tsv": "tsv", CSV_MEDIA_TYPE: "csv"}
+_TSV_ESCAPES = str.maketrans({"\t": " ", "\r": " ", "\n": " "})
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """
+    Tabular format requested by an Accept header
+
+    Returns:
+        "tsv", "csv", or None for JSON (default, */*, application/json)
+    """
+    if not accept:
+        return None
+    for part in accept.split(","):
+        media_type = part.split(";", 1)[0].strip().lower()
+        if media_type in _FORMATS:
+            return _FORMATS[media_type]
+        if media_type in ("application/json", "*/*", "application/*"):
+            return None
+    return None
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "value"):  # Enum
+        return str(value.value)
+    return str(value)
+
+
+def render(fmt: str, kind: str, columns: Sequence[str], rows: Iterable[dict],
+           timestamp: Optional[datetime] = None) -> bytes:
+    """Render records as TSV or CSV with the schema header"""
+    rows = list(rows)
+    header = ["#kabuto", kind, f"v{SCHEMA_VERSION}", str(len(rows)), _cell(timestamp or datetime.now())]
+
+    if fmt == "tsv":
+        lines = ["\t".join(header), "\t".join(columns)]
+        lines.extend(
+            "\t".join(_cell(row.get(c)).translate(_TSV_ESCAPES) for c in columns)
+            for row in rows
+        )
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(header)
+    writer.writerow(columns)
+    writer.writerows([_cell(row.get(c)) for c in columns] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+class TabularResponse(Response):
+    """TSV / CSV response (see module docstring)"""
+
+    def __init__(self, fmt: str, kind: str, columns: List[str], rows: Iterable[dict],
+                 timestamp: Optional[datetime] = None, status_code: int = 200):
+        media_type = TSV_MEDIA_TYPE if fmt == "tsv" else CSV_MEDIA_TYPE
+        super().__init__(
+            content=render(fmt, kind, columns, rows, timestamp),
+            status_code=status_code,
+            media_type=media_type  # charset=utf-8 is appended for text/*
+        )
@@ -1,15 +1,19 @@
 """
 Database setup and session management
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 from contextlib import contextmanager
 from typing import Generator
 
 from app.core.config import get_settings
+from app.core.logging import logger
 from app.models import Base
 
+# pg_advisory_xact_lock key for schema creation
+SCHEMA_LOCK_KEY = 0x6B616275746F
+
 # Global engine and session maker
 engine = None
 SessionLocal = None
@@ -26,25 +30,70 @@ def init_database():
     # Create engine
     if settings.database.url.startswith("sqlite"):
         # SQLite configuration
+        # StaticPool (one shared connection) only for in-memory databases; a
+        # file database gets a connection per thread so concurrent requests
+        # do not commit / roll back each other's transactions
+        in_memory = settings.database.url in ("sqlite://", "sqlite:///:memory:")
         engine = create_engine(
             settings.database.url,
-            connect_args={"check_same_thread": False},
-            poolclass=StaticPool,
+            connect_args={"check_same_thread": False, "timeout": 30},
+            poolclass=StaticPool if in_memory else None,
             echo=settings.database.echo,
         )
     else:
         # PostgreSQL or other databases
+        # Each worker has its own pool: workers x (pool_size + max_overflow) connections
         engine = create_engine(
             settings.database.url,
             pool_pre_ping=True,
+            pool_size=settings.database.pool_size,
+            max_overflow=settings.database.max_overflow,
             echo=settings.database.echo,
         )
 
     # Create session factory
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
+    # Create all tables (serialized across workers starting at the same time)
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        Base.metadata.create_all(bind=conn)
+        add_missing_columns(conn)
+
+
+def add_missing_columns(conn):
+    """
+    Add model columns and indexes missing from existing tables
+
+    create_all() only creates missing tables; databases created by an older
+    version get new columns here (nullable or with a server default only).
+    Archive tables (<table>_archive_YYYYMM) get the same columns.
+    """
+    inspector = inspect(conn)
+    existing = set(inspector.get_table_names())
+    preparer = conn.dialect.identifier_preparer
+
+    for table in Base.metadata.sorted_tables:
+        targets = [name for name in existing if name == table.name or name.startswith(table.name + "_archive_")]
+        for name in targets:
+            present = {c["name"] for c in inspector.get_columns(name)}
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                ddl = f"ALTER TABLE {preparer.quote(name)} ADD COLUMN {preparer.quote(column.name)} " \
+                      f"{column.type.compile(dialect=conn.dialect)}"
+                default = getattr(column.server_default, "arg", None)
+                if isinstance(default, str):
+                    ddl += f" DEFAULT '{default}'"
+                    if not column.nullable:
+                        ddl += " NOT NULL"
+                conn.execute(text(ddl))
+                logger.info(f"Database: added column {name}.{column.name}")
+
+        if table.name in existing:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -6,14 +6,32 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import time
 from datetime import datetime
 
 from app.core.config import get_settings
-from app.core.logging import setup_logging, log_api_request, logger
+from app.core.logging import setup_logging, shutdown_logging, log_api_request, logger
 from app.core.notification import init_notification_manager
-from app.database import init_database
+from app.core.ip_allowlist import IPAllowlistMiddleware
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.deployment import check_deployment, multi_worker_problems, resolve_workers
+from app.core.snapshot import SettingsSnapshotMiddleware, init_settings_snapshot, run_config_watcher
+from app.core.runtime_monitor import run_runtime_monitor
+from app.core.lifecycle import (
+    DRAINING, READY, STOPPED, InFlightMiddleware, get_lifecycle, run_shutdown_steps,
+    run_startup_steps, run_step, start_deferred, wait_for_tasks
+)
+from app.database import init_database, get_db_context
 from app.redis_client import init_redis
+from app.redis_cache import init_hybrid_cache
+from app.services.csv_logger import close_signal_logs
+from app.services.outbox import drain_outbox, run_outbox_relay
+from app.services.archive import run_archiver
+from app.services.price_store import init_price_store, preload_price_store, save_price_store
+from app.services.ticker_master import init_ticker_master
+from app.services.heartbeat import get_heartbeat_tracker, flush_heartbeats, run_heartbeat_monitor
+from app.services.stats_aggregates import flush_stats_aggregates, load_stats_aggregates, run_stats_flusher
 from app.api import webhook, signals, health, admin
 
 
@@ -22,6 +40,9 @@ async def lifespan(app: FastAPI):
     """
     Lifespan context manager for startup and shutdown events
     """
+    lifecycle = get_lifecycle()
+    lifecycle.reset()
+
     # Startup
     logger.info("=" * 60)
     logger.info("Kabuto Relay Server Starting...")
@@ -35,39 +56,108 @@ async def lifespan(app: FastAPI):
     settings = get_settings()
     logger.info(f"Configuration loaded from config.yaml")
 
-    # Initialize database
-    init_database()
-    logger.info("Database initialized")
+    # Settings snapshot (IP allowlist, rate limit rules, trading windows,
+    # commission tiers compiled once per config version)
+    init_settings_snapshot()
 
-    # Initialize Redis
-    try:
-        redis_client = init_redis()
+    # Database (create_all) and Redis (connect + ping) are independent: run concurrently
+    startup_timeout = settings.server.startup_timeout_seconds
+    started = await run_startup_steps(
+        {"database": init_database, "redis": init_redis},
+        startup_timeout,
+        optional=("redis",)
+    )
+    logger.info("Database initialized")
+    redis_client = started["redis"]
+    if redis_client is not None:
         logger.info(f"Redis initialized: {settings.redis.host}:{settings.redis.port}")
-    except Exception as e:
-        logger.error(f"Failed to initialize Redis: {e}")
+    else:
         logger.warning("Continuing without Redis (some features may be disabled)")
-        redis_client = None
 
-    # Initialize notification manager
-    try:
-        init_notification_manager(settings, redis_client)
-        logger.info("Notification manager initialized")
-    except Exception as e:
-        logger.error(f"Failed to initialize notification manager: {e}")
-        logger.warning("Continuing without notifications")
+    # Several workers need every piece of shared state outside the process
+    check_deployment(settings, redis_available=redis_client is not None)
+
+    # Idempotency keys / cooldowns: Redis + local TTL mirror behind a circuit breaker
+    init_hybrid_cache(redis_available=redis_client is not None)
+    if redis_client is None:
+        logger.warning("Redis circuit open: using local TTL cache until Redis recovers")
+
+    # Last-price store (seed file merged after readiness, newest quote wins)
+    init_price_store(load_seed=False)
+
+    # Heartbeat tracker (in-memory, flushed to DB by the monitor task)
+    def _load_heartbeats():
+        with get_db_context() as db:
+            get_heartbeat_tracker().load(db, settings.heartbeat.timeout_seconds)
+
+    await run_step("heartbeats", _load_heartbeats, startup_timeout)
+    heartbeat_task = asyncio.create_task(run_heartbeat_monitor())
+    logger.info("Heartbeat monitor started")
+
+    # Dashboard counters: today's totals, deltas flushed by the task
+    # (a failed load only undercounts this worker's view; deltas stay additive)
+    await run_step("stats", load_stats_aggregates, startup_timeout, critical=False)
+    stats_task = asyncio.create_task(run_stats_flusher())
+
+    # config.yaml hot reload
+    config_task = asyncio.create_task(run_config_watcher())
+
+    # Outbox relay (CSV log / audit lines of committed state changes)
+    outbox_task = asyncio.create_task(run_outbox_relay())
+    logger.info("Outbox relay started")
+
+    # Archive of old signals / executions / daily stats (archive.enabled)
+    archive_task = asyncio.create_task(run_archiver())
+
+    # Event-loop lag / threadpool / GC pause monitor (runtime_monitor.enabled)
+    monitor_task = asyncio.create_task(run_runtime_monitor())
 
     logger.info(f"Server: {settings.server.host}:{settings.server.port}")
     logger.info(f"Database: {settings.database.url}")
     logger.info(f"Redis: {settings.redis.host}:{settings.redis.port}")
 
+    lifecycle.set_phase(READY)
+
+    # Not needed for the first request: notification manager, price seed,
+    # ticker master (loaded on first use if a request gets there first)
+    deferred_task = start_deferred({
+        "notifications": lambda: init_notification_manager(settings, redis_client),
+        "price_seed": preload_price_store,
+        "ticker_master": init_ticker_master,
+    }, startup_timeout)
+
     logger.info("=" * 60)
-    logger.info("Kabuto Relay Server Started Successfully")
+    logger.info(f"Kabuto Relay Server Started Successfully ({lifecycle.ready_after_ms} ms)")
     logger.info("=" * 60)
 
     yield
 
-    # Shutdown
+    # Shutdown: refuse new requests, let in-flight ones finish, then flush
+    # every queue, all within server.shutdown_timeout_seconds
     logger.info("Shutting down Kabuto Relay Server...")
+    lifecycle.set_phase(DRAINING)
+    deadline = time.monotonic() + settings.server.shutdown_timeout_seconds
+
+    if not await lifecycle.wait_idle(deadline - time.monotonic()):
+        logger.warning(f"Drain deadline reached with {lifecycle.in_flight} requests in flight")
+    await wait_for_tasks([
+        deferred_task, monitor_task, archive_task, outbox_task, config_task, stats_task, heartbeat_task
+    ])
+
+    await run_shutdown_steps([
+        (
+            ("flush_heartbeats", flush_heartbeats),
+            ("flush_stats", flush_stats_aggregates),
+            ("save_price_store", save_price_store),
+            ("drain_outbox", lambda: drain_outbox(max(deadline - time.monotonic(), 0.1))),
+        ),
+        # After the outbox: its last batch writes to the CSV buffers
+        ("close_signal_logs", close_signal_logs),
+    ], deadline)
+
+    lifecycle.set_phase(STOPPED)
+    logger.info(f"Shutdown complete: {lifecycle.info()['steps']}")
+    shutdown_logging(max(deadline - time.monotonic(), 1.0))
 
 
 # Create FastAPI application
@@ -94,13 +184,13 @@ async def log_requests(request: Request, call_next):
     """
     Log all HTTP requests
     """
-    start_time = time.time()
+    start_time = time.perf_counter()
 
     # Process request
     response = await call_next(request)
 
     # Calculate duration
-    duration_ms = (time.time() - start_time) * 1000
+    duration_ms = (time.perf_counter() - start_time) * 1000
 
     # Log request
     log_api_request(
@@ -114,6 +204,19 @@ async def log_requests(request: Request, call_next):
     return response
 
 
+# Per-source rate limits (429 before any endpoint work)
+app.add_middleware(RateLimitMiddleware)
+
+# Source IP allowlist - runs before logging and body parsing
+app.add_middleware(IPAllowlistMiddleware)
+
+# In-flight request count for the shutdown drain (503 while draining)
+app.add_middleware(InFlightMiddleware)
+
+# Settings snapshot - added last so every later layer sees one config version
+app.add_middleware(SettingsSnapshotMiddleware)
+
+
 # Exception handlers
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -180,6 +283,8 @@ async def root():
             "webhook": "/webhook",
             "signals": "/api/signals/pending",
             "health": "/health",
+            "live": "/live",
+            "ready": "/ready",
             "status": "/status",
             "docs": "/docs",
             "redoc": "/redoc"
@@ -201,13 +306,18 @@ if __name__ == "__main__":
 
     settings = get_settings()
 
-    # SQLite does not support multi-process writes safely.
-    workers = 1 if settings.database.url.startswith("sqlite") else settings.server.workers
+    # One worker unless server.multi_worker (checked again by each worker at startup)
+    problems = multi_worker_problems(settings) if settings.server.multi_worker else []
+    if problems:
+        raise SystemExit("server.multi_worker: " + "; ".join(problems))
+    workers = resolve_workers(settings)
 
     uvicorn.run(
         "app.main:app",
         host=settings.server.host,
         port=settings.server.port,
         reload=settings.server.debug,
-        workers=1 if settings.server.debug else workers
+        workers=workers,
+        # Wait this long for in-flight requests before the lifespan shutdown runs
+        timeout_graceful_shutdown=int(settings.server.shutdown_timeout_seconds)
     )
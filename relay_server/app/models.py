@@ -1,7 +1,7 @@
 """
 Database models for Kabuto Relay Server
 """
-from sqlalchemy import Column, String, Integer, Float, Boolean, DateTime, Enum as SQLEnum, Text, JSON
+from sqlalchemy import Column, String, Integer, Float, Boolean, Date, DateTime, Enum as SQLEnum, Text, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -36,6 +36,10 @@ class Signal(Base):
     atr = Column(Float)
     rr_ratio = Column(Float)
     rsi = Column(Float)
+    exit_reason = Column(String(30))  # sell alerts: stop_loss / take_profit / market_close
+
+    # Pending queue order (higher first, then oldest first; see app.services.signal_priority)
+    priority = Column(Integer, nullable=False, default=0, server_default="0")
 
     # State management
     state = Column(SQLEnum(SignalState), default=SignalState.PENDING, index=True)
@@ -55,6 +59,10 @@ class Signal(Base):
     # Error tracking
     error_message = Column(Text)
 
+    __table_args__ = (
+        Index("ix_signals_state_priority", "state", "priority", "created_at"),
+    )
+
     def __repr__(self):
         return f"<Signal(signal_id='{self.signal_id}', action='{self.action}', ticker='{self.ticker}', state='{self.state}')>"
 
@@ -84,6 +92,25 @@ class Position(Base):
         return f"<Position(ticker='{self.ticker}', quantity={self.quantity}, avg_cost={self.avg_cost})>"
 
 
+class PositionLot(Base):
+    """
+    Open buy lot - FIFO cost basis for realized PnL
+    """
+    __tablename__ = "position_lots"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    ticker = Column(String(10), nullable=False, index=True)
+    execution_id = Column(String(100), nullable=False, index=True)
+    quantity = Column(Integer, nullable=False)            # original lot size
+    remaining_quantity = Column(Integer, nullable=False)  # 0 = fully closed
+    price = Column(Float, nullable=False)
+    commission_per_share = Column(Float, default=0)
+    opened_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<PositionLot(ticker='{self.ticker}', remaining={self.remaining_quantity}, price={self.price})>"
+
+
 class ExecutionLog(Base):
     """
     Execution log - records all executed trades
@@ -201,3 +228,73 @@ class Heartbeat(Base):
 
     def __repr__(self):
         return f"<Heartbeat(client_id='{self.client_id}', last_heartbeat='{self.last_heartbeat}')>"
+
+
+class OutboxEvent(Base):
+    """
+    Outbox - side effects of a signal state change
+
+    Written in the same transaction as the change and delivered by the
+    outbox relay (app.services.outbox), at least once.
+    """
+    __tablename__ = "outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event_type = Column(String(30), nullable=False)  # signal_received / signal_state / order_executed
+    signal_id = Column(String(100), index=True)
+    payload = Column(JSON, nullable=False)
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Delivery
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True))   # retry backoff after a failure
+    delivered_at = Column(DateTime(timezone=True), index=True)
+    last_error = Column(Text)
+
+    def __repr__(self):
+        return f"<OutboxEvent(id={self.id}, type='{self.event_type}', signal_id='{self.signal_id}')>"
+
+
+class SignalTiming(Base):
+    """
+    Signal timing - when each hop of a signal's lifecycle happened
+
+    One row per accepted signal (app.services.tracing). Epoch seconds, so
+    hop latencies are plain differences.
+    """
+    __tablename__ = "signal_timings"
+
+    signal_id = Column(String(100), primary_key=True)
+    ticker = Column(String(10), nullable=False)
+    action = Column(String(10), nullable=False)
+
+    sent_at = Column(Float)             # TradingView alert time (WebhookSignal.timestamp)
+    accepted_at = Column(Float, nullable=False, index=True)  # relay stored the signal
+    first_polled_at = Column(Float)     # first GET /api/signals/pending that returned it
+    acked_at = Column(Float)            # POST /ack
+    executed_at = Column(Float)         # fill time reported by Excel
+    reported_at = Column(Float)         # POST /executed or /failed received
+    outcome = Column(String(10))        # executed / failed / rejected
+
+    def __repr__(self):
+        return f"<SignalTiming(signal_id='{self.signal_id}', outcome='{self.outcome}')>"
+
+
+class StatsAggregate(Base):
+    """
+    Stats aggregate - one counter of the admin dashboard
+
+    Incremented on write (app.services.stats_aggregates) so the
+    /api/admin/stats endpoints never scan the signal / execution tables.
+    scope: day (key "") / ticker / reason (risk violation) / hour ("09")
+    """
+    __tablename__ = "stats_aggregates"
+
+    day = Column(Date, primary_key=True)
+    scope = Column(String(10), primary_key=True)
+    key = Column(String(50), primary_key=True)
+    metric = Column(String(20), primary_key=True)
+    value = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<StatsAggregate(day='{self.day}', {self.scope}:{self.key}:{self.metric}={self.value})>"
@@ -0,0 +1,446 @@
+"""
+Hybrid Redis cache - Redis with an in-process TTL mirror and circuit breaker
+
+Services that keep short-lived keys in Redis (idempotency keys, cooldowns)
+go through HybridCache instead of opening their own redis.Redis:
+
+- Every write is mirrored into a local TTL map.
+- While Redis is healthy, reads are served by Redis.
+- After `breaker_failure_threshold` consecutive errors the circuit opens:
+  reads/writes use the local map only, so requests do not each pay the
+  connect timeout. After `breaker_reset_seconds` one request probes Redis.
+- When the probe succeeds, keys written during the outage are pushed back
+  to Redis (SET NX with the remaining TTL) before normal operation resumes.
+- Exception: with server.multi_worker, SET NX claims (set(nx=True),
+  set_many_nx) raise SharedStateUnavailable while Redis is unreachable. A
+  local claim is only seen by one worker, so two workers could both win it.
+"""
+import fnmatch
+import heapq
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import redis
+
+from app.core import clock
+from app.core.config import get_settings
+from app.core.logging import logger
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker (monotonic time)
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_seconds: float = 10.0):
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call to Redis should be attempted now"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probing:
+                # Exactly one in-flight probe
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> bool:
+        """
+        Record a successful call
+
+        Returns:
+            True if this success closed an open circuit (recovery)
+        """
+        with self._lock:
+            recovered = self.state != CLOSED
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+            return recovered
+
+    def record_failure(self) -> bool:
+        """
+        Record a failed call
+
+        Returns:
+            True if this failure opened the circuit
+        """
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                tripped = self.state == CLOSED
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                if tripped:
+                    self.trips += 1
+                return tripped
+            return False
+
+    def force_open(self):
+        """Start in the open state (Redis unavailable at startup)"""
+        with self._lock:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.trips += 1
+
+
+class SharedStateUnavailable(Exception):
+    """A claim that must be shared by the workers cannot reach Redis"""
+
+
+class LocalTTLCache:
+    """
+    In-process key/value map with per-key expiry (follows app.core.clock)
+
+    Bounded by max_entries: when full, expired keys are purged first, then
+    the keys closest to expiry (keys without expiry last) are evicted.
+    """
+
+    # Share of max_entries evicted at once, so a full map does not scan on every set
+    EVICT_FRACTION = 0.01
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._data: Dict[str, Tuple[str, Optional[float]]] = {}
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def _live(self, key: str) -> Optional[Tuple[str, Optional[float]]]:
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= clock.timestamp():
+            del self._data[key]
+            return None
+        return entry
+
+    def _purge_expired(self):
+        now = clock.timestamp()
+        for key in [k for k, (_, exp) in self._data.items() if exp is not None and exp <= now]:
+            del self._data[key]
+
+    def _evict(self):
+        """Purge expired keys, then evict the soonest-expiring ones below max_entries"""
+        self._purge_expired()
+        excess = len(self._data) - self.max_entries + 1
+        if excess <= 0:
+            return
+        excess = max(excess, int(self.max_entries * self.EVICT_FRACTION))
+        victims = heapq.nsmallest(
+            excess, self._data,
+            key=lambda k: self._data[k][1] if self._data[k][1] is not None else float("inf")
+        )
+        for key in victims:
+            del self._data[key]
+        self.evicted += len(victims)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.max_entries:
+                self._evict()
+            expires_at = clock.timestamp() + ttl if ttl else None
+            self._data[key] = (str(value), expires_at)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._live(key)
+            return entry[0] if entry else None
+
+    def exists(self, key: str) -> bool:
+        with self._lock:
+            return self._live(key) is not None
+
+    def ttl(self, key: str) -> int:
+        """Remaining seconds (-2 missing, -1 no expiry), like Redis TTL"""
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                return -2
+            if entry[1] is None:
+                return -1
+            return max(int(round(entry[1] - clock.timestamp())), 0)
+
+    def keys(self, pattern: str = "*") -> List[str]:
+        with self._lock:
+            self._purge_expired()
+            return [k for k in self._data if fnmatch.fnmatchcase(k, pattern)]
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class HybridCache:
+    """
+    Subset of the redis.Redis API backed by Redis plus a local TTL mirror
+    """
+
+    def __init__(self, client: redis.Redis, breaker: CircuitBreaker, max_local_entries: int = 100000):
+        self.client = client
+        self.breaker = breaker
+        self.local = LocalTTLCache(max_local_entries)
+
+        # Keys changed while the circuit was open: key -> "set" | "delete"
+        self._pending: Dict[str, str] = {}
+        self._pending_lock = threading.Lock()
+        self.fallback_reads = 0
+        self.reconciled = 0
+
+    # ----- internal helpers -----
+
+    def execute(self, fn: Callable[[redis.Redis], Any]) -> Tuple[bool, Any]:
+        """
+        Run fn(client) against Redis through the breaker
+
+        For multi-command work (pipelines, sorted sets) that has no local mirror;
+        callers keep their own fallback for ok=False.
+
+        Returns:
+            (ok, result) - ok is False when Redis was skipped or failed
+        """
+        if not self.breaker.allow():
+            return False, None
+
+        recovering = self.breaker.state != CLOSED
+        try:
+            if recovering:
+                # Push outage writes before serving from Redis again
+                self.reconcile()
+            result = fn(self.client)
+        except Exception as e:
+            if self.breaker.record_failure():
+                logger.error(f"Redis unavailable, switching to local cache: {e}")
+            else:
+                logger.debug(f"Redis error: {e}")
+            return False, None
+
+        if self.breaker.record_success():
+            logger.info("Redis recovered, local cache reconciled")
+        return True, result
+
+    def _call(self, method: str, *args, **kwargs) -> Tuple[bool, Any]:
+        return self.execute(lambda client: getattr(client, method)(*args, **kwargs))
+
+    def _check_local_claim(self, key: str):
+        """Multi-worker: a claim in the local mirror would not be seen by other workers"""
+        if get_settings().server.multi_worker:
+            raise SharedStateUnavailable(f"Redis unavailable, cannot claim {key} across workers")
+
+    def _mark_pending(self, key: str, op: str):
+        with self._pending_lock:
+            self._pending[key] = op
+
+    # ----- redis.Redis-compatible API -----
+
+    def get(self, key: str) -> Optional[str]:
+        ok, value = self._call("get", key)
+        if ok:
+            return value
+        self.fallback_reads += 1
+        return self.local.get(key)
+
+    def exists(self, *keys: str) -> int:
+        ok, count = self._call("exists", *keys)
+        if ok:
+            return count
+        self.fallback_reads += 1
+        return sum(1 for key in keys if self.local.exists(key))
+
+    def ttl(self, key: str) -> int:
+        ok, ttl = self._call("ttl", key)
+        if ok:
+            return ttl
+        self.fallback_reads += 1
+        return self.local.ttl(key)
+
+    def keys(self, pattern: str = "*") -> List[str]:
+        ok, keys = self._call("keys", pattern)
+        if ok:
+            return keys
+        self.fallback_reads += 1
+        return self.local.keys(pattern)
+
+    def setex(self, key: str, time_seconds: int, value: Any) -> bool:
+        self.local.set(key, value, time_seconds)
+        ok, _ = self._call("setex", key, time_seconds, value)
+        if not ok:
+            self._mark_pending(key, "set")
+        return True
+
+    def set(self, key: str, value: Any, ex: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        ok, result = self._call("set", key, value, ex=ex, nx=nx)
+        if ok:
+            if result:
+                self.local.set(key, value, ex)
+            return result
+
+        if nx:
+            self._check_local_claim(key)
+            if self.local.exists(key):
+                return None
+        self.local.set(key, value, ex)
+        self._mark_pending(key, "set")
+        return True
+
+    def set_many_nx(self, entries: List[Tuple[str, Any, Optional[int]]]) -> List[bool]:
+        """
+        SET NX of several keys in one pipelined round trip
+
+        Args:
+            entries: [(key, value, ttl_seconds)]
+
+        Returns:
+            Per entry, whether this call stored the key
+        """
+        if not entries:
+            return []
+
+        def _set_all(client):
+            pipe = client.pipeline(transaction=False)
+            for key, value, ttl in entries:
+                pipe.set(key, value, ex=ttl, nx=True)
+            return pipe.execute()
+
+        ok, results = self.execute(_set_all)
+        if ok:
+            for (key, value, ttl), stored in zip(entries, results):
+                if stored:
+                    self.local.set(key, value, ttl)
+            return [bool(stored) for stored in results]
+
+        return [bool(self.set(key, value, ex=ttl, nx=True)) for key, value, ttl in entries]
+
+    def delete(self, *keys: str) -> int:
+        local_count = self.local.delete(*keys)
+        if not keys:
+            return 0
+        ok, count = self._call("delete", *keys)
+        if ok:
+            return count
+        for key in keys:
+            self._mark_pending(key, "delete")
+        return local_count
+
+    def ping(self) -> bool:
+        ok, _ = self._call("ping")
+        return ok
+
+    # ----- recovery -----
+
+    def reconcile(self) -> int:
+        """
+        Push keys changed during the outage back to Redis
+
+        Local keys are written with SET NX and their remaining TTL, so a value
+        another worker stored in Redis meanwhile is kept. Expired keys are skipped.
+        Raises on Redis errors (pending keys are kept for the next attempt).
+
+        Returns:
+            Number of keys reconciled
+        """
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+
+        done = 0
+        try:
+            for key, op in pending.items():
+                if op == "delete":
+                    self.client.delete(key)
+                    done += 1
+                    continue
+
+                value = self.local.get(key)
+                ttl = self.local.ttl(key)
+                if value is None or ttl == 0:
+                    continue
+                self.client.set(key, value, ex=ttl if ttl > 0 else None, nx=True)
+                done += 1
+        except Exception:
+            # Keep all keys for the next attempt (SET NX / DELETE are idempotent)
+            with self._pending_lock:
+                for key, op in pending.items():
+                    self._pending.setdefault(key, op)
+            raise
+
+        self.reconciled += done
+        if done:
+            logger.info(f"Reconciled {done} keys to Redis")
+        return done
+
+    def stats(self) -> Dict[str, Any]:
+        """Breaker state and local mirror counters (for /status)"""
+        with self._pending_lock:
+            pending = len(self._pending)
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "trips": self.breaker.trips,
+            "local_keys": len(self.local),
+            "local_evicted": self.local.evicted,
+            "pending_reconcile": pending,
+            "fallback_reads": self.fallback_reads,
+            "reconciled": self.reconciled
+        }
+
+
+# Global hybrid cache instance
+_hybrid_cache: Optional[HybridCache] = None
+
+
+def init_hybrid_cache(redis_available: bool = True) -> HybridCache:
+    """
+    Initialize the global hybrid cache
+
+    Args:
+        redis_available: False starts with the circuit open (startup ping failed)
+
+    Returns:
+        HybridCache instance
+    """
+    global _hybrid_cache
+
+    redis_config = get_settings().redis
+    client = redis.Redis(
+        host=redis_config.host,
+        port=redis_config.port,
+        db=redis_config.db,
+        password=redis_config.password,
+        decode_responses=redis_config.decode_responses,
+        socket_connect_timeout=redis_config.socket_connect_timeout,
+        socket_timeout=redis_config.socket_timeout
+    )
+    breaker = CircuitBreaker(redis_config.breaker_failure_threshold, redis_config.breaker_reset_seconds)
+    if not redis_available:
+        breaker.force_open()
+
+    _hybrid_cache = HybridCache(client, breaker, redis_config.local_cache_max_entries)
+    return _hybrid_cache
+
+
+def get_hybrid_cache() -> HybridCache:
+    """
+    Get the global hybrid cache (initialized on first use if needed)
+    """
+    if _hybrid_cache is None:
+        return init_hybrid_cache()
+    return _hybrid_cache
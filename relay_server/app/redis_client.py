@@ -27,7 +27,9 @@ def init_redis() -> redis.Redis:
         port=redis_config.port,
         db=redis_config.db,
         password=redis_config.password,
-        decode_responses=redis_config.decode_responses
+        decode_responses=redis_config.decode_responses,
+        socket_connect_timeout=redis_config.socket_connect_timeout,
+        socket_timeout=redis_config.socket_timeout
     )
 
     # Test connection
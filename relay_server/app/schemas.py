@@ -43,6 +43,7 @@ class WebhookSignal(BaseModel):
     atr: Optional[float] = Field(default=None, gt=0)
     rr_ratio: Optional[float] = Field(default=None)
     rsi: Optional[float] = Field(default=None, ge=0, le=100)
+    exit_reason: Optional[str] = Field(default=None, max_length=30)  # stop_loss / take_profit / market_close
     timestamp: str
     passphrase: str
 
@@ -82,6 +83,27 @@ class WebhookResponse(BaseModel):
     timestamp: datetime
 
 
+class WebhookBatchItemResult(BaseModel):
+    """
+    Result of one signal of a /webhook/batch request
+    """
+    index: int
+    status_code: int               # what POST /webhook would have answered
+    status: str                    # success / duplicate / rejected
+    signal_id: Optional[str] = None
+    message: str
+
+
+class WebhookBatchResponse(BaseModel):
+    """
+    Response for /webhook/batch requests
+    """
+    accepted: int
+    rejected: int
+    results: List[WebhookBatchItemResult]
+    timestamp: datetime
+
+
 # ========== Signal Schemas ==========
 
 class SignalResponse(BaseModel):
@@ -101,6 +123,8 @@ class SignalResponse(BaseModel):
     created_at: datetime
     expires_at: datetime
     checksum: str
+    ticker_name: Optional[str] = None
+    sector: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -116,6 +140,54 @@ class SignalListResponse(BaseModel):
     signals: List[SignalResponse]
 
 
+def _float(value) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def signal_response_dict(signal, ticker_name: Optional[str] = None, sector: Optional[str] = None) -> dict:
+    """
+    SignalResponse payload built directly from a Signal row
+
+    Pre-built serializer for the polling hot path (FastJSONResponse);
+    must stay field-for-field identical to SignalResponse.
+    """
+    return {
+        "signal_id": signal.signal_id,
+        "action": signal.action,
+        "ticker": signal.ticker,
+        "quantity": int(signal.quantity),
+        "price": signal.price,
+        "entry_price": float(signal.entry_price),
+        "stop_loss": _float(signal.stop_loss),
+        "take_profit": _float(signal.take_profit),
+        "atr": _float(signal.atr),
+        "state": signal.state.value,
+        "created_at": signal.created_at,
+        "expires_at": signal.expires_at,
+        "checksum": signal.checksum,
+        "ticker_name": ticker_name,
+        "sector": sector
+    }
+
+
+# Column order of the tabular (TSV/CSV) signal list, schema v1 - append only
+SIGNAL_TABLE_COLUMNS = [
+    "signal_id", "action", "ticker", "quantity", "price", "entry_price",
+    "stop_loss", "take_profit", "atr", "state", "created_at", "expires_at",
+    "checksum", "ticker_name", "sector"
+]
+
+
+def signal_list_dict(signals: List[dict], timestamp: datetime) -> dict:
+    """SignalListResponse payload (see signal_response_dict)"""
+    return {
+        "status": "success",
+        "timestamp": timestamp,
+        "count": len(signals),
+        "signals": signals
+    }
+
+
 class SignalAcknowledgeRequest(BaseModel):
     """
     Request to acknowledge signal fetch
@@ -220,6 +292,13 @@ class StatusResponse(BaseModel):
     market_open: bool
     daily_stats: dict
     risk_metrics: dict
+    log_pipeline: Optional[dict] = None
+    redis_cache: Optional[dict] = None
+    ip_allowlist: Optional[dict] = None
+    rate_limit: Optional[dict] = None
+    deployment: Optional[dict] = None
+    outbox: Optional[dict] = None
+    runtime: Optional[dict] = None
     timestamp: datetime
 
 
@@ -232,6 +311,21 @@ class KillSwitchRequest(BaseModel):
     reason: Optional[str] = None
 
 
+class AdminAuthRequest(BaseModel):
+    """
+    Admin operation that only needs the admin password
+    """
+    password: str
+
+
+class OutboxRequeueRequest(BaseModel):
+    """
+    Requeue parked outbox events (admin)
+    """
+    password: str
+    event_ids: Optional[List[int]] = Field(None, description="Only these events (default: all parked)")
+
+
 class KillSwitchResponse(BaseModel):
     """
     Response for kill switch operation
@@ -0,0 +1,295 @@
+"""
+Archive - Move old rows out of the hot tables
+
+Rows of signals / execution_log / daily_stats older than
+archive.retention_days are moved, in batches of archive.batch_size (one
+transaction each: INSERT ... SELECT into the archive, DELETE from the hot
+table), into monthly archive tables in the same database:
+
+    <table>_archive_YYYYMM      e.g. execution_log_archive_202601
+
+The month is taken from the row's time column (signals.created_at,
+execution_log.executed_at, daily_stats.date). Archive tables have the hot
+table's columns and primary key and one index on the time column.
+
+history() is a UNION ALL of the hot table and the archive months that
+overlap a date range, for queries that need the full history (PnL
+backfill, admin summaries, signal lookup by id). The analysis
+KabutoDataLoader reads the same tables by name.
+"""
+import asyncio
+import re
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Column, Index, MetaData, Table, delete, false, func, insert, inspect, select, true, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core import clock
+from app.core.config import get_settings
+from app.core.logging import logger
+from app.database import get_db_context
+from app.models import Base
+from app.services.tracing import prune_timings
+
+# Table -> time column deciding the row's age and archive month
+ARCHIVED_TABLES = {
+    "signals": "created_at",
+    "execution_log": "executed_at",
+    "daily_stats": "date",
+}
+
+ARCHIVE_SUFFIX = "_archive_"
+
+# Background task wakes up this often to see whether a run is due
+CHECK_INTERVAL_SECONDS = 300
+
+_archive_metadata = MetaData()
+_archive_table_cache: Dict[str, Table] = {}
+
+Month = Tuple[int, int]
+
+
+def archive_table_name(table_name: str, month: Month) -> str:
+    return f"{table_name}{ARCHIVE_SUFFIX}{month[0]:04d}{month[1]:02d}"
+
+
+def _archive_table(table_name: str, month: Month) -> Table:
+    """Table object of an archive month (same columns and key as the hot table)"""
+    name = archive_table_name(table_name, month)
+    table = _archive_table_cache.get(name)
+    if table is None:
+        hot = Base.metadata.tables[table_name]
+        columns = [Column(c.name, c.type, primary_key=c.primary_key, autoincrement=False) for c in hot.columns]
+        table = Table(name, _archive_metadata, *columns)
+        time_column = ARCHIVED_TABLES[table_name]
+        Index(f"ix_{name}_{time_column}", table.c[time_column])
+        _archive_table_cache[name] = table
+    return table
+
+
+def archive_months(bind, table_name: str) -> List[Month]:
+    """Existing archive months of a table, oldest first"""
+    pattern = re.compile(rf"^{re.escape(table_name + ARCHIVE_SUFFIX)}(\d{{4}})(\d{{2}})$")
+    months = []
+    for name in inspect(bind).get_table_names():
+        match = pattern.match(name)
+        if match:
+            months.append((int(match.group(1)), int(match.group(2))))
+    return sorted(months)
+
+
+def _month_range(month: Month) -> Tuple[datetime, datetime]:
+    start = datetime(month[0], month[1], 1)
+    end = datetime(month[0] + month[1] // 12, month[1] % 12 + 1, 1)
+    return start, end
+
+
+def _as_datetime(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime(value.year, value.month, value.day)
+
+
+def history(bind, table_name: str, start=None, end=None):
+    """
+    Hot + archive rows of a table as one subquery
+
+    Args:
+        bind: Engine / connection / session bind
+        table_name: signals / execution_log / daily_stats
+        start: Only rows with time >= start (date or datetime; None = all)
+        end: Only rows with time < end
+
+    Returns:
+        Subquery with the table's columns plus `archived` (bool)
+    """
+    hot = Base.metadata.tables[table_name]
+    time_column = ARCHIVED_TABLES[table_name]
+    start, end = _as_datetime(start), _as_datetime(end)
+
+    def _select(table: Table, archived: bool):
+        query = select(*table.columns, (true() if archived else false()).label("archived"))
+        if start is not None:
+            query = query.where(table.c[time_column] >= start)
+        if end is not None:
+            query = query.where(table.c[time_column] < end)
+        return query
+
+    parts = [_select(hot, False)]
+    for month in archive_months(bind, table_name):
+        month_start, month_end = _month_range(month)
+        if (start is not None and month_end <= start) or (end is not None and month_start >= end):
+            continue
+        parts.append(_select(_archive_table(table_name, month), True))
+
+    query = parts[0] if len(parts) == 1 else union_all(*parts)
+    return query.subquery(f"{table_name}_history")
+
+
+def find_archived(db: Session, table_name: str, key):
+    """Archived row by primary key (newest month first), or None"""
+    bind = db.get_bind()
+    for month in reversed(archive_months(bind, table_name)):
+        table = _archive_table(table_name, month)
+        pk = list(table.primary_key.columns)[0]
+        row = db.execute(select(table).where(pk == key)).first()
+        if row is not None:
+            return row
+    return None
+
+
+def archive_table(db: Session, table_name: str, cutoff: datetime, batch_size: int) -> int:
+    """
+    Move rows older than cutoff into their monthly archive tables
+
+    Returns:
+        Number of rows moved
+    """
+    hot = Base.metadata.tables[table_name]
+    pk = list(hot.primary_key.columns)[0]
+    time_column = hot.c[ARCHIVED_TABLES[table_name]]
+    columns = [c.name for c in hot.columns]
+    moved = 0
+
+    while True:
+        rows = db.execute(
+            select(pk, time_column).where(time_column < cutoff)
+            .order_by(time_column).limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            break
+
+        by_month: Dict[Month, List] = defaultdict(list)
+        for key, when in rows:
+            by_month[(when.year, when.month)].append(key)
+
+        try:
+            for month, keys in sorted(by_month.items()):
+                archive = _archive_table(table_name, month)
+                archive.create(db.connection(), checkfirst=True)
+                db.execute(insert(archive).from_select(columns, select(*hot.columns).where(pk.in_(keys))))
+            db.execute(delete(hot).where(pk.in_([key for key, _ in rows])))
+            db.commit()
+        except IntegrityError as e:
+            # Another worker archived the same rows first
+            db.rollback()
+            logger.warning(f"Archive {table_name}: batch already archived, stopping: {e.orig}")
+            break
+
+        moved += len(rows)
+        if len(rows) < batch_size:
+            break
+
+    return moved
+
+
+def archive_cutoff(retention_days: int) -> datetime:
+    """Start of the oldest day kept in the hot tables"""
+    return datetime.combine(clock.today() - timedelta(days=retention_days), datetime.min.time())
+
+
+def archivable_counts(db: Session, cutoff: datetime) -> Dict[str, int]:
+    """Rows per table that an archive run would move"""
+    counts = {}
+    for table_name, time_column in ARCHIVED_TABLES.items():
+        hot = Base.metadata.tables[table_name]
+        counts[table_name] = db.execute(
+            select(func.count()).select_from(hot).where(hot.c[time_column] < cutoff)
+        ).scalar()
+    return counts
+
+
+class Archiver:
+    """Runs archive passes and keeps the result of the last one"""
+
+    def __init__(self):
+        self.last_run: Optional[Dict] = None
+        self._last_run_monotonic: Optional[float] = None
+
+    def run(self, retention_days: Optional[int] = None, batch_size: Optional[int] = None) -> Dict:
+        """Archive every table once"""
+        config = get_settings().archive
+        retention_days = retention_days if retention_days is not None else config.retention_days
+        batch_size = batch_size or config.batch_size
+        cutoff = archive_cutoff(retention_days)
+
+        started = time.perf_counter()
+        moved = {}
+        with get_db_context() as db:
+            for table_name in ARCHIVED_TABLES:
+                moved[table_name] = archive_table(db, table_name, cutoff, batch_size)
+            # Signal timings are not archived, only kept for tracing.retention_days
+            pruned_timings = prune_timings(db, get_settings().tracing.retention_days)
+
+        self._last_run_monotonic = time.monotonic()
+        self.last_run = {
+            "cutoff": cutoff.isoformat(),
+            "moved": moved,
+            "pruned_timings": pruned_timings,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "finished_at": datetime.now().isoformat()
+        }
+        if any(moved.values()):
+            logger.info(f"Archived rows older than {cutoff.date()}: {moved}")
+        return self.last_run
+
+    def due(self) -> bool:
+        config = get_settings().archive
+        if self._last_run_monotonic is None:
+            return True
+        return time.monotonic() - self._last_run_monotonic >= config.interval_hours * 3600
+
+    def stats(self, db: Session) -> Dict:
+        bind = db.get_bind()
+        tables = {}
+        for table_name in ARCHIVED_TABLES:
+            hot = Base.metadata.tables[table_name]
+            archives = {}
+            for month in archive_months(bind, table_name):
+                archive = _archive_table(table_name, month)
+                archives[archive.name] = db.execute(select(func.count()).select_from(archive)).scalar()
+            tables[table_name] = {
+                "hot_rows": db.execute(select(func.count()).select_from(hot)).scalar(),
+                "archive_tables": archives
+            }
+        config = get_settings().archive
+        return {
+            "enabled": config.enabled,
+            "retention_days": config.retention_days,
+            "tables": tables,
+            "last_run": self.last_run
+        }
+
+
+# Global archiver
+_archiver = Archiver()
+
+
+def get_archiver() -> Archiver:
+    return _archiver
+
+
+async def run_archiver():
+    """
+    Background task: archive once per archive.interval_hours, outside trading windows
+    """
+    from app.services.market_hours import MarketHoursService
+
+    while True:
+        await asyncio.sleep(CHECK_INTERVAL_SECONDS)
+        config = get_settings().archive
+        if not config.enabled or not _archiver.due():
+            continue
+        try:
+            if MarketHoursService().is_safe_trading_window():
+                continue
+            await asyncio.to_thread(_archiver.run)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Archiver error: {e}")
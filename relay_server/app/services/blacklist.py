@@ -2,9 +2,10 @@
 Blacklist Management Service
 """
 from sqlalchemy.orm import Session
-from datetime import datetime, date, timedelta
+from datetime import timedelta
 from typing import Optional, List
 
+from app.core import clock
 from app.models import Blacklist
 from app.core.logging import logger
 
@@ -39,7 +40,7 @@ class BlacklistService:
 
         # Check if expired
         if blacklist_entry.expires_at:
-            if datetime.now() > blacklist_entry.expires_at:
+            if clock.now() > blacklist_entry.expires_at:
                 # Expired, remove and return False
                 self.db.delete(blacklist_entry)
                 self.db.commit()
@@ -84,7 +85,7 @@ class BlacklistService:
         # Calculate expiry date
         expires_at = None
         if expiry_days is not None:
-            expires_at = datetime.now() + timedelta(days=expiry_days)
+            expires_at = clock.now() + timedelta(days=expiry_days)
 
         # Create blacklist entry
         blacklist_entry = Blacklist(
@@ -143,7 +144,7 @@ class BlacklistService:
         """
         Remove expired blacklist entries
         """
-        now = datetime.now()
+        now = clock.now()
 
         expired = self.db.query(Blacklist).filter(
             Blacklist.expires_at.isnot(None),
@@ -0,0 +1,124 @@
+"""
+Commission - Broker fee schedules
+
+The configured tiers are compiled with the settings snapshot into sorted bounds plus
+per-tier fee terms, so a fee lookup is a bisect and a few multiplications.
+
+Plans:
+- none: no commission
+- per_trade: fee by the execution amount
+- daily_flat: fee by the day's total traded amount; each execution is charged
+  the increase of the day's fee it causes, so the executions of a day add up
+  to the daily fee
+
+The same schedule (commission section of config.yaml) is used by
+analysis/lib/commission.py for backtests.
+"""
+import math
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import CommissionTier
+from app.core.snapshot import get_snapshot
+from app.models import ExecutionLog
+
+PLANS = ("none", "per_trade", "daily_flat")
+
+
+class _Tier(NamedTuple):
+    lower: float
+    fee: float
+    rate: float
+    step_amount: float
+    step_fee: float
+
+
+class TierTable:
+    """Compiled tier list: amount -> fee"""
+
+    def __init__(self, tiers: List[CommissionTier]):
+        bounded = sorted((t for t in tiers if t.up_to is not None), key=lambda t: t.up_to)
+        unbounded = [t for t in tiers if t.up_to is None]
+
+        self._bounds: List[float] = []
+        self._tiers: List[_Tier] = []
+        lower = 0.0
+        for t in bounded + unbounded[:1]:
+            self._tiers.append(_Tier(lower, t.fee, t.rate, t.step_amount, t.step_fee))
+            if t.up_to is not None:
+                self._bounds.append(t.up_to)
+                lower = t.up_to
+
+    def fee(self, amount: float) -> float:
+        if amount <= 0 or not self._tiers:
+            return 0.0
+        # Amounts above every bound use the unbounded tier, or the last tier if none
+        tier = self._tiers[min(bisect_left(self._bounds, amount), len(self._tiers) - 1)]
+        fee = tier.fee + tier.rate * amount
+        if tier.step_amount > 0 and amount > tier.lower:
+            fee += math.ceil((amount - tier.lower) / tier.step_amount) * tier.step_fee
+        return fee
+
+
+class CommissionSchedule:
+    """
+    Commission calculator for one plan
+    """
+
+    def __init__(self, plan: str = "none", per_trade: Optional[List[CommissionTier]] = None,
+                 daily_flat: Optional[List[CommissionTier]] = None):
+        if plan not in PLANS:
+            raise ValueError(f"Unknown commission plan: {plan} (expected one of {', '.join(PLANS)})")
+        self.plan = plan
+        self.per_trade = TierTable(per_trade or [])
+        self.daily_flat = TierTable(daily_flat or [])
+
+    def calculate(self, amount: float, day_amount_before: float = 0) -> float:
+        """
+        Commission for one execution
+
+        Args:
+            amount: Execution amount (price * quantity)
+            day_amount_before: Amount already traded that day (daily_flat only)
+
+        Returns:
+            Commission in yen (rounded)
+        """
+        if self.plan == "per_trade":
+            fee = self.per_trade.fee(amount)
+        elif self.plan == "daily_flat":
+            fee = self.daily_flat.fee(day_amount_before + amount) - self.daily_flat.fee(day_amount_before)
+        else:
+            return 0
+        return max(round(fee), 0)
+
+
+def day_traded_amount(db: Session, executed_at: datetime) -> float:
+    """Total executed amount on the day of executed_at"""
+    start = datetime.combine(executed_at.date(), datetime.min.time())
+    total = db.query(func.coalesce(func.sum(ExecutionLog.total_amount), 0)).filter(
+        ExecutionLog.executed_at >= start,
+        ExecutionLog.executed_at < start + timedelta(days=1)
+    ).scalar()
+    return float(total or 0)
+
+
+def calculate_execution_commission(db: Session, amount: float, executed_at: datetime) -> float:
+    """
+    Commission for an execution being reported
+
+    Must be called before the execution is added to the session (the day's
+    traded amount is read from execution_log for daily_flat).
+    """
+    schedule = get_commission_schedule()
+    day_before = day_traded_amount(db, executed_at) if schedule.plan == "daily_flat" else 0
+    return schedule.calculate(amount, day_before)
+
+
+def get_commission_schedule() -> CommissionSchedule:
+    """Compiled schedule of the current settings snapshot"""
+    return get_snapshot().commission
@@ -1,12 +1,12 @@
 """
 Cooldown Service - Layer 2 defense using Redis
 """
-import redis
 from datetime import datetime, timedelta
-from typing import Dict
+from typing import Dict, List, Tuple
 
 from app.core.config import get_settings
 from app.core.logging import logger
+from app.redis_cache import SharedStateUnavailable, get_hybrid_cache
 
 
 class CooldownService:
@@ -16,16 +16,10 @@ class CooldownService:
 
     def __init__(self):
         self.settings = get_settings()
-        redis_config = self.settings.redis
         self.cooldown_config = self.settings.cooldown
 
-        self.redis_client = redis.Redis(
-            host=redis_config.host,
-            port=redis_config.port,
-            db=redis_config.db,
-            password=redis_config.password,
-            decode_responses=redis_config.decode_responses
-        )
+        # Shared Redis client with local TTL mirror (degraded mode on outage)
+        self.redis_client = get_hybrid_cache()
 
     def check_cooldown(self, ticker: str, action: str) -> Dict[str, any]:
         """
@@ -42,41 +36,133 @@ class CooldownService:
             same_ticker_cooldown = self.cooldown_config.sell_same_ticker
             any_ticker_cooldown = self.cooldown_config.sell_any_ticker
 
-        # Check same ticker cooldown
-        if same_ticker_cooldown > 0:
-            same_ticker_key = f"cooldown:{action}:{ticker}"
-            if self.redis_client.exists(same_ticker_key):
-                ttl = self.redis_client.ttl(same_ticker_key)
-                logger.warning(f"Cooldown active for {action} {ticker}, retry after {ttl}s")
-                return {
-                    "allowed": False,
-                    "reason": f"cooldown_same_ticker",
-                    "retry_after": ttl
-                }
-
-        # Check any ticker cooldown
-        if any_ticker_cooldown > 0:
-            any_ticker_key = f"cooldown:{action}:*"
-            # Get all keys matching pattern
-            keys = self.redis_client.keys(f"cooldown:{action}:*")
-            if keys:
-                # Find the one with longest TTL
-                max_ttl = 0
-                for key in keys:
-                    ttl = self.redis_client.ttl(key)
-                    if ttl > max_ttl:
-                        max_ttl = ttl
-
-                if max_ttl > 0:
-                    logger.warning(f"Cooldown active for any {action}, retry after {max_ttl}s")
+        try:
+            # Check same ticker cooldown
+            if same_ticker_cooldown > 0:
+                same_ticker_key = f"cooldown:{action}:{ticker}"
+                if self.redis_client.exists(same_ticker_key):
+                    ttl = self.redis_client.ttl(same_ticker_key)
+                    logger.warning(f"Cooldown active for {action} {ticker}, retry after {ttl}s")
                     return {
                         "allowed": False,
-                        "reason": f"cooldown_any_ticker",
-                        "retry_after": max_ttl
+                        "reason": f"cooldown_same_ticker",
+                        "retry_after": ttl
                     }
 
+            # Check any ticker cooldown
+            if any_ticker_cooldown > 0:
+                any_ticker_key = f"cooldown:{action}:*"
+                # Get all keys matching pattern
+                keys = self.redis_client.keys(f"cooldown:{action}:*")
+                if keys:
+                    # Find the one with longest TTL
+                    max_ttl = 0
+                    for key in keys:
+                        ttl = self.redis_client.ttl(key)
+                        if ttl > max_ttl:
+                            max_ttl = ttl
+
+                    if max_ttl > 0:
+                        logger.warning(f"Cooldown active for any {action}, retry after {max_ttl}s")
+                        return {
+                            "allowed": False,
+                            "reason": f"cooldown_any_ticker",
+                            "retry_after": max_ttl
+                        }
+        except Exception as e:
+            # Redis outages are served by the local mirror; only unexpected errors fail open
+            logger.error(f"Redis error in check_cooldown: {e}")
+
         return {"allowed": True, "reason": "no_cooldown", "retry_after": 0}
 
+    def _cooldown_keys(self, ticker: str, action: str):
+        """[(key, seconds)] of the cooldowns an accepted signal starts"""
+        if action == "buy":
+            same_ticker_cooldown = self.cooldown_config.buy_same_ticker
+            any_ticker_cooldown = self.cooldown_config.buy_any_ticker
+        else:  # sell
+            same_ticker_cooldown = self.cooldown_config.sell_same_ticker
+            any_ticker_cooldown = self.cooldown_config.sell_any_ticker
+
+        keys = []
+        if same_ticker_cooldown > 0:
+            keys.append((f"cooldown:{action}:{ticker}", same_ticker_cooldown))
+        if any_ticker_cooldown > 0:
+            keys.append((f"cooldown:{action}:global", any_ticker_cooldown))
+        return keys
+
+    def claim_cooldown(self, ticker: str, action: str) -> bool:
+        """
+        Atomically start the cooldowns (SET NX) before a signal is stored
+
+        check_cooldown() is a read; two workers can both pass it for the same
+        ticker. Only the request that claims every cooldown key may proceed.
+
+        Returns:
+            True if claimed, False if another request started them first
+        """
+        return self.claim_cooldowns([(ticker, action)])[0]
+
+    def claim_cooldowns(self, signals: List[Tuple[str, str]]) -> List[bool]:
+        """
+        claim_cooldown() for several signals in one pipelined round trip
+
+        Signals are served in order: a later signal of the batch that needs a
+        key an earlier one took (e.g. the global buy cooldown) is refused.
+        Keys stored for a refused signal are deleted again.
+
+        Args:
+            signals: [(ticker, action)]
+
+        Raises:
+            SharedStateUnavailable: Multi-worker mode and Redis is unreachable
+
+        Returns:
+            Per signal, True if claimed
+        """
+        wanted = [self._cooldown_keys(ticker, action) for ticker, action in signals]
+        entries = {}
+        for keys in wanted:
+            for key, seconds in keys:
+                entries.setdefault(key, seconds)
+
+        try:
+            stored = self.redis_client.set_many_nx([(key, "1", seconds) for key, seconds in entries.items()])
+        except SharedStateUnavailable:
+            raise
+        except Exception as e:
+            logger.error(f"Redis error in claim_cooldowns: {e}")
+            return [True] * len(signals)
+
+        won = {key for key, ok in zip(entries, stored) if ok}
+        taken = set()
+        claimed = []
+        for keys in wanted:
+            names = [key for key, _ in keys]
+            if all(key in won and key not in taken for key in names):
+                taken.update(names)
+                claimed.append(True)
+            else:
+                logger.warning(f"Cooldown claimed concurrently: {', '.join(k for k in names if k not in won or k in taken)}")
+                claimed.append(False)
+
+        unused = won - taken
+        if unused:
+            try:
+                self.redis_client.delete(*unused)
+            except Exception as e:
+                logger.error(f"Redis error in claim_cooldowns: {e}")
+        return claimed
+
+    def release_cooldown(self, ticker: str, action: str):
+        """Undo claim_cooldown() when the signal could not be stored"""
+        try:
+            keys = [key for key, _ in self._cooldown_keys(ticker, action)]
+            if keys:
+                self.redis_client.delete(*keys)
+        except Exception as e:
+            logger.error(f"Redis error in release_cooldown: {e}")
+
     def set_cooldown(self, ticker: str, action: str):
         """
         Set cooldown timer after action
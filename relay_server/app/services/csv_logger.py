@@ -1,149 +1,378 @@
 """
-CSV Logger Service - Record signals to CSV file
+CSV Logger Service - Record signals to CSV files
+
+Layout (all files append-only, rotated daily by JST date):
+    data/logs/signals_YYYY-MM-DD.csv        one row per accepted signal
+    data/logs/signal_states_YYYY-MM-DD.csv  one row per state transition
+
+A single shared buffered writer per file kind serialises all writers in the
+process and is flushed periodically; whole-row appends under an flock keep
+the files consistent when several workers write them. compact_signal_logs()
+merges the daily files and the state journal into the final signals.csv for
+the Excel side.
 """
 import csv
+import io
 import os
-from datetime import datetime, timezone, timedelta
+import threading
+from contextlib import contextmanager
+from datetime import datetime, date, timezone, timedelta
 from pathlib import Path
-from typing import Dict, Any
-from threading import Lock
+from typing import Dict, Any, Iterator, List, Optional
 
+from app.core import clock
+from app.core.config import get_settings
 from app.core.logging import logger
 
+try:
+    import fcntl
+except ImportError:  # Windows: O_APPEND writes of whole rows only
+    fcntl = None
+
 # JST timezone
 JST = timezone(timedelta(hours=9))
 
+SIGNAL_HEADER = [
+    "timestamp",
+    "signal_id",
+    "action",
+    "ticker",
+    "quantity",
+    "price",
+    "entry_price",
+    "stop_loss",
+    "take_profit",
+    "atr",
+    "rr_ratio",
+    "rsi",
+    "checksum",
+    "state",
+    "source_ip"
+]
+
+STATE_HEADER = ["timestamp", "signal_id", "state"]
+
+# Tie-break for journal rows with the same timestamp (rows may be redelivered
+# by the outbox relay, so file order alone is not the order of transitions)
+STATE_ORDER = {"pending": 0, "fetched": 1, "executed": 2, "failed": 2, "expired": 2}
+
+SIGNAL_FILE_PREFIX = "signals_"
+STATE_FILE_PREFIX = "signal_states_"
+
+
+@contextmanager
+def _locked(fd: int):
+    """Exclusive advisory lock on an open file (no-op where flock is unavailable)"""
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class RotatingCSVWriter:
+    """
+    Buffered, append-only CSV writer rotated by JST date
+
+    Thread-safe and safe for several processes (uvicorn workers) appending
+    to the same file: rows are buffered in memory and written as whole rows
+    with one O_APPEND write under an flock, so rows of different workers
+    never interleave. Flushed by a background thread every `flush_interval`
+    seconds, when the buffer fills, and on close.
+    """
+
+    def __init__(self, log_dir: Path, prefix: str, header: List[str], flush_interval: float = 2.0,
+                 buffer_size: int = 64 * 1024):
+        self.log_dir = Path(log_dir)
+        self.prefix = prefix
+        self.header = header
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        self._file_date: Optional[date] = None
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, day: date) -> Path:
+        return self.log_dir / f"{self.prefix}{day.isoformat()}.csv"
+
+    def _write(self, data: bytes):
+        with _locked(self._fd):
+            while data:
+                written = os.write(self._fd, data)
+                data = data[written:]
+
+    def _flush_buffer(self):
+        data = self._buffer.getvalue()
+        if not data or self._fd is None:
+            return
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._write(data.encode("utf-8"))
+
+    def _open(self, day: date):
+        self._close_file()
+
+        path = self.path_for(day)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+        self._file_date = day
+
+        # Whichever process finds the file empty writes the header
+        with _locked(self._fd):
+            if os.fstat(self._fd).st_size == 0:
+                header = io.StringIO()
+                csv.writer(header).writerow(self.header)
+                os.write(self._fd, header.getvalue().encode("utf-8"))
+                logger.info(f"CSV log file initialized: {path}")
+
+    def _close_file(self):
+        if self._fd is not None:
+            self._flush_buffer()
+            os.close(self._fd)
+        self._fd = None
+        self._file_date = None
+
+    def _ensure_flusher(self):
+        if self._flusher is None and self.flush_interval > 0:
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name=f"csv-flush-{self.prefix}", daemon=True
+            )
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def append(self, row: List[Any], when: datetime):
+        """Append one row to the file for the JST date of `when`"""
+        day = when.astimezone(JST).date()
+        with self._lock:
+            if self._fd is None or day != self._file_date:
+                self._open(day)
+            self._writer.writerow(row)
+            if self._buffer.tell() >= self.buffer_size:
+                self._flush_buffer()
+            self._ensure_flusher()
+
+    def flush(self):
+        with self._lock:
+            self._flush_buffer()
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            self._close_file()
+        self._flusher = None
+        self._stop = threading.Event()
+
+
+# Shared writers (one per log directory)
+_writers: Dict[str, Dict[str, RotatingCSVWriter]] = {}
+_writers_lock = threading.Lock()
+
+
+def _get_writers(log_dir: Path) -> Dict[str, RotatingCSVWriter]:
+    key = str(Path(log_dir).resolve())
+    with _writers_lock:
+        if key not in _writers:
+            flush_interval = get_settings().logging.signal_log_flush_interval
+            _writers[key] = {
+                "signals": RotatingCSVWriter(log_dir, SIGNAL_FILE_PREFIX, SIGNAL_HEADER, flush_interval),
+                "states": RotatingCSVWriter(log_dir, STATE_FILE_PREFIX, STATE_HEADER, flush_interval),
+            }
+        return _writers[key]
+
+
+def close_signal_logs():
+    """Flush and close all shared CSV writers (call on shutdown)"""
+    with _writers_lock:
+        for writers in _writers.values():
+            for writer in writers.values():
+                writer.close()
+        _writers.clear()
+
+
+def flush_signal_logs():
+    """Flush all shared CSV writers without closing them"""
+    with _writers_lock:
+        writers = [w for group in _writers.values() for w in group.values()]
+    for writer in writers:
+        writer.flush()
+
 
 class CSVLoggerService:
     """
     CSV file logging service for signals
     """
 
-    def __init__(self, csv_path: str = None):
+    def __init__(self, log_dir: str = None):
         """
         Initialize CSV logger
 
         Args:
-            csv_path: Path to CSV file (default: data/logs/signals.csv)
+            log_dir: Directory for daily CSV files (default: logging.signal_log_dir)
         """
-        if csv_path is None:
-            base_dir = Path(__file__).parent.parent.parent
-            csv_path = base_dir / "data" / "logs" / "signals.csv"
-
-        self.csv_path = Path(csv_path)
-        self.lock = Lock()
-
-        # Ensure directory exists
-        self.csv_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Initialize CSV file with header if it doesn't exist
-        if not self.csv_path.exists():
-            self._write_header()
-
-    def _write_header(self):
-        """Write CSV header"""
-        header = [
-            "timestamp",
-            "signal_id",
-            "action",
-            "ticker",
-            "quantity",
-            "price",
-            "entry_price",
-            "stop_loss",
-            "take_profit",
-            "atr",
-            "rr_ratio",
-            "rsi",
-            "checksum",
-            "state",
-            "source_ip"
-        ]
+        if log_dir is None:
+            log_dir = get_settings().logging.signal_log_dir
 
-        try:
-            with open(self.csv_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(header)
-            logger.info(f"CSV log file initialized: {self.csv_path}")
-        except Exception as e:
-            logger.error(f"Failed to initialize CSV file: {e}")
-
-    def log_signal(self, signal_data: Dict[str, Any], source_ip: str = None):
+        self.log_dir = Path(log_dir)
+        writers = _get_writers(self.log_dir)
+        self.signal_writer = writers["signals"]
+        self.state_writer = writers["states"]
+
+    def log_signal(self, signal_data: Dict[str, Any], source_ip: str = None, when: datetime = None):
         """
-        Log signal to CSV file
+        Log signal to the daily CSV file
 
         Args:
             signal_data: Signal data dictionary
             source_ip: Source IP address
+            when: Time the signal was accepted (default: now)
+
+        Raises:
+            OSError: The row could not be written (retried by the outbox relay)
         """
-        try:
-            with self.lock:
-                # Use JST timezone
-                jst_now = datetime.now(JST)
-                row = [
-                    jst_now.strftime("%Y-%m-%d %H:%M:%S"),
-                    signal_data.get("signal_id", ""),
-                    signal_data.get("action", ""),
-                    signal_data.get("ticker", ""),
-                    signal_data.get("quantity", ""),
-                    signal_data.get("price", ""),
-                    signal_data.get("entry_price", ""),
-                    signal_data.get("stop_loss", ""),
-                    signal_data.get("take_profit", ""),
-                    signal_data.get("atr", ""),
-                    signal_data.get("rr_ratio", ""),
-                    signal_data.get("rsi", ""),
-                    signal_data.get("checksum", ""),
-                    signal_data.get("state", "PENDING"),
-                    source_ip or ""
-                ]
-
-                # Append to CSV file
-                with open(self.csv_path, 'a', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(row)
-
-                logger.debug(f"Signal logged to CSV: {signal_data.get('signal_id')}")
-
-        except Exception as e:
-            logger.error(f"Failed to log signal to CSV: {e}")
-
-    def update_signal_state(self, signal_id: str, new_state: str):
+        jst_when = (when or clock.now(JST)).astimezone(JST)
+        row = [
+            jst_when.strftime("%Y-%m-%d %H:%M:%S"),
+            signal_data.get("signal_id", ""),
+            signal_data.get("action", ""),
+            signal_data.get("ticker", ""),
+            signal_data.get("quantity", ""),
+            signal_data.get("price", ""),
+            signal_data.get("entry_price", ""),
+            signal_data.get("stop_loss", ""),
+            signal_data.get("take_profit", ""),
+            signal_data.get("atr", ""),
+            signal_data.get("rr_ratio", ""),
+            signal_data.get("rsi", ""),
+            signal_data.get("checksum", ""),
+            signal_data.get("state", "PENDING"),
+            source_ip or ""
+        ]
+
+        self.signal_writer.append(row, jst_when)
+
+        logger.debug(f"Signal logged to CSV: {signal_data.get('signal_id')}")
+
+    def update_signal_state(self, signal_id: str, new_state: str, when: datetime = None):
         """
-        Update signal state in CSV (Note: This reads entire file and rewrites)
+        Record a signal state transition in the append-only state journal
 
         Args:
             signal_id: Signal ID to update
             new_state: New state value
+            when: Time of the transition (default: now)
+
+        Raises:
+            OSError: The row could not be written (retried by the outbox relay)
         """
-        try:
-            with self.lock:
-                # Read all rows
-                rows = []
-                with open(self.csv_path, 'r', newline='', encoding='utf-8') as f:
-                    reader = csv.reader(f)
-                    rows = list(reader)
-
-                # Update matching row
-                updated = False
-                for i, row in enumerate(rows):
-                    if i == 0:  # Skip header
-                        continue
-                    if len(row) > 1 and row[1] == signal_id:  # signal_id is column 1
-                        row[13] = new_state  # state is column 13
-                        updated = True
-                        break
-
-                if updated:
-                    # Write back
-                    with open(self.csv_path, 'w', newline='', encoding='utf-8') as f:
-                        writer = csv.writer(f)
-                        writer.writerows(rows)
-                    logger.debug(f"Updated signal state in CSV: {signal_id} -> {new_state}")
-
-        except Exception as e:
-            logger.error(f"Failed to update signal state in CSV: {e}")
+        jst_when = (when or clock.now(JST)).astimezone(JST)
+        self.state_writer.append(
+            [jst_when.strftime("%Y-%m-%d %H:%M:%S"), signal_id, new_state],
+            jst_when
+        )
+        logger.debug(f"Signal state journaled: {signal_id} -> {new_state}")
 
     def get_csv_path(self) -> str:
-        """Get CSV file path"""
-        return str(self.csv_path.absolute())
+        """Get today's signal CSV file path"""
+        return str(self.signal_writer.path_for(clock.now(JST).date()).absolute())
+
+
+def _daily_files(log_dir: Path, prefix: str, start_date: Optional[date], end_date: Optional[date]) -> List[Path]:
+    files = []
+    for path in sorted(Path(log_dir).glob(f"{prefix}*.csv")):
+        try:
+            day = date.fromisoformat(path.stem[len(prefix):])
+        except ValueError:
+            continue
+        if start_date and day < start_date:
+            continue
+        if end_date and day > end_date:
+            continue
+        files.append(path)
+    return files
+
+
+def _iter_rows(paths: List[Path]) -> Iterator[List[str]]:
+    for path in paths:
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader, None)  # header
+            yield from reader
+
+
+def compact_signal_logs(
+    log_dir: str,
+    output_path: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> Dict[str, int]:
+    """
+    Merge daily signal files and the state journal into one CSV
+
+    The latest journaled state of each signal overrides the state column.
+    Rows written more than once (at-least-once delivery) are merged.
+    The output is written to a temporary file and atomically renamed.
+
+    Args:
+        log_dir: Directory containing the daily files
+        output_path: Final CSV path (e.g. data/logs/signals.csv)
+        start_date: First day to include (None = all)
+        end_date: Last day to include (None = all)
+
+    Returns:
+        {"signals": n, "state_updates": m, "files": k}
+    """
+    flush_signal_logs()
+
+    signal_files = _daily_files(log_dir, SIGNAL_FILE_PREFIX, start_date, end_date)
+    # State changes can happen on a later day than the signal itself
+    state_files = _daily_files(log_dir, STATE_FILE_PREFIX, start_date, None)
+
+    latest_state: Dict[str, str] = {}
+    latest_key: Dict[str, tuple] = {}
+    state_updates = 0
+    for row in _iter_rows(state_files):
+        if len(row) >= 3:
+            key = (row[0], STATE_ORDER.get(row[2], 0))
+            if row[1] not in latest_key or key >= latest_key[row[1]]:
+                latest_state[row[1]] = row[2]
+                latest_key[row[1]] = key
+            state_updates += 1
+
+    state_col = SIGNAL_HEADER.index("state")
+    id_col = SIGNAL_HEADER.index("signal_id")
+
+    output = Path(output_path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_suffix(output.suffix + ".tmp")
+
+    count = 0
+    seen = set()
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(SIGNAL_HEADER)
+        for row in _iter_rows(signal_files):
+            if len(row) > id_col:
+                if row[id_col] in seen:
+                    continue
+                seen.add(row[id_col])
+            if len(row) > state_col and row[id_col] in latest_state:
+                row[state_col] = latest_state[row[id_col]]
+            writer.writerow(row)
+            count += 1
+
+    os.replace(tmp_path, output)
+
+    logger.info(f"Compacted {count} signals ({state_updates} state updates) into {output}")
+    return {"signals": count, "state_updates": state_updates, "files": len(signal_files)}
@@ -4,9 +4,10 @@ Day Trading Check Service
 """
 from typing import Tuple
 from sqlalchemy.orm import Session
-from datetime import datetime, date, time
+from datetime import datetime, time
 import logging
 
+from app.core import clock
 from app.models import ExecutionLog
 
 logger = logging.getLogger(__name__)
@@ -41,7 +42,7 @@ class DayTradingCheckService:
             - reason: Description of the violation
         """
         # 今日の日付を取得（0:00:00から23:59:59まで）
-        today = date.today()
+        today = clock.today()
         today_start = datetime.combine(today, time.min)
         today_end = datetime.combine(today, time.max)
 
@@ -121,7 +122,7 @@ class DayTradingCheckService:
         Returns:
             List of ExecutionLog records for today
         """
-        today = date.today()
+        today = clock.today()
         today_start = datetime.combine(today, time.min)
         today_end = datetime.combine(today, time.max)
 
@@ -138,7 +139,7 @@ class DayTradingCheckService:
         Returns:
             Dictionary with today's trading summary
         """
-        today = date.today()
+        today = clock.today()
         today_start = datetime.combine(today, time.min)
         today_end = datetime.combine(today, time.max)
 
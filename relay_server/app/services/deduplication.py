@@ -2,12 +2,13 @@
 Deduplication Service - Layer 1 defense using Redis
 """
 import hashlib
-import redis
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from datetime import datetime
 
 from app.core.config import get_settings
 from app.core.logging import logger
+from app.core.serialization import dumps, loads
+from app.redis_cache import SharedStateUnavailable, get_hybrid_cache
 
 
 class DeduplicationService:
@@ -17,15 +18,9 @@ class DeduplicationService:
 
     def __init__(self):
         self.settings = get_settings()
-        redis_config = self.settings.redis
 
-        self.redis_client = redis.Redis(
-            host=redis_config.host,
-            port=redis_config.port,
-            db=redis_config.db,
-            password=redis_config.password,
-            decode_responses=redis_config.decode_responses
-        )
+        # Shared Redis client with local TTL mirror (degraded mode on outage)
+        self.redis_client = get_hybrid_cache()
 
         # TTL for idempotency keys (5 minutes)
         self.idempotency_ttl = 300
@@ -57,9 +52,47 @@ class DeduplicationService:
             return self.redis_client.exists(idempotency_key) > 0
         except Exception as e:
             logger.error(f"Redis error in is_duplicate: {e}")
-            # Fail-safe: if Redis is down, allow the request
+            # Redis outages are served by the local mirror; only unexpected errors fail open
             return False
 
+    def claim(self, idempotency_key: str) -> bool:
+        """
+        Atomically claim a request (SET NX), so concurrent deliveries of the
+        same alert on different workers are processed once
+
+        Raises:
+            SharedStateUnavailable: Multi-worker mode and Redis is unreachable
+
+        Returns:
+            True if this request owns the key, False if it is a duplicate
+        """
+        try:
+            return bool(self.redis_client.set(idempotency_key, "processing", ex=self.idempotency_ttl, nx=True))
+        except SharedStateUnavailable:
+            raise
+        except Exception as e:
+            logger.error(f"Redis error in claim: {e}")
+            return True
+
+    def claim_many(self, idempotency_keys: List[str]) -> List[bool]:
+        """claim() for several keys in one pipelined round trip"""
+        try:
+            return self.redis_client.set_many_nx(
+                [(key, "processing", self.idempotency_ttl) for key in idempotency_keys]
+            )
+        except SharedStateUnavailable:
+            raise
+        except Exception as e:
+            logger.error(f"Redis error in claim_many: {e}")
+            return [True] * len(idempotency_keys)
+
+    def release(self, idempotency_key: str):
+        """Drop a claim whose request was rejected (a retry is evaluated again)"""
+        try:
+            self.redis_client.delete(idempotency_key)
+        except Exception as e:
+            logger.error(f"Redis error in release: {e}")
+
     def mark_processed(
         self,
         idempotency_key: str,
@@ -74,11 +107,10 @@ class DeduplicationService:
         """
         try:
             if response_data:
-                import json
                 self.redis_client.setex(
                     idempotency_key,
                     self.idempotency_ttl,
-                    json.dumps(response_data, default=str)
+                    dumps(response_data).decode("utf-8")
                 )
             else:
                 self.redis_client.setex(
@@ -100,9 +132,8 @@ class DeduplicationService:
         """
         try:
             cached = self.redis_client.get(idempotency_key)
-            if cached and cached != "processed":
-                import json
-                return json.loads(cached)
+            if cached and cached not in ("processed", "processing"):
+                return loads(cached)
             return None
         except Exception as e:
             logger.error(f"Redis error in get_cached_response: {e}")
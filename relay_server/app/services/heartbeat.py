@@ -0,0 +1,290 @@
+"""
+Heartbeat Service - In-memory client liveness tracking
+
+Client pings only update an in-memory map. The map is flushed to the
+heartbeat table periodically and on shutdown, and a background monitor
+fires notify_heartbeat_missed once per outage (not once per check).
+With heartbeat.backend: redis the map is shared by all workers.
+"""
+import asyncio
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core import clock
+from app.core.config import get_settings
+from app.core.logging import logger
+from app.models import Heartbeat
+from app.redis_cache import SharedStateUnavailable, get_hybrid_cache
+
+SHARED_KEY = "heartbeat:clients"
+OUTAGE_CLAIM_TTL = 86400
+
+
+def _to_local_naive(value: datetime) -> datetime:
+    """Normalize client timestamps to naive local time (like datetime.now())"""
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+@dataclass
+class ClientHeartbeat:
+    client_id: str
+    last_heartbeat: datetime      # timestamp reported by the client
+    last_seen: datetime           # server receive time (used for liveness)
+    dirty: bool = True
+    alerted: bool = False
+
+
+class HeartbeatTracker:
+    """
+    Coalesces heartbeats in memory
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, ClientHeartbeat] = {}
+        self._lock = threading.Lock()
+
+    def record(self, client_id: str, timestamp: datetime):
+        """Record a heartbeat (O(1), no I/O)"""
+        now = clock.now()
+        with self._lock:
+            entry = self._clients.get(client_id)
+            if entry is None:
+                self._clients[client_id] = ClientHeartbeat(
+                    client_id=client_id,
+                    last_heartbeat=_to_local_naive(timestamp),
+                    last_seen=now
+                )
+                return
+
+            if entry.alerted:
+                logger.info(f"Heartbeat recovered: {client_id}")
+            entry.last_heartbeat = _to_local_naive(timestamp)
+            entry.last_seen = now
+            entry.dirty = True
+            entry.alerted = False
+
+    def snapshot(self, timeout_seconds: int) -> List[Dict]:
+        """Current liveness of all known clients"""
+        now = clock.now()
+        with self._lock:
+            entries = list(self._clients.values())
+
+        result = []
+        for entry in entries:
+            seconds_since_last = (now - entry.last_seen).total_seconds()
+            result.append({
+                "client_id": entry.client_id,
+                "last_heartbeat": entry.last_heartbeat.isoformat(),
+                "status": "active" if seconds_since_last < timeout_seconds else "inactive",
+                "seconds_since_last": int(seconds_since_last)
+            })
+        return result
+
+    def load(self, db: Session, timeout_seconds: int):
+        """
+        Preload known clients from the heartbeat table
+
+        Clients already past the timeout are treated as alerted: their outage
+        started before this process, so a restart does not re-notify.
+        """
+        now = clock.now()
+        rows = db.query(Heartbeat).all()
+        with self._lock:
+            for row in rows:
+                last = _to_local_naive(row.last_heartbeat)
+                self._clients[row.client_id] = ClientHeartbeat(
+                    client_id=row.client_id,
+                    last_heartbeat=last,
+                    last_seen=last,
+                    dirty=False,
+                    alerted=(now - last).total_seconds() >= timeout_seconds
+                )
+        logger.info(f"Heartbeat tracker loaded {len(rows)} clients")
+
+    def flush(self, db: Session) -> int:
+        """
+        Write changed heartbeats to the database
+
+        Returns:
+            Number of rows written
+        """
+        with self._lock:
+            dirty = [
+                (e.client_id, e.last_heartbeat, "inactive" if e.alerted else "active")
+                for e in self._clients.values() if e.dirty
+            ]
+            for entry in self._clients.values():
+                entry.dirty = False
+
+        if not dirty:
+            return 0
+
+        try:
+            existing = {
+                hb.client_id: hb
+                for hb in db.query(Heartbeat).filter(
+                    Heartbeat.client_id.in_([client_id for client_id, _, _ in dirty])
+                ).all()
+            }
+            for client_id, last_heartbeat, status in dirty:
+                heartbeat = existing.get(client_id)
+                if heartbeat:
+                    heartbeat.last_heartbeat = last_heartbeat
+                    heartbeat.status = status
+                else:
+                    db.add(Heartbeat(client_id=client_id, last_heartbeat=last_heartbeat, status=status))
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Retry on next flush
+            with self._lock:
+                for client_id, _, _ in dirty:
+                    if client_id in self._clients:
+                        self._clients[client_id].dirty = True
+            raise
+
+        logger.debug(f"Flushed {len(dirty)} heartbeats")
+        return len(dirty)
+
+    def find_new_outages(self, timeout_seconds: int) -> List[ClientHeartbeat]:
+        """
+        Clients that just crossed the timeout (each outage is reported once)
+        """
+        now = clock.now()
+        missed = []
+        with self._lock:
+            for entry in self._clients.values():
+                if entry.alerted:
+                    continue
+                if (now - entry.last_seen).total_seconds() >= timeout_seconds:
+                    entry.alerted = True
+                    entry.dirty = True
+                    missed.append(entry)
+        return missed
+
+
+class SharedHeartbeatTracker(HeartbeatTracker):
+    """
+    Heartbeats shared by all workers through one Redis hash (heartbeat.backend: redis)
+
+    record() also writes the client's entry to the hash; the monitor merges
+    the hash into the local map before flushing or checking timeouts, and an
+    outage is alerted only by the worker that claims it (SET NX). Each worker
+    flushes the heartbeats it received itself. While Redis is unavailable
+    the local map alone is used.
+    """
+
+    def record(self, client_id: str, timestamp: datetime):
+        super().record(client_id, timestamp)
+        with self._lock:
+            entry = self._clients[client_id]
+            value = f"{entry.last_heartbeat.isoformat()}|{entry.last_seen.isoformat()}"
+        get_hybrid_cache().execute(lambda client: client.hset(SHARED_KEY, client_id, value))
+
+    def sync(self) -> bool:
+        """Merge heartbeats received by other workers (newest wins)"""
+        ok, shared = get_hybrid_cache().execute(lambda client: client.hgetall(SHARED_KEY))
+        if not ok:
+            return False
+        with self._lock:
+            for client_id, value in (shared or {}).items():
+                if isinstance(client_id, bytes):
+                    client_id, value = client_id.decode(), value.decode()
+                try:
+                    last_heartbeat, last_seen = (datetime.fromisoformat(v) for v in value.split("|"))
+                except ValueError:
+                    continue
+                entry = self._clients.get(client_id)
+                if entry is None:
+                    self._clients[client_id] = ClientHeartbeat(
+                        client_id=client_id, last_heartbeat=last_heartbeat, last_seen=last_seen, dirty=False
+                    )
+                elif last_seen > entry.last_seen:
+                    entry.last_heartbeat = last_heartbeat
+                    entry.last_seen = last_seen
+                    entry.alerted = False
+        return True
+
+    def snapshot(self, timeout_seconds: int) -> List[Dict]:
+        self.sync()
+        return super().snapshot(timeout_seconds)
+
+    def find_new_outages(self, timeout_seconds: int) -> List[ClientHeartbeat]:
+        self.sync()
+        cache = get_hybrid_cache()
+        claimed = []
+        for entry in super().find_new_outages(timeout_seconds):
+            # One key per outage (client + last seen), claimed by one worker
+            key = f"{SHARED_KEY}:outage:{entry.client_id}:{entry.last_seen.isoformat()}"
+            try:
+                if cache.set(key, "1", ex=OUTAGE_CLAIM_TTL, nx=True):
+                    claimed.append(entry)
+            except SharedStateUnavailable:
+                # Better an alert from every worker than none
+                claimed.append(entry)
+        return claimed
+
+
+# Global tracker instance
+_tracker: Optional[HeartbeatTracker] = None
+
+
+def get_heartbeat_tracker() -> HeartbeatTracker:
+    """Get global heartbeat tracker"""
+    global _tracker
+    if _tracker is None:
+        shared = get_settings().heartbeat.backend == "redis"
+        _tracker = SharedHeartbeatTracker() if shared else HeartbeatTracker()
+    return _tracker
+
+
+def flush_heartbeats():
+    """Flush the global tracker to the database (blocking)"""
+    from app.database import get_db_context
+
+    with get_db_context() as db:
+        get_heartbeat_tracker().flush(db)
+
+
+def _notify_outages(outages: List[ClientHeartbeat]):
+    from app.core.notification import get_notification_manager
+
+    manager = get_notification_manager()
+    for entry in outages:
+        logger.warning(f"Heartbeat missed: {entry.client_id} (last seen {entry.last_seen.isoformat()})")
+        if manager:
+            manager.notify_heartbeat_missed(entry.client_id, entry.last_seen)
+
+
+async def run_heartbeat_monitor():
+    """
+    Background task: periodic flush and timeout monitoring
+    """
+    config = get_settings().heartbeat
+    tracker = get_heartbeat_tracker()
+    interval = max(min(config.flush_interval_seconds, config.check_interval_seconds), 1)
+    since_flush = 0.0
+
+    while True:
+        await asyncio.sleep(interval)
+        since_flush += interval
+
+        try:
+            if since_flush >= config.flush_interval_seconds:
+                since_flush = 0.0
+                await asyncio.to_thread(flush_heartbeats)
+
+            if config.alert_enabled:
+                outages = tracker.find_new_outages(config.timeout_seconds)
+                if outages:
+                    await asyncio.to_thread(_notify_outages, outages)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Heartbeat monitor error: {e}")
@@ -1,13 +1,13 @@
 """
 Market Hours Control Service
 """
-import pytz
 import jpholiday
 from datetime import datetime, time
 from enum import Enum
 from typing import Dict
 
-from app.core.config import get_settings
+from app.core import clock
+from app.core.snapshot import get_snapshot
 from app.core.logging import logger
 
 
@@ -29,9 +29,11 @@ class MarketHoursService:
     """
 
     def __init__(self):
-        self.settings = get_settings()
+        snapshot = get_snapshot()
+        self.settings = snapshot.settings
         self.config = self.settings.market_hours
-        self.timezone = pytz.timezone(self.config.timezone)
+        self.timezone = snapshot.timezone
+        self.safe_windows = snapshot.safe_windows
 
     def get_current_session(self) -> MarketSession:
         """
@@ -40,7 +42,7 @@ class MarketHoursService:
         Returns:
             MarketSession enum
         """
-        now = datetime.now(self.timezone)
+        now = clock.now(self.timezone)
         current_time = now.time()
         current_date = now.date()
 
@@ -93,7 +95,7 @@ class MarketHoursService:
         Returns:
             True if safe to trade, False otherwise
         """
-        now = datetime.now(self.timezone)
+        now = clock.now(self.timezone)
         current_time = now.time()
         current_date = now.date()
 
@@ -101,25 +103,8 @@ class MarketHoursService:
         # if not self.is_trading_day(current_date):
         #     return False
 
-        # Read safe windows from config
-        morning_config = self.config.safe_trading_windows.get("morning", {})
-        afternoon_config = self.config.safe_trading_windows.get("afternoon", {})
-
-        # Parse time strings from config
-        def parse_time(time_str: str) -> time:
-            h, m = map(int, time_str.split(":"))
-            return time(h, m)
-
-        morning_start = parse_time(morning_config.get("start", "09:30"))
-        morning_end = parse_time(morning_config.get("end", "11:20"))
-        afternoon_start = parse_time(afternoon_config.get("start", "13:00"))
-        afternoon_end = parse_time(afternoon_config.get("end", "14:30"))
-
-        # Check if in safe windows
-        in_morning = morning_start <= current_time <= morning_end
-        in_afternoon = afternoon_start <= current_time <= afternoon_end
-
-        return in_morning or in_afternoon
+        # Windows are parsed once per settings snapshot
+        return any(start <= current_time <= end for start, end in self.safe_windows)
 
     def should_accept_signal(self) -> Dict[str, any]:
         """
@@ -192,7 +177,7 @@ class MarketHoursService:
         Returns:
             Datetime of next safe trading window
         """
-        now = datetime.now(self.timezone)
+        now = clock.now(self.timezone)
         current_time = now.time()
         current_date = now.date()
 
@@ -243,9 +228,9 @@ class MarketHoursService:
 
         return {
             "session": session.value,
-            "is_trading_day": self.is_trading_day(datetime.now(self.timezone).date()),
+            "is_trading_day": self.is_trading_day(clock.now(self.timezone).date()),
             "is_safe_trading_window": is_safe,
             "accept_signals": accept_result["accept"],
-            "current_time": datetime.now(self.timezone).isoformat(),
+            "current_time": clock.now(self.timezone).isoformat(),
             "next_trading_window": self.get_next_trading_window().isoformat()
         }
@@ -0,0 +1,296 @@
+"""
+Outbox - Side effects of signal state changes, delivered off the request path
+
+Endpoints add OutboxEvent rows in the same transaction as the state change
+(enqueue_event) and return after one commit. The outbox relay delivers the events
+in id order, in batches:
+
+- signal_received: row in the daily signal CSV + "Signal received" log line
+- signal_state: row in the state journal
+- order_executed: "Order executed" log line
+
+Delivery is at least once: an event is marked delivered only after its
+effects are written (CSV buffers are flushed before the batch commits), so a
+crash in between repeats it; compact_signal_logs() merges such repeats.
+A failing event (e.g. the day's CSV is open in Excel on Windows) is retried
+with exponential backoff (retry_base_seconds x 2^(attempts-1), capped at
+retry_max_seconds) and parked after max_attempts; requeue_parked() (POST
+/api/admin/outbox/requeue) puts parked events back in the queue.
+
+Cooldowns and idempotency keys are not outbox events: they are claimed
+before the commit because they decide whether the signal is accepted.
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.core import clock
+from app.core.config import get_settings
+from app.core.logging import log_order_executed, log_signal_received, logger
+from app.database import get_db_context
+from app.models import OutboxEvent
+from app.services.csv_logger import JST, CSVLoggerService, flush_signal_logs
+
+# Delete delivered events past outbox.retention_hours this often
+PRUNE_INTERVAL_SECONDS = 300
+
+
+def enqueue_event(db: Session, event_type: str, signal_id: str, payload: Dict):
+    """
+    Add an event to the session (delivered once the caller commits)
+
+    Raises:
+        ValueError: Unknown event type
+    """
+    if event_type not in HANDLERS:
+        raise ValueError(f"Unknown outbox event type: {event_type}")
+    db.add(OutboxEvent(
+        event_type=event_type,
+        signal_id=signal_id,
+        payload=payload,
+        occurred_at=clock.now(JST),
+        attempts=0
+    ))
+
+
+def _occurred_at(event: OutboxEvent) -> datetime:
+    # SQLite returns naive datetimes (stored as JST wall time)
+    when = event.occurred_at
+    return when.replace(tzinfo=JST) if when.tzinfo is None else when
+
+
+def _deliver_signal_received(event: OutboxEvent):
+    payload = event.payload
+    CSVLoggerService().log_signal(payload["signal"], payload.get("source_ip"), when=_occurred_at(event))
+    signal = payload["signal"]
+    log_signal_received(
+        signal_id=event.signal_id,
+        ticker=signal["ticker"],
+        action=signal["action"],
+        quantity=signal["quantity"],
+        entry_price=signal.get("entry_price")
+    )
+
+
+def _deliver_signal_state(event: OutboxEvent):
+    CSVLoggerService().update_signal_state(event.signal_id, event.payload["state"], when=_occurred_at(event))
+
+
+def _deliver_order_executed(event: OutboxEvent):
+    log_order_executed(signal_id=event.signal_id, **event.payload)
+
+
+HANDLERS: Dict[str, Callable[[OutboxEvent], None]] = {
+    "signal_received": _deliver_signal_received,
+    "signal_state": _deliver_signal_state,
+    "order_executed": _deliver_order_executed,
+}
+
+
+class OutboxRelay:
+    """
+    Delivers outbox events in batches
+
+    Several workers may relay at once: a batch is selected with
+    FOR UPDATE SKIP LOCKED on PostgreSQL (SQLite runs a single process).
+    """
+
+    def __init__(self):
+        self.delivered = 0
+        self.failed = 0
+        self.batches = 0
+        self._last_prune = 0.0
+
+    def deliver_batch(self, batch_size: Optional[int] = None) -> int:
+        """
+        Deliver one batch of undelivered events
+
+        Events waiting for their retry backoff are skipped.
+
+        Returns:
+            Number of events delivered
+        """
+        config = get_settings().outbox
+        batch_size = batch_size or config.batch_size
+
+        with get_db_context() as db:
+            events = db.query(OutboxEvent).filter(
+                OutboxEvent.delivered_at.is_(None),
+                OutboxEvent.attempts < config.max_attempts,
+                or_(OutboxEvent.next_attempt_at.is_(None), OutboxEvent.next_attempt_at <= clock.now(JST))
+            ).order_by(OutboxEvent.id).limit(batch_size).with_for_update(skip_locked=True).all()
+
+            if not events:
+                return 0
+
+            delivered = []
+            for event in events:
+                handler = HANDLERS.get(event.event_type)
+                try:
+                    if handler is None:
+                        raise ValueError(f"Unknown outbox event type: {event.event_type}")
+                    handler(event)
+                    delivered.append(event)
+                except Exception as e:
+                    event.attempts += 1
+                    event.last_error = str(e)[:500]
+                    event.next_attempt_at = clock.now(JST) + timedelta(seconds=min(
+                        config.retry_base_seconds * 2 ** (event.attempts - 1), config.retry_max_seconds
+                    ))
+                    self.failed += 1
+                    if event.attempts >= config.max_attempts:
+                        logger.error(f"Outbox event {event.id} ({event.event_type}) parked after {event.attempts} attempts: {e}")
+                    else:
+                        logger.warning(f"Outbox event {event.id} ({event.event_type}) failed, will retry: {e}")
+
+            # Effects must be on disk before the events are marked delivered
+            flush_signal_logs()
+            now = clock.now(JST)
+            for event in delivered:
+                event.delivered_at = now
+            db.commit()
+
+        self.delivered += len(delivered)
+        self.batches += 1
+        return len(delivered)
+
+    def drain(self, deadline_seconds: float = 30.0) -> int:
+        """Deliver until no full batch is delivered (or the deadline passes)"""
+        batch_size = get_settings().outbox.batch_size
+        deadline = time.monotonic() + deadline_seconds
+        total = 0
+        while time.monotonic() < deadline:
+            delivered = self.deliver_batch(batch_size)
+            total += delivered
+            if delivered < batch_size:
+                break
+        return total
+
+    def prune(self, force: bool = False) -> int:
+        """Delete delivered events older than outbox.retention_hours"""
+        now = time.monotonic()
+        if not force and now - self._last_prune < PRUNE_INTERVAL_SECONDS:
+            return 0
+        self._last_prune = now
+
+        cutoff = clock.now(JST) - timedelta(hours=get_settings().outbox.retention_hours)
+        with get_db_context() as db:
+            deleted = db.query(OutboxEvent).filter(
+                OutboxEvent.delivered_at.isnot(None),
+                OutboxEvent.delivered_at < cutoff
+            ).delete(synchronize_session=False)
+        if deleted:
+            logger.info(f"Outbox: pruned {deleted} delivered events")
+        return deleted
+
+    def parked(self, db: Session, limit: int = 100) -> List[OutboxEvent]:
+        """Undelivered events that used up max_attempts, oldest first"""
+        return db.query(OutboxEvent).filter(
+            OutboxEvent.delivered_at.is_(None),
+            OutboxEvent.attempts >= get_settings().outbox.max_attempts
+        ).order_by(OutboxEvent.id).limit(limit).all()
+
+    def requeue_parked(self, db: Session, event_ids: Optional[List[int]] = None) -> int:
+        """
+        Put parked events back in the queue (attempts reset, delivered on the next run)
+
+        Args:
+            event_ids: Only these events (default: every parked event)
+
+        Returns:
+            Number of events requeued
+        """
+        query = db.query(OutboxEvent).filter(
+            OutboxEvent.delivered_at.is_(None),
+            OutboxEvent.attempts >= get_settings().outbox.max_attempts
+        )
+        if event_ids:
+            query = query.filter(OutboxEvent.id.in_(event_ids))
+        requeued = query.update(
+            {OutboxEvent.attempts: 0, OutboxEvent.next_attempt_at: None}, synchronize_session=False
+        )
+        db.commit()
+        if requeued:
+            logger.info(f"Outbox: requeued {requeued} parked events")
+            notify_outbox()
+        return requeued
+
+    def stats(self, db: Session) -> Dict:
+        max_attempts = get_settings().outbox.max_attempts
+        undelivered = db.query(OutboxEvent).filter(OutboxEvent.delivered_at.is_(None))
+        oldest = undelivered.filter(OutboxEvent.attempts < max_attempts).with_entities(
+            func.min(OutboxEvent.occurred_at)
+        ).scalar()
+        if oldest is not None and oldest.tzinfo is None:
+            oldest = oldest.replace(tzinfo=JST)
+        return {
+            "pending": undelivered.filter(OutboxEvent.attempts < max_attempts).count(),
+            "parked": undelivered.filter(OutboxEvent.attempts >= max_attempts).count(),
+            "retrying": undelivered.filter(
+                OutboxEvent.attempts < max_attempts, OutboxEvent.next_attempt_at > clock.now(JST)
+            ).count(),
+            "oldest_pending_age_seconds": round((clock.now(JST) - oldest).total_seconds(), 1) if oldest else None,
+            "delivered": self.delivered,
+            "failed_attempts": self.failed,
+            "batches": self.batches
+        }
+
+
+# Global relay (one per worker process)
+_relay = OutboxRelay()
+
+# Set after a commit with new events, so the relay does not wait a full poll interval
+_wakeup: Optional[asyncio.Event] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_outbox_relay() -> OutboxRelay:
+    return _relay
+
+
+def notify_outbox():
+    """Wake the relay (call after committing new events)"""
+    if _wakeup is not None and _loop is not None and not _loop.is_closed():
+        _loop.call_soon_threadsafe(_wakeup.set)
+
+
+async def run_outbox_relay():
+    """
+    Background task: deliver events when notified, at least every poll interval
+    """
+    global _wakeup, _loop
+    _loop = asyncio.get_running_loop()
+    _wakeup = asyncio.Event()
+
+    while True:
+        config = get_settings().outbox
+        try:
+            await asyncio.wait_for(_wakeup.wait(), config.poll_interval_seconds)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+
+        try:
+            # Another batch right away only if a full one was delivered (failed
+            # events wait for their backoff)
+            while await asyncio.to_thread(_relay.deliver_batch, config.batch_size) >= config.batch_size:
+                pass
+            await asyncio.to_thread(_relay.prune)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Outbox relay error: {e}")
+
+
+def drain_outbox(deadline_seconds: float = 30.0):
+    """Deliver the remaining events (call on shutdown, before the CSV logs are closed)"""
+    global _wakeup, _loop
+    _wakeup = None
+    _loop = None
+    delivered = _relay.drain(deadline_seconds)
+    if delivered:
+        logger.info(f"Outbox: delivered {delivered} events on shutdown")
@@ -0,0 +1,152 @@
+"""
+PnL Engine - FIFO lot accounting for realized PnL
+
+Buys open a lot; sells consume the oldest open lots of the ticker. Only the
+ticker's open lots are read and only the lots a sell touches are updated, so
+realized PnL is computed incrementally (no rescan of the execution history).
+The same FIFO matching is used by tools.backfill_pnl to rebuild everything
+in one streaming pass.
+"""
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.logging import logger
+from app.models import ExecutionLog, Position, PositionLot
+
+
+@dataclass
+class LotFill:
+    """Part of a sell matched against one lot"""
+    lot: object
+    quantity: int
+    cost: float   # lot price + allocated buy commission, per share
+
+
+def match_fifo(lots: Iterable, quantity: int) -> Tuple[List[LotFill], int]:
+    """
+    Consume `quantity` shares from lots in FIFO order
+
+    Lots are any objects with remaining_quantity / price / commission_per_share;
+    their remaining_quantity is decremented in place. Iteration stops as soon
+    as the quantity is covered.
+
+    Returns:
+        (fills, unmatched_quantity)
+    """
+    fills = []
+    remaining = quantity
+    for lot in lots:
+        if remaining <= 0:
+            break
+        if lot.remaining_quantity <= 0:
+            continue
+        take = min(lot.remaining_quantity, remaining)
+        lot.remaining_quantity -= take
+        remaining -= take
+        fills.append(LotFill(lot, take, lot.price + (lot.commission_per_share or 0)))
+    return fills, remaining
+
+
+def realized_pnl(fills: List[LotFill], sell_price: float, sell_commission: float = 0) -> float:
+    """Realized PnL of a sell given its lot fills"""
+    pnl = sum((sell_price - f.cost) * f.quantity for f in fills) - (sell_commission or 0)
+    return round(pnl, 2)
+
+
+def close_pnl(fills: List[LotFill], unmatched: int, sell_price: float, sell_commission: float = 0,
+              avg_cost: Optional[float] = None) -> Optional[float]:
+    """
+    Realized PnL of a sell: lot fills, plus shares not covered by lots
+    (positions opened before lot tracking) costed at the position's avg_cost
+
+    Shares with no basis at all (no lot, no avg_cost) add nothing; None if
+    no share of the sell has a basis. Used by the live engine and the backfill.
+    """
+    if unmatched > 0 and avg_cost is None and not fills:
+        return None
+    pnl = realized_pnl(fills, sell_price, sell_commission)
+    if unmatched > 0 and avg_cost is not None:
+        pnl = round(pnl + (sell_price - avg_cost) * unmatched, 2)
+    return pnl
+
+
+def is_win(pnl: float) -> bool:
+    """Streak rule: a break-even close (PnL is net of commissions) counts as a loss"""
+    return pnl > 0
+
+
+class PnLEngine:
+    """
+    Incremental FIFO PnL on the position_lots table
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def open_lot(self, execution: ExecutionLog) -> PositionLot:
+        """Record a buy execution as a new lot"""
+        lot = PositionLot(
+            ticker=execution.ticker,
+            execution_id=execution.execution_id,
+            quantity=execution.quantity,
+            remaining_quantity=execution.quantity,
+            price=execution.price,
+            commission_per_share=(execution.commission or 0) / execution.quantity if execution.quantity else 0,
+            opened_at=execution.executed_at
+        )
+        self.db.add(lot)
+        return lot
+
+    def _open_lots(self, ticker: str):
+        """Open lots of a ticker, oldest first (closed lots are never read)"""
+        return self.db.query(PositionLot).filter(
+            PositionLot.ticker == ticker,
+            PositionLot.remaining_quantity > 0
+        ).order_by(PositionLot.opened_at.asc(), PositionLot.id.asc()).with_for_update().all()
+
+    def close_lots(self, execution: ExecutionLog) -> Optional[float]:
+        """
+        Match a sell execution against open lots and set its realized_pnl
+
+        The matched lots are consumed either way (the shares were sold).
+        Shares not covered by lots are costed at the position's average cost
+        (close_pnl).
+
+        Returns:
+            Realized PnL, or None if no cost basis is known for any share
+        """
+        fills, unmatched = match_fifo(self._open_lots(execution.ticker), execution.quantity)
+
+        avg_cost = None
+        if unmatched > 0:
+            position = self.db.query(Position).filter(Position.ticker == execution.ticker).with_for_update().first()
+            if position is not None:
+                avg_cost = position.avg_cost
+                logger.warning(f"{unmatched} shares of {execution.ticker} costed at position avg_cost (no lots)")
+            else:
+                logger.warning(
+                    f"No cost basis for {unmatched} shares of {execution.ticker} "
+                    f"({execution.execution_id}), realized PnL covers the matched lots only"
+                )
+
+        pnl = close_pnl(fills, unmatched, execution.price, execution.commission, avg_cost)
+        if pnl is None:
+            return None
+
+        execution.realized_pnl = pnl
+        logger.info(f"Realized PnL {execution.ticker} {execution.execution_id}: {pnl:,.0f}")
+        return pnl
+
+    def apply(self, execution: ExecutionLog) -> Optional[float]:
+        """
+        Update lots for an execution
+
+        Returns:
+            Realized PnL for sells, None for buys
+        """
+        if execution.action == "buy":
+            self.open_lot(execution)
+            return None
+        return self.close_lots(execution)
@@ -4,7 +4,6 @@ Pre-Order Validation Service
 """
 from typing import Dict, Any, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from datetime import date
 import re
 import logging
 
@@ -13,7 +12,11 @@ from app.services.market_hours import MarketHoursService
 from app.services.cooldown import CooldownService
 from app.services.blacklist import BlacklistService
 from app.services.day_trading_check import DayTradingCheckService
+from app.services.trade_rate_limiter import TradeRateLimiter
+from app.services.price_store import get_price_store
+from app.services.ticker_master import get_ticker_master
 from app.models import Position, DailyStats
+from app.core import clock
 from app.core.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -32,6 +35,8 @@ class PreOrderValidationService:
         self.cooldown = CooldownService()
         self.blacklist = BlacklistService(db)
         self.day_trading_check = DayTradingCheckService(db)
+        self.trade_rate = TradeRateLimiter()
+        self.ticker_master = get_ticker_master()
 
     def validate_order(
         self,
@@ -85,7 +90,7 @@ class PreOrderValidationService:
         checks["day_trading"] = "OK"
 
         # === Level 4: Daily Limits Check ===
-        daily_limit_ok, daily_limit_reason = self._check_daily_limits(action)
+        daily_limit_ok, daily_limit_reason = self._check_daily_limits(action, ticker)
         if not daily_limit_ok:
             checks["daily_limits"] = "BLOCKED"
             return False, daily_limit_reason, checks
@@ -184,13 +189,14 @@ class PreOrderValidationService:
             errors.append("Quantity must be positive")
             return errors
 
-        # 2. Unit check (must be multiple of 100 for Japanese stocks)
-        if quantity % 100 != 0:
-            errors.append(f"Quantity must be multiple of 100 (got {quantity})")
+        # 2. Unit check (trading unit from the ticker master, 100 by default)
+        lot_size = self.ticker_master.lot_size(ticker)
+        if quantity % lot_size != 0:
+            errors.append(f"Quantity must be multiple of {lot_size} (got {quantity})")
 
         # 3. Minimum check
-        if quantity < 100:
-            errors.append(f"Quantity too small: {quantity} (minimum 100)")
+        if quantity < lot_size:
+            errors.append(f"Quantity too small: {quantity} (minimum {lot_size})")
 
         # 4. Maximum check
         if quantity > 10000:
@@ -219,37 +225,33 @@ class PreOrderValidationService:
 
         return errors
 
-    def _check_daily_limits(self, action: str) -> Tuple[bool, str]:
+    def _check_daily_limits(self, action: str, ticker: str) -> Tuple[bool, str]:
         """
-        Check daily trading limits
+        Check daily and hourly trading limits
 
         Returns:
             Tuple of (ok: bool, reason: str)
         """
-        today = date.today()
+        today = clock.today()
         stats = self.db.query(DailyStats).filter(
             DailyStats.date == today
         ).first()
 
-        if not stats:
-            # No trades today, limits OK
-            return True, ""
-
         risk_config = self.settings.risk_control
 
-        # Check daily entry limit (for buy orders)
-        if action == "buy":
-            if stats.entry_count >= risk_config.max_daily_entries:
-                return False, f"daily_entry_limit_exceeded: {stats.entry_count}/{risk_config.max_daily_entries}"
-
-        # Check daily total trades limit
-        if stats.total_trades >= risk_config.max_daily_trades:
-            return False, f"daily_trade_limit_exceeded: {stats.total_trades}/{risk_config.max_daily_trades}"
+        # No stats means no trades today, daily limits OK
+        if stats:
+            # Check daily entry limit (for buy orders)
+            if action == "buy":
+                if stats.entry_count >= risk_config.max_daily_entries:
+                    return False, f"daily_entry_limit_exceeded: {stats.entry_count}/{risk_config.max_daily_entries}"
 
-        # Check hourly trade limit
-        # TODO: Implement hourly tracking if needed
+            # Check daily total trades limit
+            if stats.total_trades >= risk_config.max_daily_trades:
+                return False, f"daily_trade_limit_exceeded: {stats.total_trades}/{risk_config.max_daily_trades}"
 
-        return True, ""
+        # Check hourly trade limit (sliding window, global and per ticker)
+        return self.trade_rate.check(ticker)
 
     def _check_risk_limits(self, ticker: str, quantity: int) -> Tuple[bool, str]:
         """
@@ -276,16 +278,16 @@ class PreOrderValidationService:
             if open_positions >= risk_config.max_open_positions:
                 return False, f"max_open_positions_exceeded: {open_positions}/{risk_config.max_open_positions}"
 
-        # 2. Check total exposure (requires price estimation)
-        # For now, we estimate using a conservative price per share
-        # In production, this should fetch real-time price
-        estimated_price_per_share = 1000  # Conservative estimate
-        order_value = quantity * estimated_price_per_share
+        # 2. Check total exposure (last known price, O(1) lookup)
+        price_per_share, price_status = get_price_store().resolve(ticker)
+        if price_per_share is None:
+            return False, f"price_unavailable: {ticker}"
+        if price_status != "fresh":
+            logger.warning(f"Sizing {ticker} with {price_status} price: {price_per_share}")
+        order_value = quantity * price_per_share
 
-        current_exposure = sum(
-            p.quantity * p.avg_cost
-            for p in self.db.query(Position).filter(Position.quantity > 0).all()
-        )
+        open_position_rows = self.db.query(Position).filter(Position.quantity > 0).all()
+        current_exposure = sum(p.quantity * p.avg_cost for p in open_position_rows)
 
         total_exposure = current_exposure + order_value
 
@@ -294,18 +296,28 @@ class PreOrderValidationService:
 
         # 3. Check per-ticker position limit
         if existing_position:
-            new_position_value = (existing_position.quantity + quantity) * existing_position.avg_cost
+            new_position_value = existing_position.quantity * existing_position.avg_cost + order_value
         else:
             new_position_value = order_value
 
         if new_position_value > risk_config.max_position_per_ticker:
             return False, f"max_position_per_ticker_exceeded: {new_position_value}/{risk_config.max_position_per_ticker}"
 
-        # 4. Check sector exposure (requires sector classification)
-        # TODO: Implement sector exposure check if sector data is available
+        # 4. Check sector exposure (sector from the ticker master)
+        sector = self.ticker_master.sector(ticker)
+        if sector:
+            sector_exposure = sum(
+                p.quantity * p.avg_cost
+                for p in open_position_rows
+                if (p.sector or self.ticker_master.sector(p.ticker)) == sector
+            ) + order_value
+            max_sector_exposure = risk_config.max_total_exposure * risk_config.max_sector_exposure_pct
+
+            if sector_exposure > max_sector_exposure:
+                return False, f"max_sector_exposure_exceeded: {sector} {sector_exposure}/{max_sector_exposure}"
 
         # 5. Check daily loss limit
-        today = date.today()
+        today = clock.today()
         stats = self.db.query(DailyStats).filter(
             DailyStats.date == today
         ).first()
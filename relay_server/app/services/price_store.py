@@ -0,0 +1,249 @@
+"""
+Price Store - Last known price per ticker
+
+Fed by webhook payloads (entry_price) and execution reports, seeded on cold
+start from a CSV produced by tools.seed_prices (analysis OHLCV files), and
+saved back to the same file on shutdown. Lookups are O(1) dict reads so the
+pre-order validator can size orders with real notional values. With
+price_store.backend: redis the prices are shared by all workers.
+"""
+import csv
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core import clock
+from app.core.config import get_settings
+from app.core.logging import logger
+from app.redis_cache import get_hybrid_cache
+
+SEED_HEADER = ["ticker", "price", "as_of", "source"]
+
+SHARED_KEY = "prices:last"
+
+
+@dataclass
+class PriceQuote:
+    price: float
+    as_of: float        # epoch seconds
+    source: str         # webhook / execution / seed
+
+
+class LastPriceStore:
+    """
+    Thread-safe ticker -> last price map
+    """
+
+    def __init__(self):
+        self._quotes: Dict[str, PriceQuote] = {}
+        self._lock = threading.Lock()
+
+    def update(self, ticker: str, price: float, source: str, as_of: Optional[float] = None) -> bool:
+        """
+        Record a price (older quotes never overwrite newer ones)
+
+        Returns:
+            True if the stored quote changed
+        """
+        if price is None or price <= 0:
+            return False
+        as_of = as_of if as_of is not None else clock.timestamp()
+        with self._lock:
+            current = self._quotes.get(ticker)
+            if current is not None and current.as_of > as_of:
+                return False
+            self._quotes[ticker] = PriceQuote(float(price), as_of, source)
+            return True
+
+    def get(self, ticker: str) -> Optional[PriceQuote]:
+        return self._quotes.get(ticker)
+
+    def resolve(self, ticker: str) -> Tuple[Optional[float], str]:
+        """
+        Price to use for risk sizing, applying the staleness policy
+
+        Returns:
+            (price, status) - status is "fresh", "stale", "fallback" or
+            "unavailable" (price is None only for "unavailable")
+        """
+        config = get_settings().price_store
+        quote = self.get(ticker)
+
+        if quote is not None and clock.timestamp() - quote.as_of <= config.max_age_seconds:
+            return quote.price, "fresh"
+
+        if config.stale_action == "use_last" and quote is not None:
+            return quote.price, "stale"
+        if config.stale_action == "reject":
+            return None, "unavailable"
+        return float(config.fallback_price), "fallback"
+
+    def load(self, rows: Iterable[Dict[str, str]]) -> int:
+        """Merge rows of ticker/price/as_of/source (newest wins)"""
+        count = 0
+        for row in rows:
+            try:
+                if self.update(row["ticker"], float(row["price"]), row.get("source") or "seed", float(row["as_of"])):
+                    count += 1
+            except (KeyError, ValueError):
+                continue
+        return count
+
+    def load_file(self, path: str) -> int:
+        """Load a seed/snapshot CSV if it exists"""
+        if not path or not Path(path).exists():
+            return 0
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            count = self.load(csv.DictReader(f))
+        logger.info(f"Price store loaded {count} prices from {path}")
+        return count
+
+    def save_file(self, path: str) -> int:
+        """Atomically write all quotes to CSV"""
+        rows = self.snapshot()
+        write_price_file(path, rows)
+        return len(rows)
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            items = list(self._quotes.items())
+        return [
+            {"ticker": ticker, "price": q.price, "as_of": q.as_of, "source": q.source}
+            for ticker, q in sorted(items)
+        ]
+
+    def __len__(self) -> int:
+        return len(self._quotes)
+
+
+def _encode_quote(quote: PriceQuote) -> str:
+    return f"{quote.price}|{quote.as_of}|{quote.source}"
+
+
+def _decode_quote(value) -> Optional[PriceQuote]:
+    if isinstance(value, bytes):
+        value = value.decode()
+    try:
+        price, as_of, source = value.split("|", 2)
+        return PriceQuote(float(price), float(as_of), source)
+    except (AttributeError, ValueError):
+        return None
+
+
+class SharedPriceStore(LastPriceStore):
+    """
+    Last prices shared by all workers through one Redis hash (price_store.backend: redis)
+
+    Updates are written through; lookups read the ticker's shared quote and
+    keep the newer of it and the local one. While Redis is unavailable the
+    local map alone is used.
+    """
+
+    def _merge(self, ticker: str, quote: Optional[PriceQuote]):
+        if quote is None:
+            return
+        with self._lock:
+            current = self._quotes.get(ticker)
+            if current is None or quote.as_of > current.as_of:
+                self._quotes[ticker] = quote
+
+    def update(self, ticker: str, price: float, source: str, as_of: Optional[float] = None) -> bool:
+        if not super().update(ticker, price, source, as_of):
+            return False
+        value = _encode_quote(self._quotes[ticker])
+        get_hybrid_cache().execute(lambda client: client.hset(SHARED_KEY, ticker, value))
+        return True
+
+    def get(self, ticker: str) -> Optional[PriceQuote]:
+        ok, value = get_hybrid_cache().execute(lambda client: client.hget(SHARED_KEY, ticker))
+        if ok and value:
+            self._merge(ticker, _decode_quote(value))
+        return super().get(ticker)
+
+    def sync(self) -> bool:
+        """Merge all shared quotes into the local map"""
+        ok, shared = get_hybrid_cache().execute(lambda client: client.hgetall(SHARED_KEY))
+        if not ok:
+            return False
+        for ticker, value in (shared or {}).items():
+            self._merge(ticker.decode() if isinstance(ticker, bytes) else ticker, _decode_quote(value))
+        return True
+
+    def load(self, rows: Iterable[Dict[str, str]]) -> int:
+        """Seed locally, then publish the quotes the shared map lacks or has older"""
+        local = LastPriceStore()
+        count = local.load(rows)
+        self.sync()
+        with self._lock:
+            newer = {}
+            for ticker, quote in local._quotes.items():
+                current = self._quotes.get(ticker)
+                if current is None or quote.as_of > current.as_of:
+                    self._quotes[ticker] = quote
+                    newer[ticker] = _encode_quote(quote)
+        if newer:
+            get_hybrid_cache().execute(lambda client: client.hset(SHARED_KEY, mapping=newer))
+        return count
+
+    def snapshot(self) -> List[Dict]:
+        self.sync()
+        return super().snapshot()
+
+
+def write_price_file(path: str, rows: List[Dict]):
+    """Write ticker/price/as_of/source rows via tmp file + rename"""
+    output = Path(path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_suffix(output.suffix + ".tmp")
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=SEED_HEADER)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp_path, output)
+
+
+# Global price store instance
+_price_store: Optional[LastPriceStore] = None
+
+
+def _new_store() -> LastPriceStore:
+    shared = get_settings().price_store.backend == "redis"
+    return SharedPriceStore() if shared else LastPriceStore()
+
+
+def get_price_store() -> LastPriceStore:
+    """Get global price store"""
+    global _price_store
+    if _price_store is None:
+        _price_store = _new_store()
+    return _price_store
+
+
+def init_price_store(load_seed: bool = True) -> LastPriceStore:
+    """Create the global store and load the seed/snapshot file"""
+    global _price_store
+    _price_store = _new_store()
+    if load_seed:
+        preload_price_store()
+    return _price_store
+
+
+def preload_price_store() -> int:
+    """
+    Merge the seed/snapshot file into the global store
+
+    Newest quote wins, so this can run after the server started taking
+    webhooks without overwriting their prices.
+    """
+    return get_price_store().load_file(get_settings().price_store.seed_file)
+
+
+def save_price_store():
+    """Persist the global store to the seed file (call on shutdown)"""
+    path = get_settings().price_store.seed_file
+    if _price_store is None or not path or not len(_price_store):
+        return
+    count = _price_store.save_file(path)
+    logger.info(f"Price store saved {count} prices to {path}")
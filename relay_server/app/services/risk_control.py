@@ -1,14 +1,19 @@
 """
 Final Risk Control Service - Last line of defense
 """
+from sqlalchemy import Date, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, date
 from typing import Dict, Optional
 
 from app.models import Position, DailyStats, Signal
+from app.core import clock
 from app.core.config import get_settings
 from app.core.logging import log_risk_violation, logger
+from app.services.ticker_master import get_ticker_master
 
 
 class RiskControlService:
@@ -78,7 +83,7 @@ class RiskControlService:
 
     def _check_daily_limits(self, action: str) -> bool:
         """Check daily hard limits"""
-        today = date.today()
+        today = clock.today()
         stats = self.db.query(DailyStats).filter(
             DailyStats.date == today
         ).first()
@@ -134,12 +139,14 @@ class RiskControlService:
             if position_value > self.config.max_position_per_ticker:
                 return False
 
-        # Check sector exposure (if sector provided)
+        # Check sector exposure (sector from the ticker master if not provided)
+        ticker_master = get_ticker_master()
+        sector = sector or ticker_master.sector(ticker)
         if sector:
             sector_exposure = sum(
                 p.quantity * p.avg_cost
                 for p in positions
-                if p.sector == sector
+                if (p.sector or ticker_master.sector(p.ticker)) == sector
             ) + position_value
 
             max_sector_exposure = self.config.max_total_exposure * self.config.max_sector_exposure_pct
@@ -149,9 +156,40 @@ class RiskControlService:
 
         return True
 
+    def check_auto_kill_switch(self) -> bool:
+        """
+        Activate the kill switch if today's realized losses cross a limit
+
+        Called after each execution report updates daily stats. Only the
+        loss triggers apply here; the daily trade count is already enforced
+        by the daily limits in pre-order validation.
+
+        Returns:
+            True if the kill switch was activated now
+        """
+        stats = self.db.query(DailyStats).filter(DailyStats.date == clock.today()).first()
+        if not stats:
+            return False
+
+        if stats.consecutive_losses >= self.config.max_consecutive_losses:
+            reason = f"{stats.consecutive_losses} consecutive losses"
+        elif stats.total_pnl <= self.config.max_daily_loss:
+            reason = f"Daily loss {stats.total_pnl:,.0f} yen (limit {self.config.max_daily_loss:,})"
+        else:
+            return False
+
+        from app.services.kill_switch import KillSwitchService
+        kill_switch = KillSwitchService(self.db)
+        if not kill_switch.is_trading_enabled():
+            return False  # already active
+
+        kill_switch.activate("auto_trigger", reason)
+        log_risk_violation("auto_kill_switch_triggered")
+        return True
+
     def _should_trigger_auto_killswitch(self) -> bool:
         """Check if auto kill-switch should be triggered"""
-        today = date.today()
+        today = clock.today()
         stats = self.db.query(DailyStats).filter(
             DailyStats.date == today
         ).first()
@@ -173,37 +211,36 @@ class RiskControlService:
 
         return False
 
-    def update_daily_stats(
-        self,
-        action: str,
-        pnl: Optional[float] = None,
-        is_win: Optional[bool] = None
-    ):
-        """Update daily statistics"""
-        today = date.today()
+    def get_or_create_daily_stats(self, today: date) -> Optional[DailyStats]:
+        """
+        Get the DailyStats row for a day, creating it if missing
 
+        Returns:
+            DailyStats or None if it could not be created
+        """
         # Get or create daily stats record (with retry on UNIQUE constraint violation)
         stats = self.db.query(DailyStats).filter(
             DailyStats.date == today
         ).first()
 
         if not stats:
-            # Use INSERT OR IGNORE for SQLite to handle race conditions
-            from sqlalchemy import text
-            from datetime import datetime as dt
+            # INSERT ... ON CONFLICT DO NOTHING: concurrent requests / workers
+            # creating the same day's row do not fail (SQLite and PostgreSQL).
+            # The date is bound as a DATE so it is stored the way the lookup
+            # above compares it.
             try:
-                # Try to insert with OR IGNORE (SQLite specific - won't raise error if exists)
-                now = dt.now()
-                self.db.execute(text("""
-                    INSERT OR IGNORE INTO daily_stats
-                    (date, entry_count, exit_count, total_trades, error_count, total_pnl, total_commission, consecutive_losses, consecutive_wins, created_at, updated_at)
-                    VALUES (:date, 0, 0, 0, 0, 0.0, 0.0, 0, 0, :now, NULL)
-                """), {"date": today, "now": now})
-                # Flush to sync with DB (OR IGNORE won't raise error)
+                dialect = self.db.get_bind().dialect.name
+                insert = pg_insert if dialect == "postgresql" else sqlite_insert
+                self.db.execute(
+                    insert(DailyStats.__table__).values(
+                        date=literal(today, Date), entry_count=0, exit_count=0, total_trades=0, error_count=0,
+                        total_pnl=0.0, total_commission=0.0, consecutive_losses=0, consecutive_wins=0,
+                        created_at=datetime.now()
+                    ).on_conflict_do_nothing(index_elements=["date"])
+                )
                 self.db.flush()
-                logger.info(f"Executed INSERT OR IGNORE for daily_stats {today}")
             except Exception as e:
-                logger.warning(f"Error in INSERT OR IGNORE: {e}")
+                logger.warning(f"Error creating daily_stats for {today}: {e}")
                 # Continue anyway - query might still find it
 
             # Query again to get the record (either newly created or existing)
@@ -212,28 +249,54 @@ class RiskControlService:
             ).first()
 
             if not stats:
-                logger.error(f"Cannot find or create daily_stats for {today} even after INSERT OR IGNORE, skipping stats update")
-                return  # Skip stats update rather than crash
+                logger.error(f"Cannot find or create daily_stats for {today}")
+
+        return stats
 
-        # Update counts
+    def update_daily_stats(
+        self,
+        action: str,
+        pnl: Optional[float] = None,
+        is_win: Optional[bool] = None,
+        commission: float = 0
+    ):
+        """
+        Update daily statistics (flushed; committed by the caller)
+
+        Args:
+            action: buy / sell
+            pnl: Realized PnL of a closing sell
+            is_win: Streak update (True: win, False: loss incl. break-even, None: none)
+            commission: Commission of the execution
+        """
+        stats = self.get_or_create_daily_stats(clock.today())
+        if not stats:
+            return  # Skip stats update rather than crash
+
+        # Update counts and PnL as SQL increments (UPDATE ... SET x = x + 1),
+        # so concurrent execution reports cannot lose updates
         if action == "buy":
-            stats.entry_count += 1
+            stats.entry_count = DailyStats.entry_count + 1
         elif action == "sell":
-            stats.exit_count += 1
+            stats.exit_count = DailyStats.exit_count + 1
 
-        stats.total_trades += 1
+        stats.total_trades = DailyStats.total_trades + 1
 
         # Update PnL
         if pnl is not None:
-            stats.total_pnl += pnl
+            stats.total_pnl = DailyStats.total_pnl + pnl
 
             # Update consecutive wins/losses
             if is_win is not None:
                 if is_win:
-                    stats.consecutive_wins += 1
+                    stats.consecutive_wins = DailyStats.consecutive_wins + 1
                     stats.consecutive_losses = 0
                 else:
-                    stats.consecutive_losses += 1
+                    stats.consecutive_losses = DailyStats.consecutive_losses + 1
                     stats.consecutive_wins = 0
 
-        # Note: commit is called by the caller (signals.py)
+        if commission:
+            stats.total_commission = DailyStats.total_commission + commission
+
+        self.db.flush()
+
@@ -0,0 +1,24 @@
+"""
+Signal Priority - Order of the pending queue
+
+A signal's priority is fixed when it arrives and stored in
+signals.priority (indexed with state and created_at):
+
+    priority = actions[action] + exit_reasons[exit_reason] + tickers[ticker]
+
+The pending poll returns PENDING signals by priority (highest first), then
+by age (oldest first), so a stop-loss sell is not queued behind a burst of
+buys and their validation.
+"""
+from typing import Optional
+
+from app.core.config import SignalPriorityConfig
+
+
+def signal_priority(config: SignalPriorityConfig, action, ticker: str, exit_reason: Optional[str] = None) -> int:
+    """Priority of a new signal (unknown keys count 0)"""
+    action = getattr(action, "value", action)
+    priority = config.actions.get(str(action).lower(), 0)
+    if exit_reason:
+        priority += config.exit_reasons.get(exit_reason.lower(), 0)
+    return priority + config.tickers.get(ticker, 0)
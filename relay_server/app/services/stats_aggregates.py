@@ -0,0 +1,221 @@
+"""
+Stats Aggregates - Dashboard counters maintained on write
+
+Every accepted signal, execution report and risk violation increments a few
+counters instead of the dashboard scanning signals / execution_log per
+request:
+
+    scope   key              metrics
+    day     ""               signals, trades, entries, exits, volume, pnl,
+                             wins, losses, commission, rejections
+    ticker  "7203"           signals, trades, buys, sells, volume, pnl, commission, rejections
+    reason  "cooldown_..."   count (log_risk_violation reason)
+    hour    "09"             signals, trades, rejections
+
+Increments update this worker's in-memory totals (the /api/admin/stats
+endpoints read them in O(1)) and are queued as deltas. A background task
+adds the deltas to the stats_aggregates table every
+stats.flush_interval_seconds (UPDATE value = value + delta), and on
+shutdown. Today's totals are loaded from the table at startup. With
+server.multi_worker the endpoints read the table instead (cached for
+stats.read_cache_seconds), since each worker only sees its own increments.
+"""
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core import clock
+from app.core.config import get_settings
+from app.core.logging import logger
+from app.models import StatsAggregate
+from app.services.pnl_engine import is_win
+
+# (scope, key, metric)
+Counter = Tuple[str, str, str]
+
+
+class StatsAggregator:
+    """In-memory dashboard counters with delta flush to stats_aggregates"""
+
+    def __init__(self):
+        self._totals: Dict[date, Dict[Counter, float]] = {}
+        self._pending: Dict[Tuple[date, Counter], float] = defaultdict(float)
+        self._lock = threading.Lock()
+        self._read_cache: Dict[date, Tuple[float, Dict[Counter, float]]] = {}
+
+    # ----- increments -----
+
+    def add(self, increments: List[Tuple[str, str, str, float]], day: Optional[date] = None):
+        """Add [(scope, key, metric, amount)] to a day (default: today)"""
+        day = day or clock.today()
+        with self._lock:
+            totals = self._totals.setdefault(day, defaultdict(float))
+            for scope, key, metric, amount in increments:
+                if not amount:
+                    continue
+                counter = (scope, key, metric)
+                totals[counter] += amount
+                self._pending[(day, counter)] += amount
+
+    def record_signal(self, ticker: str, action: str):
+        """Signal accepted by the webhook"""
+        hour = f"{clock.now().hour:02d}"
+        self.add([
+            ("day", "", "signals", 1),
+            ("ticker", ticker, "signals", 1),
+            ("hour", hour, "signals", 1),
+        ])
+
+    def record_execution(self, ticker: str, action: str, amount: float,
+                         pnl: Optional[float] = None, commission: float = 0):
+        """Execution report (pnl: realized PnL of a closing sell)"""
+        hour = f"{clock.now().hour:02d}"
+        side = "buys" if action == "buy" else "sells"
+        increments = [
+            ("day", "", "trades", 1),
+            ("day", "", "entries" if action == "buy" else "exits", 1),
+            ("day", "", "volume", amount),
+            ("day", "", "commission", commission or 0),
+            ("ticker", ticker, "trades", 1),
+            ("ticker", ticker, side, 1),
+            ("ticker", ticker, "volume", amount),
+            ("ticker", ticker, "commission", commission or 0),
+            ("hour", hour, "trades", 1),
+        ]
+        if pnl is not None:
+            increments += [
+                ("day", "", "pnl", pnl),
+                ("day", "", "wins" if is_win(pnl) else "losses", 1),
+                ("ticker", ticker, "pnl", pnl),
+            ]
+        self.add(increments)
+
+    def record_rejection(self, reason: str, ticker: Optional[str] = None):
+        """Risk violation (log_risk_violation)"""
+        hour = f"{clock.now().hour:02d}"
+        increments = [
+            ("day", "", "rejections", 1),
+            ("reason", str(reason)[:50], "count", 1),
+            ("hour", hour, "rejections", 1),
+        ]
+        if ticker:
+            increments.append(("ticker", ticker, "rejections", 1))
+        self.add(increments)
+
+    # ----- persistence -----
+
+    def flush(self, db: Session) -> int:
+        """Add the queued deltas to stats_aggregates (one upsert per counter)"""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(float)
+        if not pending:
+            return 0
+
+        dialect = db.get_bind().dialect.name
+        insert = pg_insert if dialect == "postgresql" else sqlite_insert
+        table = StatsAggregate.__table__
+        rows = [
+            {"day": day, "scope": scope, "key": key, "metric": metric, "value": amount}
+            for (day, (scope, key, metric)), amount in pending.items()
+        ]
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=["day", "scope", "key", "metric"],
+            set_={"value": table.c.value + statement.excluded.value}
+        )
+        try:
+            db.execute(statement, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Keep the deltas for the next flush
+            with self._lock:
+                for key, amount in pending.items():
+                    self._pending[key] += amount
+            raise
+
+        return len(rows)
+
+    def _read(self, db: Session, day: date) -> Dict[Counter, float]:
+        rows = db.query(StatsAggregate).filter(StatsAggregate.day == day).all()
+        return {(r.scope, r.key, r.metric): r.value for r in rows}
+
+    def load(self, db: Session, day: Optional[date] = None):
+        """Load a day's stored totals (plus deltas not flushed yet)"""
+        day = day or clock.today()
+        stored = self._read(db, day)
+        with self._lock:
+            totals = defaultdict(float, stored)
+            for (pending_day, counter), amount in self._pending.items():
+                if pending_day == day:
+                    totals[counter] += amount
+            self._totals[day] = totals
+
+    def counters(self, db: Session, day: date) -> Dict[Counter, float]:
+        """All counters of a day"""
+        config = get_settings()
+        if config.server.multi_worker:
+            cached = self._read_cache.get(day)
+            if cached is None or time.monotonic() - cached[0] > config.stats.read_cache_seconds:
+                cached = (time.monotonic(), self._read(db, day))
+                self._read_cache[day] = cached
+            return cached[1]
+
+        if day not in self._totals:
+            self.load(db, day)
+        with self._lock:
+            return dict(self._totals[day])
+
+    def view(self, db: Session, day: date, scope: str) -> Dict[str, Dict[str, float]]:
+        """key -> {metric: value} of one scope"""
+        result: Dict[str, Dict[str, float]] = defaultdict(dict)
+        for (counter_scope, key, metric), value in self.counters(db, day).items():
+            if counter_scope == scope:
+                value = round(value, 2)
+                result[key][metric] = int(value) if value.is_integer() else value
+        return dict(result)
+
+
+# Global aggregator (one per worker process)
+_aggregator = StatsAggregator()
+
+
+def get_stats_aggregator() -> StatsAggregator:
+    return _aggregator
+
+
+def load_stats_aggregates():
+    """Load today's totals (call at startup, after the database)"""
+    from app.database import get_db_context
+
+    global _aggregator
+    _aggregator = StatsAggregator()
+    with get_db_context() as db:
+        _aggregator.load(db)
+
+
+def flush_stats_aggregates():
+    """Flush queued deltas to the database (blocking)"""
+    from app.database import get_db_context
+
+    with get_db_context() as db:
+        _aggregator.flush(db)
+
+
+async def run_stats_flusher():
+    """Background task: flush deltas every stats.flush_interval_seconds"""
+    while True:
+        await asyncio.sleep(get_settings().stats.flush_interval_seconds)
+        try:
+            await asyncio.to_thread(flush_stats_aggregates)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Stats flush error: {e}")
@@ -0,0 +1,162 @@
+"""
+Ticker Master - Name / sector / lot size per ticker
+
+Loaded once from a local file (CSV, or Parquet when pyarrow is installed)
+into an in-memory index. The file's mtime is checked at most every
+`reload_check_seconds` and a changed file is reloaded and swapped in
+atomically, so lookups stay plain dict reads.
+
+File columns: ticker,name,sector,lot_size
+(the same file is read by analysis/lib/ticker_master.py)
+"""
+import csv
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from app.core.config import get_settings
+from app.core.logging import logger
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+MASTER_COLUMNS = ["ticker", "name", "sector", "lot_size"]
+
+
+class TickerInfo(NamedTuple):
+    ticker: str
+    name: Optional[str]
+    sector: Optional[str]
+    lot_size: int
+
+
+def _read_rows(path: Path) -> List[Dict]:
+    if path.suffix == ".parquet":
+        if pq is None:
+            raise RuntimeError("pyarrow is required for Parquet ticker master files")
+        return pq.read_table(path, columns=MASTER_COLUMNS).to_pylist()
+
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def parse_master(rows: List[Dict], default_lot_size: int) -> Dict[str, TickerInfo]:
+    """Build the index from raw rows (invalid lot sizes fall back to the default)"""
+    index = {}
+    for row in rows:
+        ticker = str(row.get("ticker") or "").strip()
+        if not ticker:
+            continue
+        try:
+            lot_size = int(row.get("lot_size") or default_lot_size)
+        except (TypeError, ValueError):
+            lot_size = default_lot_size
+        index[ticker] = TickerInfo(
+            ticker=ticker,
+            name=(row.get("name") or None),
+            sector=(row.get("sector") or None),
+            lot_size=lot_size if lot_size > 0 else default_lot_size
+        )
+    return index
+
+
+class TickerMaster:
+    """
+    In-memory ticker master index with mtime-based hot reload
+    """
+
+    def __init__(self, path: str, default_lot_size: int = 100, reload_check_seconds: float = 30.0):
+        self.path = Path(path)
+        self.default_lot_size = default_lot_size
+        self.reload_check_seconds = reload_check_seconds
+
+        self._index: Dict[str, TickerInfo] = {}
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.loaded_at: Optional[float] = None
+
+        self.reload()
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Reload the file if it changed (or force)
+
+        Returns:
+            True if a new index was swapped in
+        """
+        with self._lock:
+            self._next_check = time.monotonic() + self.reload_check_seconds
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except FileNotFoundError:
+                if self._mtime is not None:
+                    logger.warning(f"Ticker master file disappeared, keeping last index: {self.path}")
+                return False
+
+            if not force and mtime == self._mtime:
+                return False
+
+            try:
+                index = parse_master(_read_rows(self.path), self.default_lot_size)
+            except Exception as e:
+                logger.error(f"Failed to load ticker master {self.path}: {e}")
+                return False
+
+            self._index = index
+            self._mtime = mtime
+            self.loaded_at = time.time()
+
+        logger.info(f"Ticker master loaded: {len(index)} tickers from {self.path}")
+        return True
+
+    def _maybe_reload(self):
+        if time.monotonic() >= self._next_check:
+            self.reload()
+
+    def get(self, ticker: str) -> Optional[TickerInfo]:
+        self._maybe_reload()
+        return self._index.get(ticker)
+
+    def name(self, ticker: str) -> Optional[str]:
+        info = self.get(ticker)
+        return info.name if info else None
+
+    def sector(self, ticker: str) -> Optional[str]:
+        info = self.get(ticker)
+        return info.sector if info else None
+
+    def lot_size(self, ticker: str) -> int:
+        info = self.get(ticker)
+        return info.lot_size if info else self.default_lot_size
+
+    def stats(self) -> Dict:
+        return {
+            "path": str(self.path),
+            "tickers": len(self._index),
+            "sectors": len({i.sector for i in self._index.values() if i.sector}),
+            "loaded_at": self.loaded_at
+        }
+
+
+# Global ticker master instance
+_ticker_master: Optional[TickerMaster] = None
+
+
+def init_ticker_master() -> TickerMaster:
+    """Load the ticker master from settings"""
+    global _ticker_master
+    config = get_settings().ticker_master
+    _ticker_master = TickerMaster(config.file, config.default_lot_size, config.reload_check_seconds)
+    return _ticker_master
+
+
+def get_ticker_master() -> TickerMaster:
+    """Get global ticker master (loaded on first use if needed)"""
+    if _ticker_master is None:
+        return init_ticker_master()
+    return _ticker_master
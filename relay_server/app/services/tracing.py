@@ -0,0 +1,203 @@
+"""
+Tracing - Signal-to-fill latency per hop, keyed by signal_id
+
+Each hop of a signal's lifecycle stamps its time into one signal_timings
+row, in the same transaction as the hop's own change (the accept, ack and
+execution / failure report commits; the poll changes nothing else and
+commits the stamp alone):
+
+    sent_at          TradingView alert time (WebhookSignal.timestamp)
+    accepted_at      relay stored the signal (webhook)
+    first_polled_at  first pending poll that returned it to Excel
+    acked_at         Excel acknowledged it
+    executed_at      fill time in the execution report
+    reported_at      execution / failure report received
+
+latency_report() turns the rows into latency distributions per hop and per
+hour of day (JST). Rows older than tracing.retention_days are deleted by the
+archiver.
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core import clock
+from app.core.config import get_settings
+from app.models import SignalTiming
+from app.services.csv_logger import JST
+
+# (hop, from column, to column)
+HOPS = [
+    ("send_to_accept", "sent_at", "accepted_at"),
+    ("accept_to_poll", "accepted_at", "first_polled_at"),
+    ("poll_to_ack", "first_polled_at", "acked_at"),
+    ("ack_to_fill", "acked_at", "executed_at"),
+    ("fill_to_report", "executed_at", "reported_at"),
+    ("accept_to_report", "accepted_at", "reported_at"),
+    ("signal_to_fill", "sent_at", "executed_at"),
+]
+
+# Hops broken down by hour of day in the report
+HOURLY_HOPS = ("accept_to_poll", "poll_to_ack", "signal_to_fill")
+
+
+def parse_alert_time(value: str) -> Optional[float]:
+    """
+    TradingView alert timestamp -> epoch seconds
+
+    Accepts epoch milliseconds ({{time}}), epoch seconds and ISO 8601
+    ({{timenow}}, UTC when no offset is given). None if unparseable.
+    """
+    value = (value or "").strip()
+    try:
+        if value.replace(".", "", 1).isdigit():
+            number = float(value)
+            return number / 1000 if number > 1e11 else number
+        when = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.timestamp()
+
+
+def start_trace(db: Session, signal_id: str, ticker: str, action: str, alert_time: str):
+    """Add the timing row of a newly accepted signal (committed by the caller)"""
+    if not get_settings().tracing.enabled:
+        return
+    db.add(SignalTiming(
+        signal_id=signal_id,
+        ticker=ticker,
+        action=action,
+        sent_at=parse_alert_time(alert_time),
+        accepted_at=clock.timestamp()
+    ))
+
+
+def mark_polled(db: Session, signal_ids: List[str]):
+    """Stamp first_polled_at of signals returned by a poll (first poll only)"""
+    if not signal_ids or not get_settings().tracing.enabled:
+        return
+    db.query(SignalTiming).filter(
+        SignalTiming.signal_id.in_(signal_ids),
+        SignalTiming.first_polled_at.is_(None)
+    ).update({SignalTiming.first_polled_at: clock.timestamp()}, synchronize_session=False)
+
+
+def mark_acked(db: Session, signal_id: str):
+    if not get_settings().tracing.enabled:
+        return
+    db.query(SignalTiming).filter(
+        SignalTiming.signal_id == signal_id,
+        SignalTiming.acked_at.is_(None)
+    ).update({SignalTiming.acked_at: clock.timestamp()}, synchronize_session=False)
+
+
+def finish_trace(db: Session, signal_id: str, outcome: str, executed_at: Optional[datetime] = None):
+    """Stamp the execution / failure report (outcome: executed / failed / rejected)"""
+    if not get_settings().tracing.enabled:
+        return
+    values = {SignalTiming.reported_at: clock.timestamp(), SignalTiming.outcome: outcome}
+    if executed_at is not None:
+        # Excel sends local (JST) wall time, with or without +09:00
+        if executed_at.tzinfo is None:
+            executed_at = executed_at.replace(tzinfo=JST)
+        values[SignalTiming.executed_at] = executed_at.timestamp()
+    db.query(SignalTiming).filter(SignalTiming.signal_id == signal_id).update(
+        values, synchronize_session=False
+    )
+
+
+def hop_durations(timing: SignalTiming) -> Dict[str, Optional[float]]:
+    """Hop -> milliseconds (None while either end is missing)"""
+    durations = {}
+    for hop, start, end in HOPS:
+        a, b = getattr(timing, start), getattr(timing, end)
+        durations[hop] = round((b - a) * 1000, 1) if a is not None and b is not None else None
+    return durations
+
+
+def trace_dict(timing: SignalTiming) -> Dict:
+    def _iso(value):
+        return datetime.fromtimestamp(value, JST).isoformat() if value is not None else None
+
+    return {
+        "signal_id": timing.signal_id,
+        "ticker": timing.ticker,
+        "action": timing.action,
+        "outcome": timing.outcome,
+        "timestamps": {
+            column: _iso(getattr(timing, column))
+            for column in ("sent_at", "accepted_at", "first_polled_at", "acked_at", "executed_at", "reported_at")
+        },
+        "hops_ms": hop_durations(timing)
+    }
+
+
+def _distribution(values: List[float]) -> Dict:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def _q(q):
+        return ordered[min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)]
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 1),
+        "p50_ms": _q(0.5),
+        "p90_ms": _q(0.9),
+        "p99_ms": _q(0.99),
+        "max_ms": ordered[-1]
+    }
+
+
+def latency_report(timings: Iterable[SignalTiming]) -> Dict:
+    """Latency distribution per hop, and per hour of day (JST) for HOURLY_HOPS"""
+    per_hop = defaultdict(list)
+    per_hour = defaultdict(lambda: defaultdict(list))
+    outcomes = defaultdict(int)
+    total = 0
+
+    for timing in timings:
+        total += 1
+        outcomes[timing.outcome or "open"] += 1
+        hour = datetime.fromtimestamp(timing.accepted_at, JST).hour
+        for hop, duration in hop_durations(timing).items():
+            if duration is None:
+                continue
+            per_hop[hop].append(duration)
+            if hop in HOURLY_HOPS:
+                per_hour[hour][hop].append(duration)
+
+    return {
+        "signals": total,
+        "outcomes": dict(outcomes),
+        "hops": {hop: _distribution(per_hop[hop]) for hop, _, _ in HOPS},
+        "by_hour": {
+            f"{hour:02d}": {hop: _distribution(per_hour[hour][hop]) for hop in HOURLY_HOPS}
+            for hour in sorted(per_hour)
+        }
+    }
+
+
+def query_timings(db: Session, start_date: Optional[date] = None, end_date: Optional[date] = None):
+    """Timing rows of signals accepted between the dates (inclusive, JST)"""
+    query = db.query(SignalTiming)
+    if start_date is not None:
+        start = datetime.combine(start_date, datetime.min.time(), JST).timestamp()
+        query = query.filter(SignalTiming.accepted_at >= start)
+    if end_date is not None:
+        end = datetime.combine(end_date + timedelta(days=1), datetime.min.time(), JST).timestamp()
+        query = query.filter(SignalTiming.accepted_at < end)
+    return query.yield_per(1000)
+
+
+def prune_timings(db: Session, retention_days: int) -> int:
+    """Delete timing rows older than retention_days"""
+    cutoff = clock.timestamp() - retention_days * 86400
+    deleted = db.query(SignalTiming).filter(SignalTiming.accepted_at < cutoff).delete(synchronize_session=False)
+    db.commit()
+    return deleted
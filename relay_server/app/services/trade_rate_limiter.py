@@ -0,0 +1,149 @@
+"""
+Trade Rate Limiter - Sliding one-hour window of executed trades
+
+Backends:
+- redis: one sorted set per scope (score = execution time), so recording and
+  checking are each a single pipelined round trip regardless of trade count
+- memory: ring buffer of 60 per-minute buckets per scope (stand-ins, and the
+  fallback while Redis is unavailable; always kept in sync on record)
+
+Scopes are global and per ticker.
+"""
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from app.core import clock
+from app.core.config import get_settings
+from app.core.logging import logger
+from app.redis_cache import get_hybrid_cache
+
+WINDOW_SECONDS = 3600
+BUCKET_SECONDS = 60
+BUCKET_COUNT = WINDOW_SECONDS // BUCKET_SECONDS
+
+GLOBAL_KEY = "trades:hour:global"
+TICKER_KEY = "trades:hour:ticker:{ticker}"
+
+
+class MinuteBucketWindow:
+    """
+    Per-key ring of per-minute trade counts (constant work per call)
+    """
+
+    def __init__(self):
+        # key -> (bucket minute stamps, bucket counts)
+        self._rings: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, timestamp: float):
+        minute = int(timestamp // BUCKET_SECONDS)
+        slot = minute % BUCKET_COUNT
+        with self._lock:
+            stamps, counts = self._rings.setdefault(key, ([-1] * BUCKET_COUNT, [0] * BUCKET_COUNT))
+            if stamps[slot] != minute:
+                stamps[slot] = minute
+                counts[slot] = 0
+            counts[slot] += 1
+
+    def count(self, key: str, timestamp: float) -> int:
+        oldest = int(timestamp // BUCKET_SECONDS) - BUCKET_COUNT
+        with self._lock:
+            ring = self._rings.get(key)
+            if ring is None:
+                return 0
+            stamps, counts = ring
+            return sum(c for m, c in zip(stamps, counts) if m > oldest)
+
+    def clear(self):
+        with self._lock:
+            self._rings.clear()
+
+
+# Process-wide local window (mirror of Redis, or the only store in memory mode)
+_local_window = MinuteBucketWindow()
+
+
+class TradeRateLimiter:
+    """
+    max_trades_per_hour enforcement (global and per ticker)
+    """
+
+    def __init__(self):
+        self.settings = get_settings()
+        self.config = self.settings.risk_control
+        self.use_redis = self.config.hourly_limit_backend == "redis"
+        self.local = _local_window
+
+    def record_trade(self, ticker: str, trade_id: str, timestamp: Optional[float] = None):
+        """
+        Record an executed trade
+
+        Args:
+            ticker: Stock ticker
+            trade_id: Unique member for the sorted set (signal_id)
+            timestamp: Epoch seconds (default: now)
+        """
+        now = timestamp if timestamp is not None else clock.timestamp()
+        ticker_key = TICKER_KEY.format(ticker=ticker)
+
+        self.local.record(GLOBAL_KEY, now)
+        self.local.record(ticker_key, now)
+
+        if not self.use_redis:
+            return
+
+        def _record(client):
+            pipe = client.pipeline(transaction=False)
+            for key in (GLOBAL_KEY, ticker_key):
+                pipe.zadd(key, {trade_id: now})
+                pipe.zremrangebyscore(key, "-inf", now - WINDOW_SECONDS)
+                pipe.expire(key, WINDOW_SECONDS)
+            return pipe.execute()
+
+        ok, _ = get_hybrid_cache().execute(_record)
+        if not ok:
+            logger.warning(f"Hourly trade window not recorded in Redis: {trade_id} (local only)")
+
+    def get_counts(self, ticker: str) -> Dict[str, int]:
+        """
+        Trades in the last hour
+
+        Returns:
+            {"global": n, "ticker": m}
+        """
+        now = clock.timestamp()
+        ticker_key = TICKER_KEY.format(ticker=ticker)
+
+        if self.use_redis:
+            def _count(client):
+                pipe = client.pipeline(transaction=False)
+                pipe.zcount(GLOBAL_KEY, now - WINDOW_SECONDS, "+inf")
+                pipe.zcount(ticker_key, now - WINDOW_SECONDS, "+inf")
+                return pipe.execute()
+
+            ok, result = get_hybrid_cache().execute(_count)
+            if ok:
+                return {"global": int(result[0]), "ticker": int(result[1])}
+
+        return {
+            "global": self.local.count(GLOBAL_KEY, now),
+            "ticker": self.local.count(ticker_key, now)
+        }
+
+    def check(self, ticker: str) -> Tuple[bool, str]:
+        """
+        Check hourly limits before a new trade
+
+        Returns:
+            Tuple of (ok: bool, reason: str)
+        """
+        counts = self.get_counts(ticker)
+
+        if counts["global"] >= self.config.max_trades_per_hour:
+            return False, f"hourly_trade_limit_exceeded: {counts['global']}/{self.config.max_trades_per_hour}"
+
+        per_ticker = self.config.max_trades_per_hour_per_ticker
+        if per_ticker > 0 and counts["ticker"] >= per_ticker:
+            return False, f"hourly_ticker_trade_limit_exceeded: {counts['ticker']}/{per_ticker}"
+
+        return True, ""
@@ -0,0 +1,5 @@
+"""
+Kabuto Relay Server - Operational tools (load test, replay, maintenance)
+
+Run from the relay_server directory, e.g. ``python -m tools.load_test``
+"""
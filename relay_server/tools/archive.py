@@ -0,0 +1,59 @@
+"""
+Kabuto Relay Server - Archive old rows
+
+Moves signals / execution_log / daily_stats rows older than the retention
+period into monthly archive tables (see app.services.archive), then
+optionally reclaims the freed space.
+
+    python -m tools.archive --dry-run
+    python -m tools.archive --retention-days 60 --vacuum
+"""
+import argparse
+import json
+import sys
+
+from app.core.config import get_settings
+
+
+def vacuum(engine):
+    """Reclaim space freed by the moved rows (outside a transaction)"""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("VACUUM")
+        elif engine.dialect.name == "postgresql":
+            conn.exec_driver_sql("VACUUM ANALYZE signals, execution_log, daily_stats")
+
+
+def main(argv=None):
+    config = get_settings().archive
+
+    parser = argparse.ArgumentParser(description="Move old rows into monthly archive tables")
+    parser.add_argument("--retention-days", type=int, default=config.retention_days,
+                        help="Days kept in the hot tables")
+    parser.add_argument("--batch-size", type=int, default=config.batch_size, help="Rows per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="Count the rows that would be moved")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM afterwards")
+    args = parser.parse_args(argv)
+
+    from app import database
+    from app.services.archive import archivable_counts, archive_cutoff, get_archiver
+
+    database.init_database()
+
+    if args.dry_run:
+        cutoff = archive_cutoff(args.retention_days)
+        with database.get_db_context() as db:
+            report = {"dry_run": True, "cutoff": cutoff.isoformat(), "rows": archivable_counts(db, cutoff)}
+    else:
+        report = {"dry_run": False, **get_archiver().run(args.retention_days, args.batch_size)}
+        if args.vacuum:
+            vacuum(database.engine)
+            report["vacuumed"] = True
+
+    with database.get_db_context() as db:
+        report["tables"] = get_archiver().stats(db)["tables"]
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+Kabuto Relay Server - Realized PnL backfill
+
+Recomputes realized PnL from the full execution log in one streaming pass
+(ordered by executed_at) with the same FIFO matching as the live engine.
+Archived executions (app.services.archive) are replayed for their lots but
+their rows and days are left as archived; written are:
+
+- execution_log.realized_pnl for every sell
+- daily_stats counts, total_pnl, total_commission and win/loss streaks
+- position_lots rebuilt from the lots still open at the end
+
+Sells are costed like the live engine (pnl_engine.close_pnl): shares not
+covered by lots are costed at the avg_cost of the ticker's current position
+(if any), and a break-even close counts as a loss in the streaks (is_win).
+
+    python -m tools.backfill_pnl --dry-run
+    python -m tools.backfill_pnl
+"""
+import argparse
+import json
+import sys
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from app.models import ExecutionLog, Position, PositionLot
+from app.services.archive import history
+from app.services.pnl_engine import close_pnl, is_win, match_fifo
+
+
+@dataclass
+class Lot:
+    execution_id: str
+    quantity: int
+    remaining_quantity: int
+    price: float
+    commission_per_share: float
+    opened_at: datetime
+
+
+@dataclass
+class DayTotals:
+    entry_count: int = 0
+    exit_count: int = 0
+    total_trades: int = 0
+    total_pnl: float = 0.0
+    total_commission: float = 0.0
+    consecutive_wins: int = 0
+    consecutive_losses: int = 0
+
+
+@dataclass
+class BackfillResult:
+    executions: int = 0
+    sells: int = 0
+    sells_without_basis: int = 0
+    pnl_updates: List[Tuple[int, Optional[float]]] = field(default_factory=list)
+    days: Dict[date, DayTotals] = field(default_factory=lambda: defaultdict(DayTotals))
+    lots: Dict[str, Deque[Lot]] = field(default_factory=lambda: defaultdict(deque))
+    archived_days: Set[date] = field(default_factory=set)
+
+
+def replay_executions(executions, avg_costs: Optional[Dict[str, float]] = None) -> BackfillResult:
+    """
+    One pass over executions (must be ordered by executed_at, id)
+
+    Rows with a true `archived` attribute only feed the lots and totals.
+
+    Args:
+        avg_costs: ticker -> position avg_cost, basis of shares not covered by lots
+    """
+    result = BackfillResult()
+    avg_costs = avg_costs or {}
+
+    for e in executions:
+        result.executions += 1
+        archived = bool(getattr(e, "archived", False))
+        commission = e.commission or 0
+        if archived:
+            result.archived_days.add(e.executed_at.date())
+        day = result.days[e.executed_at.date()]
+        day.total_trades += 1
+        day.total_commission += commission
+
+        if e.action == "buy":
+            day.entry_count += 1
+            result.lots[e.ticker].append(Lot(
+                execution_id=e.execution_id,
+                quantity=e.quantity,
+                remaining_quantity=e.quantity,
+                price=e.price,
+                commission_per_share=commission / e.quantity if e.quantity else 0,
+                opened_at=e.executed_at
+            ))
+            continue
+
+        day.exit_count += 1
+        result.sells += 1
+        lots = result.lots[e.ticker]
+        fills, unmatched = match_fifo(lots, e.quantity)
+        while lots and lots[0].remaining_quantity <= 0:
+            lots.popleft()
+
+        # Sold more than was bought in the log: position avg_cost, as live
+        avg_cost = avg_costs.get(e.ticker)
+        if unmatched > 0 and avg_cost is None:
+            result.sells_without_basis += 1
+
+        pnl = close_pnl(fills, unmatched, e.price, commission, avg_cost)
+        if not archived:
+            result.pnl_updates.append((e.id, pnl))
+        if pnl is None:
+            continue
+        day.total_pnl += pnl
+        if is_win(pnl):
+            day.consecutive_wins += 1
+            day.consecutive_losses = 0
+        else:
+            day.consecutive_losses += 1
+            day.consecutive_wins = 0
+
+    return result
+
+
+def write_backfill(db, result: BackfillResult, batch_size: int = 1000):
+    """Write PnL, daily stats and open lots"""
+    from app.services.risk_control import RiskControlService
+
+    for i in range(0, len(result.pnl_updates), batch_size):
+        db.bulk_update_mappings(ExecutionLog, [
+            {"id": row_id, "realized_pnl": pnl}
+            for row_id, pnl in result.pnl_updates[i:i + batch_size]
+        ])
+        db.flush()
+
+    risk_service = RiskControlService(db)
+    for day, totals in sorted(result.days.items()):
+        if day in result.archived_days:
+            continue
+        stats = risk_service.get_or_create_daily_stats(day)
+        if stats is None:
+            continue
+        stats.entry_count = totals.entry_count
+        stats.exit_count = totals.exit_count
+        stats.total_trades = totals.total_trades
+        stats.total_pnl = totals.total_pnl
+        stats.total_commission = totals.total_commission
+        stats.consecutive_wins = totals.consecutive_wins
+        stats.consecutive_losses = totals.consecutive_losses
+
+    db.query(PositionLot).delete()
+    for ticker, lots in result.lots.items():
+        for lot in lots:
+            if lot.remaining_quantity > 0:
+                db.add(PositionLot(
+                    ticker=ticker,
+                    execution_id=lot.execution_id,
+                    quantity=lot.quantity,
+                    remaining_quantity=lot.remaining_quantity,
+                    price=lot.price,
+                    commission_per_share=lot.commission_per_share,
+                    opened_at=lot.opened_at
+                ))
+
+    db.commit()
+
+
+def backfill_pnl(dry_run: bool = False, batch_size: int = 1000) -> Dict:
+    """Run the backfill against the configured database"""
+    from app import database
+
+    database.init_database()
+    with database.get_db_context() as db:
+        executions = history(db.get_bind(), "execution_log")
+        avg_costs = {p.ticker: p.avg_cost for p in db.query(Position.ticker, Position.avg_cost)}
+        result = replay_executions(db.execute(
+            select(executions).order_by(executions.c.executed_at.asc(), executions.c.id.asc())
+            .execution_options(yield_per=batch_size)
+        ), avg_costs)
+
+        if not dry_run:
+            write_backfill(db, result, batch_size)
+
+    open_lots = sum(1 for lots in result.lots.values() for lot in lots if lot.remaining_quantity > 0)
+    return {
+        "dry_run": dry_run,
+        "executions": result.executions,
+        "sells": result.sells,
+        "sells_without_basis": result.sells_without_basis,
+        "days": {
+            day.isoformat(): {"total_pnl": round(t.total_pnl, 2), "trades": t.total_trades,
+                              "consecutive_losses": t.consecutive_losses}
+            for day, t in sorted(result.days.items())
+        },
+        "open_lots": open_lots,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recompute realized PnL from the execution log")
+    parser.add_argument("--dry-run", action="store_true", help="Compute and report without writing")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per fetch / update batch")
+    args = parser.parse_args(argv)
+
+    report = backfill_pnl(dry_run=args.dry_run, batch_size=args.batch_size)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Kabuto Relay Server - Serialization micro-benchmark
+
+Per-request CPU of the /api/signals/pending response body with N pending
+signals, through FastAPI's default path (SignalResponse models, response_model
+validation, jsonable encoding, json.dumps) versus the pre-built dict +
+FastJSONResponse path, plus the idempotency cache encode/decode.
+
+    python -m tools.bench_serialization
+    python -m tools.bench_serialization --signals 100 --iterations 2000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core import serialization
+from app.core.serialization import FastJSONResponse
+from app.models import Signal, SignalState
+from app.schemas import SignalListResponse, SignalResponse, signal_list_dict, signal_response_dict
+
+SECTORS = ["輸送用機器", "情報・通信業", "電気機器", "銀行業", "医薬品"]
+
+
+def make_signals(n: int) -> List[Signal]:
+    """Transient Signal rows shaped like real pending signals"""
+    now = datetime(2026, 10, 19, 9, 30, 0, 123456)
+    return [
+        Signal(
+            signal_id=f"sig_20261019_093000_{7000 + i}_buy",
+            action="buy",
+            ticker=str(7000 + i),
+            quantity=100,
+            price="market",
+            entry_price=1500.5 + i,
+            stop_loss=1450.0 + i,
+            take_profit=1600.25 + i,
+            atr=12.34,
+            state=SignalState.PENDING,
+            created_at=now,
+            expires_at=now + timedelta(minutes=15),
+            checksum=f"{i:064x}"
+        )
+        for i in range(n)
+    ]
+
+
+def default_path(signals: List[Signal], names: Dict, timestamp: datetime, field) -> bytes:
+    """What FastAPI does for a SignalListResponse returned with response_model"""
+    model = SignalListResponse(
+        status="success",
+        timestamp=timestamp,
+        count=len(signals),
+        signals=[
+            SignalResponse(
+                signal_id=s.signal_id,
+                action=s.action,
+                ticker=s.ticker,
+                quantity=s.quantity,
+                price=s.price,
+                entry_price=s.entry_price,
+                stop_loss=s.stop_loss,
+                take_profit=s.take_profit,
+                atr=s.atr,
+                state=s.state.value,
+                created_at=s.created_at,
+                expires_at=s.expires_at,
+                checksum=s.checksum,
+                ticker_name=names[s.ticker][0],
+                sector=names[s.ticker][1]
+            )
+            for s in signals
+        ]
+    )
+    content = asyncio.run(serialize_response(field=field, response_content=model))
+    return JSONResponse(content).body
+
+
+def fast_path(signals: List[Signal], names: Dict, timestamp: datetime) -> bytes:
+    """Pre-built dicts rendered by FastJSONResponse"""
+    payload = [signal_response_dict(s, *names[s.ticker]) for s in signals]
+    return FastJSONResponse(signal_list_dict(payload, timestamp)).body
+
+
+def cpu_per_call(fn: Callable, iterations: int) -> float:
+    """Mean CPU microseconds per call"""
+    fn()
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) / iterations * 1e6
+
+
+def run(n_signals: int = 100, iterations: int = 1000) -> Dict:
+    signals = make_signals(n_signals)
+    names = {s.ticker: (f"銘柄{s.ticker}", SECTORS[i % len(SECTORS)]) for i, s in enumerate(signals)}
+    timestamp = datetime(2026, 10, 19, 9, 30, 5, 1)
+    field = create_response_field("response", SignalListResponse)
+
+    default_body = default_path(signals, names, timestamp, field)
+    fast_body = fast_path(signals, names, timestamp)
+    if json.loads(default_body) != json.loads(fast_body):
+        raise AssertionError("fast path payload differs from the response_model payload")
+
+    # serialize_response is a coroutine; measure the event loop overhead separately
+    loop_overhead = cpu_per_call(lambda: asyncio.run(asyncio.sleep(0)), iterations)
+    default_us = cpu_per_call(lambda: default_path(signals, names, timestamp, field), iterations) - loop_overhead
+    fast_us = cpu_per_call(lambda: fast_path(signals, names, timestamp), iterations)
+
+    cached = {"status": "success", "signal_id": signals[0].signal_id,
+              "message": "Signal received and queued", "timestamp": timestamp}
+    stdlib_us = cpu_per_call(lambda: json.loads(json.dumps(cached, default=str)), iterations * 10)
+    fast_cache_us = cpu_per_call(lambda: serialization.loads(serialization.dumps(cached).decode("utf-8")),
+                                 iterations * 10)
+
+    return {
+        "orjson": serialization.orjson is not None,
+        "signals": n_signals,
+        "iterations": iterations,
+        "body_bytes": {"default": len(default_body), "fast": len(fast_body)},
+        "pending_response_cpu_us": {
+            "default": round(default_us, 1),
+            "fast": round(fast_us, 1),
+            "saved": round(default_us - fast_us, 1),
+            "speedup": round(default_us / fast_us, 2) if fast_us > 0 else None,
+        },
+        "idempotency_cache_cpu_us": {
+            "stdlib_json": round(stdlib_us, 2),
+            "fast": round(fast_cache_us, 2),
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serialization micro-benchmark for /api/signals/pending")
+    parser.add_argument("--signals", type=int, default=100, help="Pending signals per response")
+    parser.add_argument("--iterations", type=int, default=1000, help="Responses per measurement")
+    args = parser.parse_args(argv)
+
+    print(json.dumps(run(args.signals, args.iterations), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
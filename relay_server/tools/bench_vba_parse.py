@@ -0,0 +1,211 @@
+"""
+Kabuto Relay Server - VBA client parse-cost benchmark
+
+Emulates in Python how the Excel client turns a /api/signals/pending body
+into a Collection of Dictionaries:
+
+- json: VBA-JSON (JsonConverter.ParseJson) walks the text one character at a
+  time with Mid$ and builds every string through its buffer
+- tsv: Split() by line, Split() each line by tab, Dictionary per row
+  (Module_API_Simple.ParseSignalsTsv)
+
+Both emulations keep the VBA algorithm's shape (per-character interpreted
+loop vs native Split), so the ratio is what carries over to VBA; absolute
+VBA times are much higher than these.
+
+    python -m tools.bench_vba_parse
+    python -m tools.bench_vba_parse --signals 100 200 500
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from app.core import tabular
+from app.core.serialization import dumps
+from app.schemas import SIGNAL_TABLE_COLUMNS, signal_list_dict, signal_response_dict
+from tools.bench_serialization import SECTORS, make_signals
+
+
+class VBAJsonParser:
+    """Character-at-a-time parser following VBA-JSON's json_Parse* functions"""
+
+    def __init__(self, text: str):
+        self.s = text
+        self.i = 0
+        self.steps = 0  # characters visited by interpreted code
+
+    def _mid(self) -> str:
+        # VBA.Mid$(json_String, json_Index, 1)
+        self.steps += 1
+        return self.s[self.i]
+
+    def _skip_spaces(self):
+        while self.i < len(self.s) and self._mid() in " \r\n\t":
+            self.i += 1
+
+    def parse(self):
+        self._skip_spaces()
+        return self._value()
+
+    def _value(self):
+        self._skip_spaces()
+        c = self._mid()
+        if c == "{":
+            return self._object()
+        if c == "[":
+            return self._array()
+        if c == '"':
+            return self._string()
+        if self.s.startswith("true", self.i):
+            self.i += 4
+            return True
+        if self.s.startswith("false", self.i):
+            self.i += 5
+            return False
+        if self.s.startswith("null", self.i):
+            self.i += 4
+            return None
+        return self._number()
+
+    def _object(self) -> Dict:
+        result = {}
+        self.i += 1
+        while True:
+            self._skip_spaces()
+            c = self._mid()
+            if c == "}":
+                self.i += 1
+                return result
+            if c == ",":
+                self.i += 1
+                self._skip_spaces()
+            key = self._string()
+            self._skip_spaces()
+            self.i += 1  # ':'
+            result[key] = self._value()
+
+    def _array(self) -> List:
+        result = []
+        self.i += 1
+        while True:
+            self._skip_spaces()
+            c = self._mid()
+            if c == "]":
+                self.i += 1
+                return result
+            if c == ",":
+                self.i += 1
+            result.append(self._value())
+
+    def _string(self) -> str:
+        quote = self._mid()
+        self.i += 1
+        buffer = []
+        while self.i < len(self.s):
+            c = self._mid()
+            if c == "\\":
+                self.i += 1
+                c = self._mid()
+                if c == "u":
+                    buffer.append(chr(int(self.s[self.i + 1:self.i + 5], 16)))
+                    self.i += 5
+                else:
+                    buffer.append({"n": "\n", "r": "\r", "t": "\t", "b": "\b", "f": "\f"}.get(c, c))
+                    self.i += 1
+            elif c == quote:
+                self.i += 1
+                return "".join(buffer)
+            else:
+                buffer.append(c)  # json_BufferAppend
+                self.i += 1
+        return "".join(buffer)
+
+    def _number(self) -> float:
+        buffer = []
+        while self.i < len(self.s):
+            c = self._mid()
+            if c in " ,}]\r\n\t":
+                break
+            buffer.append(c)
+            self.i += 1
+        return float("".join(buffer))  # VBA.Val
+
+
+def parse_json_vba(text: str) -> List[Dict]:
+    return VBAJsonParser(text).parse()["signals"]
+
+
+def parse_tsv_vba(text: str) -> List[Dict]:
+    lines = text.replace("\r", "").split("\n")       # Split(text, vbLf)
+    if not lines[0].startswith("#kabuto\t"):
+        raise ValueError("invalid TSV header")
+    columns = lines[1].split("\t")
+    result = []
+    for line in lines[2:]:
+        if not line:
+            continue
+        fields = line.split("\t")                    # Split(line, vbTab)
+        signal = {}
+        for j, column in enumerate(columns):         # For j = 0 To UBound(columns)
+            signal[column] = fields[j] if fields[j] != "" else None
+        result.append(signal)
+    return result
+
+
+def best_of(fn: Callable, repeat: int) -> float:
+    """Fastest wall time of repeat runs, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(n_signals: int, repeat: int = 20) -> Dict:
+    signals = make_signals(n_signals)
+    payload = [signal_response_dict(s, f"銘柄{s.ticker}", SECTORS[i % len(SECTORS)]) for i, s in enumerate(signals)]
+    timestamp = datetime(2026, 10, 19, 9, 30, 5)
+    json_text = dumps(signal_list_dict(payload, timestamp)).decode("utf-8")
+    tsv_text = tabular.render("tsv", "signals", SIGNAL_TABLE_COLUMNS, payload, timestamp).decode("utf-8")
+
+    from_json = parse_json_vba(json_text)
+    from_tsv = parse_tsv_vba(tsv_text)
+    # Same records (TSV values are strings, as VBA would CStr/CDbl them)
+    expected = json.loads(json_text)["signals"]
+    for a, b in zip(from_tsv, expected):
+        for column in SIGNAL_TABLE_COLUMNS:
+            if (a[column] is None) != (b[column] is None):
+                raise AssertionError(f"null mismatch in {column}")
+    if len(from_json) != len(from_tsv):
+        raise AssertionError("record count mismatch")
+
+    parser = VBAJsonParser(json_text)
+    parser.parse()
+
+    json_ms = best_of(lambda: parse_json_vba(json_text), repeat)
+    tsv_ms = best_of(lambda: parse_tsv_vba(tsv_text), repeat)
+    return {
+        "signals": n_signals,
+        "bytes": {"json": len(json_text.encode("utf-8")), "tsv": len(tsv_text.encode("utf-8"))},
+        "json_char_steps": parser.steps,
+        "parse_ms": {"json": round(json_ms, 3), "tsv": round(tsv_ms, 3)},
+        "speedup": round(json_ms / tsv_ms, 1) if tsv_ms > 0 else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse cost of JSON vs TSV pending-signal bodies (VBA emulation)")
+    parser.add_argument("--signals", type=int, nargs="+", default=[10, 100, 500], help="Signals per body")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per measurement (best is reported)")
+    args = parser.parse_args(argv)
+
+    results = [run(n, args.repeat) for n in args.signals]
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
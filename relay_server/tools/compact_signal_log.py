@@ -0,0 +1,36 @@
+"""
+Kabuto Relay Server - Signal CSV compaction
+
+Merges the daily signals_YYYY-MM-DD.csv files and the signal_states journal
+into one CSV with final states (the file the Excel side reads).
+
+    python -m tools.compact_signal_log
+    python -m tools.compact_signal_log --start-date 2025-12-01 --output data/logs/signals_202512.csv
+"""
+import argparse
+import json
+import sys
+from datetime import date
+
+from app.core.config import get_settings
+from app.services.csv_logger import compact_signal_logs
+
+
+def main(argv=None):
+    settings = get_settings()
+
+    parser = argparse.ArgumentParser(description="Compact daily signal CSV logs")
+    parser.add_argument("--log-dir", default=settings.logging.signal_log_dir, help="Directory of the daily files")
+    parser.add_argument("--output", default=None, help="Output CSV (default: <log-dir>/signals.csv)")
+    parser.add_argument("--start-date", type=date.fromisoformat, default=None, help="First day (YYYY-MM-DD)")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="Last day (YYYY-MM-DD)")
+    args = parser.parse_args(argv)
+
+    output = args.output or f"{args.log_dir.rstrip('/')}/signals.csv"
+    result = compact_signal_logs(args.log_dir, output, args.start_date, args.end_date)
+    result["output"] = output
+    print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
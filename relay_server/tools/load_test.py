@@ -0,0 +1,344 @@
+"""
+Kabuto Relay Server - Load test harness
+
+Drives webhook bursts, Excel poll/ack/executed cycles and heartbeats at a
+configurable rate and concurrency, then prints a JSON report with
+throughput, p50/p95/p99 latency and error breakdowns per endpoint.
+
+By default the real app is run in-process on local stand-ins (in-memory
+Redis, throwaway SQLite), so the numbers are reproducible on any machine:
+
+    python -m tools.load_test --duration 30 --webhook-rate 20 --clients 2
+
+Use --url to target a running server instead:
+
+    python -m tools.load_test --url http://localhost:5000 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+
+@dataclass
+class LoadTestConfig:
+    """Load test parameters"""
+    duration: float = 30.0
+    webhook_rate: float = 10.0        # signals per second (average)
+    burst_size: int = 5               # signals per bar-close burst
+    burst_spread_ms: int = 200        # spread of one burst
+    sell_ratio: float = 0.3           # fraction of sells (on seeded positions)
+    duplicate_ratio: float = 0.05     # fraction of re-sent alerts (TradingView retries)
+    clients: int = 1                  # emulated Excel clients
+    poll_interval: float = 5.0
+    heartbeat_interval: float = 30.0
+    concurrency: int = 50             # max in-flight requests
+    tickers: int = 200                # size of the buy universe
+    seed: int = 42
+    url: Optional[str] = None
+    strict: bool = False              # keep config.yaml limits and cooldowns
+
+
+# ========== Statistics ==========
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class LoadStats:
+    """Per-endpoint latency and status collection"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint: str, latency_ms: float, status: Optional[int] = None, error: Optional[str] = None):
+        self.latencies[endpoint].append(latency_ms)
+        if status is not None:
+            self.statuses[endpoint][str(status)] += 1
+        if error is not None:
+            self.errors[endpoint][error] += 1
+
+    def report(self, elapsed: float) -> Dict:
+        endpoints = {}
+        total = 0
+        total_errors = 0
+
+        for endpoint in sorted(self.latencies):
+            values = sorted(self.latencies[endpoint])
+            statuses = dict(self.statuses[endpoint])
+            errors = dict(self.errors[endpoint])
+            failed = sum(errors.values()) + sum(
+                n for code, n in statuses.items() if int(code) >= 400
+            )
+
+            total += len(values)
+            total_errors += failed
+
+            endpoints[endpoint] = {
+                "count": len(values),
+                "throughput_rps": round(len(values) / elapsed, 2) if elapsed > 0 else 0,
+                "mean_ms": round(sum(values) / len(values), 2),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+                "max_ms": round(values[-1], 2),
+                "status": statuses,
+                "errors": errors,
+                "error_rate": round(failed / len(values), 4),
+            }
+
+        return {
+            "totals": {
+                "requests": total,
+                "errors": total_errors,
+                "throughput_rps": round(total / elapsed, 2) if elapsed > 0 else 0,
+            },
+            "endpoints": endpoints,
+        }
+
+
+# ========== Traffic generator ==========
+
+class LoadGenerator:
+    """Emulates TradingView alerts and Excel VBA clients"""
+
+    def __init__(self, client: httpx.AsyncClient, config: LoadTestConfig, webhook_secret: str, api_key: str,
+                 sell_tickers: List[str]):
+        self.client = client
+        self.config = config
+        self.webhook_secret = webhook_secret
+        self.auth_headers = {"Authorization": f"Bearer {api_key}"}
+        self.sell_tickers = sell_tickers
+        self.buy_tickers = [
+            str(code) for code in range(1300, 1300 + config.tickers)
+            if str(code) not in set(sell_tickers)
+        ]
+        self.random = random.Random(config.seed)
+        self.semaphore = asyncio.Semaphore(config.concurrency)
+        self.stats = LoadStats()
+        self.deadline = 0.0
+        self.sent_payloads: List[Dict] = []
+
+    async def _request(self, endpoint: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        async with self.semaphore:
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except Exception as e:
+                self.stats.record(endpoint, (time.perf_counter() - start) * 1000, error=type(e).__name__)
+                return None
+            self.stats.record(endpoint, (time.perf_counter() - start) * 1000, status=response.status_code)
+            return response
+
+    def _make_signal(self) -> Dict:
+        sell = self.sell_tickers and self.random.random() < self.config.sell_ratio
+        ticker = self.random.choice(self.sell_tickers if sell else self.buy_tickers)
+        entry_price = float(self.random.randrange(300, 5000))
+        return {
+            "action": "sell" if sell else "buy",
+            "ticker": ticker,
+            "quantity": 100,
+            "price": "market",
+            "entry_price": entry_price,
+            "stop_loss": round(entry_price * 0.98, 1),
+            "take_profit": round(entry_price * 1.04, 1),
+            "atr": round(entry_price * 0.01, 2),
+            "rr_ratio": 2.0,
+            "rsi": round(self.random.uniform(30, 70), 1),
+            "timestamp": str(int(time.time() * 1000) + self.random.randrange(1_000_000)),
+            "passphrase": self.webhook_secret,
+        }
+
+    async def _pause(self, interval: float):
+        """Sleep for the interval, but not past the deadline"""
+        await asyncio.sleep(max(min(interval, self.deadline - time.perf_counter()), 0))
+
+    async def _send_webhook(self, payload: Dict, delay: float):
+        await asyncio.sleep(delay)
+        await self._request("POST /webhook", "POST", "/webhook", json=payload)
+
+    async def alert_producer(self):
+        """Multi-ticker alert bursts at bar-close cadence"""
+        interval = self.config.burst_size / self.config.webhook_rate if self.config.webhook_rate > 0 else None
+        if interval is None:
+            return
+        tasks = []
+        while time.perf_counter() < self.deadline:
+            spread = self.config.burst_spread_ms / 1000.0
+            for _ in range(self.config.burst_size):
+                if self.sent_payloads and self.random.random() < self.config.duplicate_ratio:
+                    payload = self.random.choice(self.sent_payloads)
+                else:
+                    payload = self._make_signal()
+                    self.sent_payloads.append(payload)
+                tasks.append(asyncio.create_task(
+                    self._send_webhook(payload, self.random.uniform(0, spread))
+                ))
+            await self._pause(interval)
+        await asyncio.gather(*tasks)
+
+    async def excel_client(self, client_id: str):
+        """Poll pending signals, then ack and report execution for each"""
+        while time.perf_counter() < self.deadline:
+            response = await self._request(
+                "GET /api/signals/pending", "GET", "/api/signals/pending", headers=self.auth_headers
+            )
+            if response is not None and response.status_code == 200:
+                for signal in response.json().get("signals", []):
+                    await self._process_signal(client_id, signal)
+            await self._pause(self.config.poll_interval)
+
+    async def _process_signal(self, client_id: str, signal: Dict):
+        signal_id = signal["signal_id"]
+        ack = await self._request(
+            "POST /api/signals/{id}/ack", "POST", f"/api/signals/{signal_id}/ack",
+            headers=self.auth_headers,
+            json={"client_id": client_id, "checksum": signal["checksum"]},
+        )
+        if ack is None or ack.status_code != 200:
+            return
+        await self._request(
+            "POST /api/signals/{id}/executed", "POST", f"/api/signals/{signal_id}/executed",
+            headers=self.auth_headers,
+            json={
+                "client_id": client_id,
+                "execution_price": signal["entry_price"],
+                "execution_quantity": signal["quantity"],
+                "order_id": f"ORD_{signal_id}",
+                "executed_at": datetime.now().isoformat(),
+            },
+        )
+
+    async def heartbeat_client(self, client_id: str):
+        while time.perf_counter() < self.deadline:
+            await self._request(
+                "POST /heartbeat", "POST", "/heartbeat",
+                json={"client_id": client_id, "timestamp": datetime.now().isoformat()},
+            )
+            await self._pause(self.config.heartbeat_interval)
+
+    async def run(self) -> Dict:
+        start = time.perf_counter()
+        self.deadline = start + self.config.duration
+
+        tasks = [self.alert_producer()]
+        for i in range(self.config.clients):
+            client_id = f"loadtest_{i + 1:02d}"
+            tasks.append(self.excel_client(client_id))
+            tasks.append(self.heartbeat_client(client_id))
+        await asyncio.gather(*tasks)
+
+        # Rates over the load window (requests still in flight at the deadline
+        # are counted, the time spent finishing them is not)
+        elapsed = self.deadline - start
+        report = self.stats.report(elapsed)
+        report["elapsed_s"] = round(elapsed, 2)
+        return report
+
+
+# ========== Runner ==========
+
+def _seed_positions(tickers: List[str]):
+    """Give the stand-in database old positions so sell signals are valid"""
+    from datetime import timedelta
+    from app import database
+    from app.models import Position
+
+    db = database.SessionLocal()
+    try:
+        entry_date = datetime.now() - timedelta(days=7)
+        for ticker in tickers:
+            db.add(Position(ticker=ticker, quantity=1_000_000, avg_cost=1000.0, entry_date=entry_date))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def run_load_test(config: LoadTestConfig) -> Dict:
+    """Run one load test and return the JSON-serialisable report"""
+    from app.core.config import get_settings
+
+    sell_tickers = [str(code) for code in range(9000, 9020)]
+    report = {
+        "config": asdict(config),
+        "target": config.url or "in-process (in-memory Redis, SQLite stand-in)",
+        "started_at": datetime.now().isoformat(),
+    }
+
+    if config.url:
+        settings = get_settings()
+        async with httpx.AsyncClient(base_url=config.url, timeout=30.0) as client:
+            generator = LoadGenerator(
+                client, config, settings.security.webhook_secret, settings.security.api_key, []
+            )
+            report.update(await generator.run())
+        return report
+
+    from tools.standins import standin_app, PERMISSIVE_OVERRIDES
+
+    overrides = None if config.strict else PERMISSIVE_OVERRIDES
+    async with standin_app(overrides=overrides) as app:
+        settings = get_settings()
+        _seed_positions(sell_tickers)
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False, client=("127.0.0.1", 50000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=30.0) as client:
+            generator = LoadGenerator(
+                client, config, settings.security.webhook_secret, settings.security.api_key, sell_tickers
+            )
+            report.update(await generator.run())
+    return report
+
+
+def parse_args(argv=None):
+    defaults = LoadTestConfig()
+    parser = argparse.ArgumentParser(description="Kabuto Relay Server load test")
+    parser.add_argument("--duration", type=float, default=defaults.duration, help="Test duration (seconds)")
+    parser.add_argument("--webhook-rate", type=float, default=defaults.webhook_rate, help="Webhook signals per second")
+    parser.add_argument("--burst-size", type=int, default=defaults.burst_size, help="Signals per alert burst")
+    parser.add_argument("--burst-spread-ms", type=int, default=defaults.burst_spread_ms, help="Spread of one burst (ms)")
+    parser.add_argument("--sell-ratio", type=float, default=defaults.sell_ratio, help="Fraction of sell signals")
+    parser.add_argument("--duplicate-ratio", type=float, default=defaults.duplicate_ratio, help="Fraction of re-sent alerts")
+    parser.add_argument("--clients", type=int, default=defaults.clients, help="Emulated Excel clients")
+    parser.add_argument("--poll-interval", type=float, default=defaults.poll_interval, help="Excel poll interval (seconds)")
+    parser.add_argument("--heartbeat-interval", type=float, default=defaults.heartbeat_interval, help="Heartbeat interval (seconds)")
+    parser.add_argument("--concurrency", type=int, default=defaults.concurrency, help="Max in-flight requests")
+    parser.add_argument("--tickers", type=int, default=defaults.tickers, help="Size of the buy ticker universe")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Random seed")
+    parser.add_argument("--url", default=None, help="Target a running server instead of the in-process app")
+    parser.add_argument("--strict", action="store_true", help="Keep config.yaml limits and cooldowns")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    config = LoadTestConfig(**{
+        k: v for k, v in vars(args).items() if k in LoadTestConfig.__dataclass_fields__
+    })
+    return config, args.output
+
+
+def main(argv=None):
+    config, output = parse_args(argv)
+    report = asyncio.run(run_load_test(config))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+
+    if output:
+        Path(output).write_text(text, encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+"""
+Kabuto Relay Server - Signal replay
+
+Streams recorded signals (optionally a date range of them) back through
+the real webhook pipeline on local stand-ins. Without a CSV argument the
+daily signals_YYYY-MM-DD.csv files and state journal in
+logging.signal_log_dir are compacted for the range into a temporary file
+first (same merge as tools.compact_signal_log); a compacted signals.csv
+can be given instead. A virtual clock is set to each
+row's recorded time, so market-hours, expiry, daily-limit and cooldown logic
+behave as they did originally.
+
+    # max speed, one day (from the daily files)
+    python -m tools.replay --start-date 2025-12-26 --end-date 2025-12-26
+
+    # 10x real time
+    python -m tools.replay data/logs/signals.csv --speed 10
+
+The JSON report contains per-endpoint latency and the accept/reject diff
+against the states recorded in the CSV.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, date, timezone, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import httpx
+
+from app.core import clock
+from tools.load_test import LoadStats
+
+# signals.csv timestamps are written in JST
+JST = timezone(timedelta(hours=9))
+
+# Recorded states that mean the relay accepted the signal
+ACCEPTED_STATES = {"pending", "fetched", "executed", "failed", "expired"}
+
+
+def iter_signal_rows(
+    csv_path: Path,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None
+) -> Iterator[Dict[str, str]]:
+    """
+    Stream rows of signals.csv within [start_date, end_date]
+
+    Rows are yielded in file order (which is arrival order).
+    """
+    with open(csv_path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            recorded_at = datetime.strptime(row["timestamp"], "%Y-%m-%d %H:%M:%S").replace(tzinfo=JST)
+            row_date = recorded_at.date()
+            if start_date and row_date < start_date:
+                continue
+            if end_date and row_date > end_date:
+                break
+            row["_recorded_at"] = recorded_at
+            yield row
+
+
+def _optional_float(value: str) -> Optional[float]:
+    return float(value) if value not in ("", None) else None
+
+
+def row_to_payload(row: Dict, webhook_secret: str) -> Dict:
+    """Rebuild the TradingView webhook payload from a CSV row"""
+    return {
+        "action": row["action"],
+        "ticker": row["ticker"],
+        "quantity": int(row["quantity"]),
+        "price": row.get("price") or "market",
+        "entry_price": float(row["entry_price"]),
+        "stop_loss": _optional_float(row.get("stop_loss")),
+        "take_profit": _optional_float(row.get("take_profit")),
+        "atr": _optional_float(row.get("atr")),
+        "rr_ratio": _optional_float(row.get("rr_ratio")),
+        "rsi": _optional_float(row.get("rsi")),
+        # Original alert time stands in for TradingView's {{timenow}}
+        "timestamp": str(int(row["_recorded_at"].timestamp() * 1000)),
+        "passphrase": webhook_secret,
+    }
+
+
+class SignalReplayer:
+    """Replays recorded signals through the ASGI app"""
+
+    def __init__(self, client: httpx.AsyncClient, virtual_clock: clock.VirtualClock, speed: float,
+                 webhook_secret: str, api_key: str, simulate_fills: bool = True):
+        self.client = client
+        self.clock = virtual_clock
+        self.speed = speed
+        self.webhook_secret = webhook_secret
+        self.auth_headers = {"Authorization": f"Bearer {api_key}"}
+        self.simulate_fills = simulate_fills
+        self.stats = LoadStats()
+        self.diff = Counter()
+        self.mismatches = []
+
+    async def _request(self, endpoint: str, method: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        response = await self.client.request(method, url, **kwargs)
+        self.stats.record(endpoint, (time.perf_counter() - start) * 1000, status=response.status_code)
+        return response
+
+    async def _fill_pending(self):
+        """Emulate the Excel client: poll, ack and execute at the current virtual time"""
+        response = await self._request("GET /api/signals/pending", "GET", "/api/signals/pending",
+                                       headers=self.auth_headers)
+        if response.status_code != 200:
+            return
+
+        for signal in response.json().get("signals", []):
+            signal_id = signal["signal_id"]
+            ack = await self._request(
+                "POST /api/signals/{id}/ack", "POST", f"/api/signals/{signal_id}/ack",
+                headers=self.auth_headers,
+                json={"client_id": "replay", "checksum": signal["checksum"]},
+            )
+            if ack.status_code != 200:
+                continue
+            await self._request(
+                "POST /api/signals/{id}/executed", "POST", f"/api/signals/{signal_id}/executed",
+                headers=self.auth_headers,
+                json={
+                    "client_id": "replay",
+                    "execution_price": signal["entry_price"],
+                    "execution_quantity": signal["quantity"],
+                    "order_id": f"REPLAY_{signal_id}",
+                    "executed_at": clock.now().isoformat(),
+                },
+            )
+
+    def _record_outcome(self, row: Dict, response: httpx.Response):
+        recorded_state = (row.get("state") or "").lower()
+        recorded_accept = recorded_state in ACCEPTED_STATES
+        replay_accept = response.status_code == 200
+
+        key = f"recorded_{'accept' if recorded_accept else 'reject'}__replay_{'accept' if replay_accept else 'reject'}"
+        self.diff[key] += 1
+
+        if recorded_accept != replay_accept:
+            try:
+                detail = response.json().get("detail")
+            except ValueError:
+                detail = response.text
+            self.mismatches.append({
+                "signal_id": row.get("signal_id"),
+                "recorded_at": row["_recorded_at"].isoformat(),
+                "ticker": row["ticker"],
+                "action": row["action"],
+                "recorded_state": recorded_state,
+                "replay_status": response.status_code,
+                "replay_detail": detail,
+            })
+
+    async def replay(self, rows: Iterator[Dict]) -> Dict:
+        start = time.perf_counter()
+        previous_at = None
+        count = 0
+
+        for row in rows:
+            recorded_at = row["_recorded_at"]
+
+            # Pace in real time (speed=0 means as fast as possible)
+            if previous_at is not None and self.speed > 0:
+                delay = (recorded_at - previous_at).total_seconds() / self.speed
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            previous_at = recorded_at
+
+            self.clock.set(recorded_at)
+            response = await self._request(
+                "POST /webhook", "POST", "/webhook",
+                json=row_to_payload(row, self.webhook_secret),
+            )
+            self._record_outcome(row, response)
+            count += 1
+
+            if self.simulate_fills and response.status_code == 200:
+                await self._fill_pending()
+
+        elapsed = time.perf_counter() - start
+        report = self.stats.report(elapsed)
+        report["elapsed_s"] = round(elapsed, 2)
+        report["replayed_signals"] = count
+        report["diff"] = dict(self.diff)
+        report["mismatches"] = self.mismatches
+        return report
+
+
+def compact_for_replay(log_dir: str, output_path: Path,
+                       start_date: Optional[date] = None, end_date: Optional[date] = None) -> Dict:
+    """Merge the daily signal files and state journal of a date range into output_path"""
+    from app.services.csv_logger import compact_signal_logs
+
+    return compact_signal_logs(log_dir, str(output_path), start_date, end_date)
+
+
+async def run_replay(
+    csv_path: Path,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    speed: float = 0.0,
+    simulate_fills: bool = True,
+    config_path: str = "config.yaml"
+) -> Dict:
+    """Replay signals.csv on stand-ins and return the JSON-serialisable report"""
+    from app.core.config import get_settings
+    from tools.standins import standin_app
+
+    rows = iter_signal_rows(csv_path, start_date, end_date)
+    first = next(rows, None)
+    report = {
+        "source": str(csv_path),
+        "start_date": start_date.isoformat() if start_date else None,
+        "end_date": end_date.isoformat() if end_date else None,
+        "speed": speed or "max",
+        "simulate_fills": simulate_fills,
+    }
+    if first is None:
+        report["replayed_signals"] = 0
+        return report
+
+    def all_rows():
+        yield first
+        yield from rows
+
+    virtual_clock = clock.VirtualClock(first["_recorded_at"], speed=speed)
+    clock.set_clock(virtual_clock)
+    try:
+        async with standin_app(config_path=config_path) as app:
+            settings = get_settings()
+            transport = httpx.ASGITransport(app=app, raise_app_exceptions=False, client=("127.0.0.1", 50000))
+            async with httpx.AsyncClient(transport=transport, base_url="http://replay", timeout=30.0) as client:
+                replayer = SignalReplayer(
+                    client, virtual_clock, speed,
+                    settings.security.webhook_secret, settings.security.api_key,
+                    simulate_fills=simulate_fills,
+                )
+                report.update(await replayer.replay(all_rows()))
+    finally:
+        clock.set_clock(None)
+
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay signals.csv through the relay pipeline")
+    parser.add_argument("csv_path", nargs="?", default=None,
+                        help="Compacted signals CSV (tools.compact_signal_log output); "
+                             "default: compact the daily files of --log-dir")
+    parser.add_argument("--log-dir", default=None, help="Directory of the daily files (default: logging.signal_log_dir)")
+    parser.add_argument("--start-date", type=date.fromisoformat, default=None, help="First day to replay (YYYY-MM-DD)")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="Last day to replay (YYYY-MM-DD)")
+    parser.add_argument("--speed", type=float, default=0.0, help="Replay speed (1 = real time, 10 = 10x, 0 = max)")
+    parser.add_argument("--no-fills", action="store_true", help="Do not emulate Excel poll/ack/executed")
+    parser.add_argument("--config", default="config.yaml", help="Configuration file")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.csv_path:
+            csv_path = Path(args.csv_path)
+            compacted = None
+        else:
+            from app.core.config import load_config
+            log_dir = args.log_dir or load_config(args.config).logging.signal_log_dir
+            csv_path = Path(tmp_dir) / "signals.csv"
+            compacted = compact_for_replay(log_dir, csv_path, args.start_date, args.end_date)
+            compacted["log_dir"] = log_dir
+
+        report = asyncio.run(run_replay(
+            csv_path, args.start_date, args.end_date,
+            speed=args.speed, simulate_fills=not args.no_fills, config_path=args.config,
+        ))
+        if compacted is not None:
+            report["source"] = compacted
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Kabuto Relay Server - Seed the last-price store from analysis OHLCV files
+
+Reads the last bar of each daily OHLCV file (Stooq format, as used by
+analysis/scripts/load_jp_data.py) and merges the closes into the price
+store seed file loaded by the server on startup (newest price wins).
+
+    python -m tools.seed_prices
+    python -m tools.seed_prices --data-dir "../analysis/data/daily/jp/tse stocks" --tickers 7203 9984
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from app.core.config import get_settings
+from app.services.price_store import LastPriceStore
+
+JST = timezone(timedelta(hours=9))
+
+DEFAULT_DATA_DIR = "../analysis/data/daily/jp/tse stocks"
+FILE_SUFFIX = ".jp.txt"
+
+# Daily bars carry no time of day; stamp them at the TSE close
+CLOSE_TIME = (15, 30)
+
+
+def _last_line(path: Path, block_size: int = 4096) -> Optional[str]:
+    """Read the last non-empty line without loading the whole file"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        data = b""
+        while end > 0:
+            start = max(end - block_size, 0)
+            f.seek(start)
+            data = f.read(end - start) + data
+            lines = data.strip().splitlines()
+            if len(lines) > 1 or start == 0:
+                return lines[-1].decode("utf-8", errors="replace") if lines else None
+            end = start
+    return None
+
+
+def parse_last_bar(path: Path) -> Optional[Dict]:
+    """
+    Last close of a Stooq daily file
+
+    Columns: <TICKER>,<PER>,<DATE>,<TIME>,<OPEN>,<HIGH>,<LOW>,<CLOSE>,<VOL>,<OPENINT>
+    """
+    line = _last_line(path)
+    if not line or line.startswith("<"):
+        return None
+
+    fields = line.split(",")
+    try:
+        day = datetime.strptime(fields[2], "%Y%m%d")
+        close = float(fields[7])
+    except (IndexError, ValueError):
+        return None
+
+    as_of = day.replace(hour=CLOSE_TIME[0], minute=CLOSE_TIME[1], tzinfo=JST)
+    return {
+        "ticker": path.name[:-len(FILE_SUFFIX)],
+        "price": close,
+        "as_of": as_of.timestamp(),
+        "source": "seed",
+    }
+
+
+def iter_ohlcv_files(data_dir: Path, tickers: Optional[List[str]] = None) -> Iterator[Path]:
+    """OHLCV files under data_dir (recursively), optionally limited to tickers"""
+    wanted = set(tickers) if tickers else None
+    for path in sorted(data_dir.rglob(f"*{FILE_SUFFIX}")):
+        if wanted is None or path.name[:-len(FILE_SUFFIX)] in wanted:
+            yield path
+
+
+def seed_prices(data_dir: Path, output: str, tickers: Optional[List[str]] = None) -> Dict:
+    """
+    Merge the last closes into the seed file
+
+    Returns:
+        {"files": n, "seeded": m, "skipped": k, "total": t}
+    """
+    store = LastPriceStore()
+    store.load_file(output)
+
+    files = seeded = skipped = 0
+    for path in iter_ohlcv_files(data_dir, tickers):
+        files += 1
+        bar = parse_last_bar(path)
+        if bar is None:
+            skipped += 1
+            continue
+        if store.update(bar["ticker"], bar["price"], bar["source"], bar["as_of"]):
+            seeded += 1
+
+    total = store.save_file(output)
+    return {"files": files, "seeded": seeded, "skipped": skipped, "total": total}
+
+
+def main(argv=None):
+    settings = get_settings()
+
+    parser = argparse.ArgumentParser(description="Seed the last-price store from OHLCV files")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Directory of <ticker>.jp.txt files")
+    parser.add_argument("--tickers", nargs="*", default=None, help="Only these tickers (default: all)")
+    parser.add_argument("--output", default=settings.price_store.seed_file, help="Seed file to merge into")
+    args = parser.parse_args(argv)
+
+    data_dir = Path(args.data_dir)
+    if not data_dir.is_dir():
+        parser.error(f"data directory not found: {data_dir}")
+
+    result = seed_prices(data_dir, args.output, args.tickers)
+    result["output"] = args.output
+    print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
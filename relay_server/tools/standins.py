@@ -0,0 +1,326 @@
+"""
+Local stand-ins for running the relay server without external services
+
+- InMemoryRedis: process-local replacement for redis.Redis
+- standin_app(): boots the real FastAPI app (real lifespan) against a
+  throwaway SQLite database and the in-memory Redis
+"""
+import contextlib
+import fnmatch
+import sys
+import tempfile
+import threading
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import redis
+import yaml
+
+from app.core import clock
+
+
+class InMemoryRedis:
+    """
+    Minimal redis.Redis replacement backed by a shared in-process dict
+
+    All instances share one keyspace, so services that open their own
+    client per request see the same data (like a real Redis server).
+    Expiry follows app.core.clock, so TTLs run on a virtual clock in replay.
+    """
+
+    _store: Dict[str, Any] = {}
+    _expires: Dict[str, float] = {}
+    _lock = threading.RLock()
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    # ----- internal helpers -----
+
+    def _purge(self, key: str):
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= clock.timestamp():
+            self._store.pop(key, None)
+            self._expires.pop(key, None)
+
+    def _live_keys(self) -> List[str]:
+        for key in list(self._expires):
+            self._purge(key)
+        return list(self._store)
+
+    # ----- connection -----
+
+    def ping(self) -> bool:
+        return True
+
+    def close(self):
+        pass
+
+    def flushdb(self) -> bool:
+        with self._lock:
+            self._store.clear()
+            self._expires.clear()
+        return True
+
+    # ----- strings -----
+
+    def get(self, name: str) -> Optional[str]:
+        with self._lock:
+            self._purge(name)
+            return self._store.get(name)
+
+    def set(self, name: str, value: Any, ex: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        with self._lock:
+            self._purge(name)
+            if nx and name in self._store:
+                return None
+            self._store[name] = str(value)
+            if ex:
+                self._expires[name] = clock.timestamp() + ex
+            else:
+                self._expires.pop(name, None)
+            return True
+
+    def setex(self, name: str, time_seconds: int, value: Any) -> bool:
+        return self.set(name, value, ex=time_seconds)
+
+    def incr(self, name: str, amount: int = 1) -> int:
+        with self._lock:
+            self._purge(name)
+            value = int(self._store.get(name, 0)) + amount
+            self._store[name] = str(value)
+            return value
+
+    # ----- keys -----
+
+    def exists(self, *names: str) -> int:
+        with self._lock:
+            count = 0
+            for name in names:
+                self._purge(name)
+                if name in self._store:
+                    count += 1
+            return count
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            count = 0
+            for name in names:
+                self._purge(name)
+                if self._store.pop(name, None) is not None:
+                    count += 1
+                self._expires.pop(name, None)
+            return count
+
+    def expire(self, name: str, time_seconds: int) -> bool:
+        with self._lock:
+            self._purge(name)
+            if name not in self._store:
+                return False
+            self._expires[name] = clock.timestamp() + time_seconds
+            return True
+
+    def ttl(self, name: str) -> int:
+        with self._lock:
+            self._purge(name)
+            if name not in self._store:
+                return -2
+            expires_at = self._expires.get(name)
+            if expires_at is None:
+                return -1
+            return max(int(round(expires_at - clock.timestamp())), 0)
+
+    def keys(self, pattern: str = "*") -> List[str]:
+        with self._lock:
+            return [k for k in self._live_keys() if fnmatch.fnmatchcase(k, pattern)]
+
+    # ----- hashes -----
+
+    def _hash(self, name: str) -> Dict[str, str]:
+        self._purge(name)
+        return self._store.setdefault(name, {})
+
+    def hset(self, name: str, key: Optional[str] = None, value: Any = None,
+             mapping: Optional[Dict[str, Any]] = None) -> int:
+        with self._lock:
+            fields = dict(mapping or {})
+            if key is not None:
+                fields[key] = value
+            h = self._hash(name)
+            added = sum(1 for k in fields if k not in h)
+            h.update({k: str(v) for k, v in fields.items()})
+            return added
+
+    def hsetnx(self, name: str, key: str, value: Any) -> bool:
+        with self._lock:
+            h = self._hash(name)
+            if key in h:
+                return False
+            h[key] = str(value)
+            return True
+
+    def hget(self, name: str, key: str) -> Optional[str]:
+        with self._lock:
+            self._purge(name)
+            return self._store.get(name, {}).get(key)
+
+    def hgetall(self, name: str) -> Dict[str, str]:
+        with self._lock:
+            self._purge(name)
+            return dict(self._store.get(name, {}))
+
+    # ----- pipelines -----
+
+    def pipeline(self, transaction: bool = True) -> "InMemoryPipeline":
+        return InMemoryPipeline(self)
+
+
+class InMemoryPipeline:
+    """Buffers commands and runs them on execute() (no MULTI semantics)"""
+
+    def __init__(self, client: InMemoryRedis):
+        self._client = client
+        self._commands: List = []
+
+    def __getattr__(self, name: str):
+        method = getattr(self._client, name)
+
+        def _queue(*args, **kwargs):
+            self._commands.append((method, args, kwargs))
+            return self
+        return _queue
+
+    def execute(self) -> List[Any]:
+        commands, self._commands = self._commands, []
+        return [method(*args, **kwargs) for method, args, kwargs in commands]
+
+
+# Overrides that lift trading limits so a load run exercises the full
+# pipeline instead of being rejected by cooldowns / daily limits.
+PERMISSIVE_OVERRIDES: Dict[str, Any] = {
+    "cooldown": {
+        "buy_same_ticker": 0,
+        "buy_any_ticker": 0,
+        "sell_same_ticker": 0,
+        "sell_any_ticker": 0,
+    },
+    "risk_control": {
+        "max_total_exposure": 10 ** 12,
+        "max_position_per_ticker": 10 ** 12,
+        "max_open_positions": 10 ** 6,
+        "max_daily_entries": 10 ** 6,
+        "max_daily_trades": 10 ** 6,
+        "max_trades_per_hour": 10 ** 6,
+        "max_trades_per_hour_per_ticker": 0,
+        "max_consecutive_losses": 10 ** 6,
+        "max_daily_loss": -(10 ** 12),
+    },
+    "market_hours": {
+        "safe_trading_windows": {
+            "morning": {"start": "00:00", "end": "23:59"},
+            "afternoon": {"start": "00:00", "end": "23:59"},
+        },
+        "off_hours_action": "QUEUE",
+    },
+    "rate_limit": {"enabled": False},
+}
+
+
+def _deep_update(base: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Recursively merge overrides into base (in place)"""
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _deep_update(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+
+def build_standin_settings(
+    workdir: Path,
+    config_path: str = "config.yaml",
+    overrides: Optional[Dict[str, Any]] = None,
+    log_level: str = "WARNING"
+):
+    """
+    Build Settings from config.yaml, pointed at throwaway local resources
+
+    Args:
+        workdir: Directory for the SQLite file and log files
+        config_path: Base configuration file
+        overrides: Nested dict merged over the YAML config
+        log_level: Log level for the app's loguru sinks
+
+    Returns:
+        Settings instance
+    """
+    from app.core.config import Settings
+
+    with open(config_path, "r", encoding="utf-8") as f:
+        config_data = yaml.safe_load(f)
+
+    _deep_update(config_data, {
+        "database": {"url": f"sqlite:///{workdir / 'kabuto_standin.db'}", "echo": False},
+        "logging": {
+            "level": log_level,
+            "file": str(workdir / "logs" / "kabuto_{time:YYYY-MM-DD}.log"),
+            "signal_log_dir": str(workdir / "logs"),
+        },
+        "alerts": {"enabled": False},
+        "test_mode": {"enabled": False},
+        "price_store": {"seed_file": str(workdir / "last_prices.csv")},
+        # InMemoryRedis has no sorted sets or scripting
+        "risk_control": {"hourly_limit_backend": "memory"},
+        "rate_limit": {"backend": "memory"},
+        "config_reload": {"watch": False},
+    })
+    if overrides:
+        _deep_update(config_data, overrides)
+
+    return Settings(**config_data)
+
+
+@asynccontextmanager
+async def standin_app(
+    workdir: Optional[Path] = None,
+    config_path: str = "config.yaml",
+    overrides: Optional[Dict[str, Any]] = None,
+    log_level: str = "WARNING"
+):
+    """
+    Run the real relay app (including its lifespan) on local stand-ins
+
+    Yields:
+        The FastAPI application, started and ready for an ASGI transport
+    """
+    tmp = None
+    if workdir is None:
+        tmp = tempfile.TemporaryDirectory(prefix="kabuto_standin_")
+        workdir = Path(tmp.name)
+    workdir = Path(workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    original_redis = redis.Redis
+    redis.Redis = InMemoryRedis
+    InMemoryRedis().flushdb()
+
+    from app.core import config as config_module
+    original_settings = config_module.settings
+    config_module.settings = build_standin_settings(workdir, config_path, overrides, log_level)
+
+    from app.main import app, lifespan
+
+    try:
+        # App console logs go to stderr so stdout stays clean for JSON reports
+        with contextlib.redirect_stdout(sys.stderr):
+            async with lifespan(app):
+                yield app
+    finally:
+        config_module.settings = original_settings
+        redis.Redis = original_redis
+        if tmp is not None:
+            from app import database
+            if database.engine is not None:
+                database.engine.dispose()
+            tmp.cleanup()
@@ -0,0 +1,58 @@
+"""
+Kabuto Relay Server - Signal latency report
+
+Latency per hop of the signal lifecycle (TradingView send -> relay accept ->
+first poll -> ack -> fill -> report), overall and per hour of day (JST),
+from the signal_timings table (see app.services.tracing).
+
+    python -m tools.trace_report
+    python -m tools.trace_report --start-date 2026-10-01 --end-date 2026-10-19 --output latency.json
+    python -m tools.trace_report --signal-id sig_20261019_093001_7203_buy
+"""
+import argparse
+import json
+import sys
+from datetime import date
+
+from app.core import clock
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Signal latency per hop and hour of day")
+    parser.add_argument("--start-date", type=date.fromisoformat, help="First accept date (default: today)")
+    parser.add_argument("--end-date", type=date.fromisoformat, help="Last accept date (default: start date)")
+    parser.add_argument("--signal-id", help="Timeline of one signal instead of the report")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    from app import database
+    from app.models import SignalTiming
+    from app.services.tracing import latency_report, query_timings, trace_dict
+
+    database.init_database()
+
+    with database.get_db_context() as db:
+        if args.signal_id:
+            timing = db.query(SignalTiming).filter(SignalTiming.signal_id == args.signal_id).first()
+            if timing is None:
+                print(f"No trace for {args.signal_id}", file=sys.stderr)
+                return 1
+            report = trace_dict(timing)
+        else:
+            start_date = args.start_date or clock.today()
+            end_date = args.end_date or start_date
+            report = {
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat(),
+                **latency_report(query_timings(db, start_date, end_date))
+            }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())